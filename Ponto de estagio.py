@@ -1,14 +1,43 @@
+import os
 import customtkinter as ctk
 from central_horas import CentralHorasEstagio
-central_horas = CentralHorasEstagio()
+from particoes_anuais import eh_manifesto
+# Com PONTO_ESTAGIO_SERVIDOR (ex.: http://127.0.0.1:8765) usa o servidor_horas
+# compartilhado em vez de uma central local
+if os.environ.get("PONTO_ESTAGIO_SERVIDOR"):
+    from cliente_horas import ClienteHoras
+    central_horas = ClienteHoras(os.environ["PONTO_ESTAGIO_SERVIDOR"])
+else:
+    # O horas_estagio.json fica inteiro, em um único arquivo, e só o ano atual
+    # vai para a memória. Com PONTO_ESTAGIO_PARTICIONAR=1 (ou =gzip / =lzma,
+    # para comprimir os anos anteriores) ele é dividido em um arquivo por ano
+    # na próxima gravação; um arquivo já dividido continua sendo aberto assim,
+    # e volta a ser um só com `python cli_horas.py juntar-particoes` (com a
+    # janela fechada)
+    opcao_particoes = os.environ.get("PONTO_ESTAGIO_PARTICIONAR", "").lower()
+    particionar = opcao_particoes in ("1", "gzip", "lzma") or eh_manifesto("horas_estagio.json")
+    compressao = opcao_particoes if opcao_particoes in ("gzip", "lzma") else None
+    # exclusivo: a cli_horas.py e o servidor_horas.py se recusam a abrir o
+    # mesmo arquivo enquanto a janela estiver aberta
+    central_horas = CentralHorasEstagio(journal=True, carregar_apenas_ano_atual=True, particionar_por_ano=particionar,
+                                        compressao_anos_frios=compressao, escrita_assincrona=True, exclusivo=True)
 from datetime import datetime
+from tabela_virtual import Coluna, TabelaVirtual
+from tarefas_gui import ExecutorTarefas
 
 ctk.set_appearance_mode('dark')
 ctk.set_default_color_theme("blue")
 
 APP = ctk.CTk()
 APP.title('Ponto Estágio')
-APP.geometry('500x600')
+APP.geometry('500x650')
+
+# As chamadas à central rodam em TAREFAS (tarefas_gui.py), fora da thread do
+# Tk; os callbacks ao_concluir/ao_falhar voltam para ela e atualizam a tela
+
+def janela_aberta(janela):
+    """A janela ainda existe (o usuário pode tê-la fechado durante a tarefa)"""
+    return janela.winfo_exists()
 
 # Função para o botão Enviar
 def enviar_dados():
@@ -16,8 +45,7 @@ def enviar_dados():
     entrada = HORARIO_ENTRADA.get()
     saida = HORARIO_Saida.get()
     
-    try:
-        registro = central_horas.registrar_horas(nome, entrada, saida)
+    def concluido(registro):
         # Limpa os campos após o envio
         Nome.delete(0, 'end')
         HORARIO_ENTRADA.delete(0, 'end')
@@ -28,15 +56,23 @@ def enviar_dados():
         
         # Exibe no console também
         print(f"Registro salvo para {nome}: {registro}")
-        
-    except ValueError as e:
+    
+    def falhou(e):
         resultado.configure(text=f"Erro: {str(e)}", text_color="red")
         print(f"Erro: {str(e)}")
+    
+    # Cliques repetidos com os mesmos dados não gravam o ponto duas vezes
+    TAREFAS.executar(central_horas.registrar_horas, nome, entrada, saida,
+                     chave=("registrar", nome, entrada, saida), descricao_tarefa="Registrando ponto",
+                     ao_concluir=concluido, ao_falhar=falhou, gravacao=True)
 
 # Função para mostrar o ranking Mensal
 def mostrar_ranking():
-    relatorio = central_horas.gerar_relatorio_mensal()
-    
+    TAREFAS.executar(central_horas.gerar_relatorio_mensal, chave="ranking_mensal",
+                     descricao_tarefa="Gerando ranking mensal", ao_concluir=exibir_ranking_mensal,
+                     ao_falhar=lambda e: resultado.configure(text=f"Erro: {str(e)}", text_color="red"))
+
+def exibir_ranking_mensal(relatorio):
     # Ordena os usuários pelo total de minutos (maior primeiro)
     usuarios_ordenados = sorted(
         [(usuario, dados['minutos'], dados['horas']) for usuario, dados in relatorio['usuarios'].items()],
@@ -57,25 +93,17 @@ def mostrar_ranking():
                 text="🏆 Ranking de Horas Trabalhadas 🏆", 
                 font=("Times New Roman", 16, "bold")).pack(pady=(0, 10))
     
-    # Cabeçalho da tabela
-    cabecalho = ctk.CTkFrame(frame)
-    cabecalho.pack(fill="x", pady=5)
-    
-    ctk.CTkLabel(cabecalho, text="Posição", width=50, anchor="w", font=("Times New Roman", 12, "bold")).pack(side="left")
-    ctk.CTkLabel(cabecalho, text="Nome", width=150, anchor="w", font=("Times New Roman", 12, "bold")).pack(side="left")
-    ctk.CTkLabel(cabecalho, text="Horas", width=80, anchor="center", font=("Times New Roman", 12, "bold")).pack(side="left")
-    ctk.CTkLabel(cabecalho, text="Minutos", width=80, anchor="center", font=("Times New Roman", 12, "bold")).pack(side="left")
-    
-    # Lista de usuários
-    for i, (usuario, minutos, horas) in enumerate(usuarios_ordenados, 1):
-        # Frame para cada linha do ranking
-        linha = ctk.CTkFrame(frame)
-        linha.pack(fill="x", pady=2)
-        
-        ctk.CTkLabel(linha, text=f"{i}º", width=50, anchor="w").pack(side="left")
-        ctk.CTkLabel(linha, text=usuario, width=150, anchor="w").pack(side="left")
-        ctk.CTkLabel(linha, text=f"{horas:.2f}h", width=80, anchor="center").pack(side="left")
-        ctk.CTkLabel(linha, text=f"{minutos}m", width=80, anchor="center").pack(side="left")
+    # Tabela do ranking: só as linhas visíveis têm widgets, reaproveitados ao rolar
+    tabela = TabelaVirtual(frame, [
+        Coluna("Posição", 60, "w", lambda posicao: f"{posicao}º"),
+        Coluna("Nome", 150, "w"),
+        Coluna("Horas", 80, formatar=lambda horas: f"{horas:.2f}h", decrescente=True),
+        Coluna("Minutos", 80, formatar=lambda minutos: f"{minutos}m", decrescente=True),
+    ])
+    tabela.pack(fill="both", expand=True, pady=5)
+    tabela.definir_linhas(
+        (i, usuario, horas, minutos) for i, (usuario, minutos, horas) in enumerate(usuarios_ordenados, 1)
+    )
     
     # Rodapé com totais
     rodape = ctk.CTkFrame(frame)
@@ -88,6 +116,43 @@ def mostrar_ranking():
     # Botão de fechar
     ctk.CTkButton(janela_ranking, text="Fechar", command=janela_ranking.destroy, fg_color="#e74c3c").pack(pady=10)
 
+# Janelas móveis do placar (placar.py), com o rótulo mostrado na tela
+JANELAS_RANKING = {"Semana": "semana", "30 dias": "30_dias", "Semestre": "semestre"}
+
+def mostrar_ranking_movel():
+    janela_ranking = ctk.CTkToplevel(APP)
+    janela_ranking.title("Ranking dos Últimos Dias")
+    janela_ranking.geometry("500x450")
+    
+    frame = ctk.CTkFrame(janela_ranking)
+    frame.pack(pady=20, padx=20, fill="both", expand=True)
+    
+    # O placar já mantém o ranking de cada janela: trocar de janela só busca os primeiros
+    tabela = TabelaVirtual(frame, [
+        Coluna("Posição", 60, "w", lambda posicao: f"{posicao}º"),
+        Coluna("Nome", 150, "w"),
+        Coluna("Horas", 80, formatar=lambda horas: f"{horas:.2f}h", decrescente=True),
+        Coluna("Minutos", 80, formatar=lambda minutos: f"{minutos}m", decrescente=True),
+    ])
+    
+    def exibir(ranking):
+        if janela_aberta(janela_ranking):
+            tabela.definir_linhas((item['posicao'], item['nome'], item['horas'], item['minutos']) for item in ranking)
+    
+    def trocar_janela(rotulo):
+        janela = JANELAS_RANKING[rotulo]
+        TAREFAS.executar(central_horas.ranking_janela, janela, 50, chave=("ranking_movel", janela),
+                         descricao_tarefa="Gerando ranking", ao_concluir=exibir,
+                         ao_falhar=lambda e: resultado.configure(text=f"Erro: {str(e)}", text_color="red"))
+    
+    seletor = ctk.CTkSegmentedButton(frame, values=list(JANELAS_RANKING), command=trocar_janela)
+    seletor.pack(pady=(0, 10))
+    tabela.pack(fill="both", expand=True, pady=5)
+    seletor.set("Semana")
+    trocar_janela("Semana")
+    
+    ctk.CTkButton(janela_ranking, text="Fechar", command=janela_ranking.destroy, fg_color="#e74c3c").pack(pady=10)
+
 def abrir_janela_registro_manual():
     janela = ctk.CTkToplevel(APP)
     janela.title("Adicionar Horas Passadas")
@@ -116,23 +181,30 @@ def abrir_janela_registro_manual():
         entries.append(entry)
     
     def submeter():
-        try:
-            registro = central_horas.adicionar_registro_manual(
-                nome=entries[1].get(),
-                data=entries[0].get(),
-                entrada=entries[2].get(),
-                saida=entries[3].get(),
-                descricao=entries[4].get()
-            )
-            
+        valores = [entry.get() for entry in entries]
+        
+        def concluido(registro):
+            if not janela_aberta(janela):
+                return
             mensagem_label.configure(text="✅ Registro adicionado com sucesso!", text_color="green")
             
             # Limpa os campos
             for entry in entries:
                 entry.delete(0, 'end')
-                
-        except Exception as e:
-            mensagem_label.configure(text=f"❌ Erro: {str(e)}", text_color="red")
+        
+        def falhou(e):
+            if janela_aberta(janela):
+                mensagem_label.configure(text=f"❌ Erro: {str(e)}", text_color="red")
+        
+        mensagem_label.configure(text="Salvando...", text_color="gray")
+        TAREFAS.executar(central_horas.adicionar_registro_manual,
+                         nome=valores[1],
+                         data=valores[0],
+                         entrada=valores[2],
+                         saida=valores[3],
+                         descricao=valores[4],
+                         chave=("registro_manual", *valores), descricao_tarefa="Salvando registro",
+                         ao_concluir=concluido, ao_falhar=falhou, gravacao=True)
     
     ctk.CTkButton(frame, text="Adicionar Registro", command=submeter, fg_color="#3498db",font=("Times New Roman", 14)).pack(pady=15)
 
@@ -166,20 +238,35 @@ def abrir_janela_minutos_passados():
     
     def submeter():
         try:
-            central_horas.adicionar_minutos_passados(
-                nome=entrada_nome.get(),
-                data=entrada_data.get(),
-                minutos=int(entrada_minutos.get()),
-                descricao=entrada_desc.get()
-            )
+            minutos = int(entrada_minutos.get())
+        except ValueError as e:
+            mensagem.configure(text=f"❌ Erro: {str(e)}", text_color="red")
+            return
+        nome, data, descricao = entrada_nome.get(), entrada_data.get(), entrada_desc.get()
+        
+        def concluido(registro):
+            if not janela_aberta(janela):
+                return
             mensagem.configure(text="✅ Minutos adicionados com sucesso!", text_color="green")
             # Limpa os campos
             entrada_data.delete(0, 'end')
             entrada_nome.delete(0, 'end')
             entrada_minutos.delete(0, 'end')
             entrada_desc.delete(0, 'end')
-        except Exception as e:
-            mensagem.configure(text=f"❌ Erro: {str(e)}", text_color="red")
+        
+        def falhou(e):
+            if janela_aberta(janela):
+                mensagem.configure(text=f"❌ Erro: {str(e)}", text_color="red")
+        
+        mensagem.configure(text="Salvando...", text_color="gray")
+        TAREFAS.executar(central_horas.adicionar_minutos_passados,
+                         nome=nome,
+                         data=data,
+                         minutos=minutos,
+                         descricao=descricao,
+                         chave=("minutos_passados", nome, data, minutos, descricao),
+                         descricao_tarefa="Salvando minutos",
+                         ao_concluir=concluido, ao_falhar=falhou, gravacao=True)
     
     ctk.CTkButton(frame, text="Adicionar", command=submeter).pack(pady=15)
 
@@ -210,8 +297,13 @@ def mostrar_ranking_anual():
     ctk.CTkButton(frame, text="Gerar Ranking", command=gerar_ranking).pack()
 
 def exibir_ranking_anual(ano: int):
-    relatorio = central_horas.gerar_relatorio_anual(ano)
-    
+    # Vários cliques no mesmo ano geram um único relatório
+    TAREFAS.executar(central_horas.gerar_relatorio_anual, ano, chave=("ranking_anual", ano),
+                     descricao_tarefa=f"Gerando ranking anual de {ano}",
+                     ao_concluir=lambda relatorio: abrir_janela_ranking_anual(ano, relatorio),
+                     ao_falhar=lambda e: resultado.configure(text=f"Erro: {str(e)}", text_color="red"))
+
+def abrir_janela_ranking_anual(ano: int, relatorio: dict):
     # Ordena usuários por minutos trabalhados
     usuarios_ordenados = sorted(
         [(usuario, dados['horas'], dados['minutos']) for usuario, dados in relatorio['usuarios'].items()],
@@ -221,91 +313,48 @@ def exibir_ranking_anual(ano: int):
     
     janela_ranking = ctk.CTkToplevel(APP)
     janela_ranking.title(f"Ranking Anual - {ano}")
-    janela_ranking.geometry("800x600")
+    janela_ranking.geometry("1150x600")
     
-    # Frame principal com scrollbar
     main_frame = ctk.CTkFrame(janela_ranking)
     main_frame.pack(fill="both", expand=True, padx=10, pady=10)
     
-    # Canvas para scroll
-    canvas = ctk.CTkCanvas(main_frame)
-    scrollbar = ctk.CTkScrollbar(main_frame, orientation="vertical", command=canvas.yview)
-    scrollable_frame = ctk.CTkFrame(canvas)
-    
-    scrollable_frame.bind(
-        "<Configure>",
-        lambda e: canvas.configure(
-            scrollregion=canvas.bbox("all")
-        )
-    )
-    
-    canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-    canvas.configure(yscrollcommand=scrollbar.set)
-    
-    canvas.pack(side="left", fill="both", expand=True)
-    scrollbar.pack(side="right", fill="y")
-    
     # Título
-    ctk.CTkLabel(scrollable_frame, 
+    ctk.CTkLabel(main_frame, 
                 text=f"🏆 Ranking Anual {ano} 🏆", 
                 font=("Times New Roman", 18, "bold")).pack(pady=(0, 15))
     
     # Resumo geral
-    frame_resumo = ctk.CTkFrame(scrollable_frame)
+    frame_resumo = ctk.CTkFrame(main_frame)
     frame_resumo.pack(fill="x", pady=5, padx=10)
     
     ctk.CTkLabel(frame_resumo, 
                 text=f"Total Geral: {relatorio['total_horas']:.2f}h | {relatorio['total_minutos']}m",
                 font=("Times New Roman", 14, "bold")).pack()
     
-    # Ranking principal
-    frame_ranking = ctk.CTkFrame(scrollable_frame)
-    frame_ranking.pack(fill="x", pady=10, padx=10)
-    
-    # Cabeçalho
-    cabecalho = ctk.CTkFrame(frame_ranking)
-    cabecalho.pack(fill="x", pady=5)
+    # Ranking com o detalhamento por mês na mesma linha; só as linhas
+    # visíveis têm widgets, e ordenar por uma coluna não recria nenhum
+    meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 
+            'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+    colunas = [
+        Coluna("Pos", 40, formatar=lambda posicao: f"{posicao}º"),
+        Coluna("Nome", 150, "w"),
+        Coluna("Horas", 80, formatar=lambda horas: f"{horas:.2f}h", decrescente=True),
+        Coluna("Minutos", 80, formatar=lambda minutos: f"{minutos}m", decrescente=True),
+    ]
+    # Os meses guardam os minutos (para ordenar) e mostram as horas
+    colunas += [Coluna(mes_nome, 58, formatar=lambda minutos: f"{minutos / 60:.2f}h" if minutos else "-",
+                       decrescente=True) for mes_nome in meses]
     
-    ctk.CTkLabel(cabecalho, text="Pos", width=40, anchor="center", font=("Times New Roman", 12, "bold")).pack(side="left")
-    ctk.CTkLabel(cabecalho, text="Nome", width=150, anchor="w", font=("Times New Roman", 12, "bold")).pack(side="left")
-    ctk.CTkLabel(cabecalho, text="Horas", width=100, anchor="center", font=("Times New Roman", 12, "bold")).pack(side="left")
-    ctk.CTkLabel(cabecalho, text="Minutos", width=100, anchor="center", font=("Times New Roman", 12, "bold")).pack(side="left")
+    tabela = TabelaVirtual(main_frame, colunas)
+    tabela.pack(fill="both", expand=True, pady=10, padx=10)
     
-    # Lista de usuários
+    linhas = []
     for i, (usuario, horas, minutos) in enumerate(usuarios_ordenados, 1):
-        linha = ctk.CTkFrame(frame_ranking)
-        linha.pack(fill="x", pady=2)
-        
-        ctk.CTkLabel(linha, text=f"{i}º", width=40, anchor="center").pack(side="left")
-        ctk.CTkLabel(linha, text=usuario, width=150, anchor="w").pack(side="left")
-        ctk.CTkLabel(linha, text=f"{horas:.2f}h", width=100, anchor="center").pack(side="left")
-        ctk.CTkLabel(linha, text=f"{minutos}m", width=100, anchor="center").pack(side="left")
-    
-    # Detalhamento por mês para cada usuário
-    for usuario in relatorio['usuarios']:
-        frame_usuario = ctk.CTkFrame(scrollable_frame, border_width=1)
-        frame_usuario.pack(fill="x", pady=10, padx=10)
-        
-        ctk.CTkLabel(frame_usuario, 
-                    text=f"Detalhes de {usuario}:",
-                    font=("Times New Roman", 14)).pack(anchor="w", pady=5)
-        
-        # Cabeçalho meses
-        cabecalho_meses = ctk.CTkFrame(frame_usuario)
-        cabecalho_meses.pack(fill="x", pady=2)
-        
-        meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 
-                'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-        
-        for mes_num, mes_nome in enumerate(meses, 1):
-            if mes_num in relatorio['usuarios'][usuario]['meses']:
-                dados = relatorio['usuarios'][usuario]['meses'][mes_num]
-                frame_mes = ctk.CTkFrame(frame_usuario)
-                frame_mes.pack(fill="x", pady=1)
-                
-                ctk.CTkLabel(frame_mes, text=mes_nome, width=40, anchor="w").pack(side="left")
-                ctk.CTkLabel(frame_mes, text=f"{dados['horas']:.2f}h", width=80, anchor="center").pack(side="left")
-                ctk.CTkLabel(frame_mes, text=f"{dados['minutos']}m", width=80, anchor="center").pack(side="left")
+        meses_usuario = relatorio['usuarios'][usuario]['meses']
+        minutos_meses = [meses_usuario[mes_num]['minutos'] if mes_num in meses_usuario else 0
+                         for mes_num in range(1, 13)]
+        linhas.append((i, usuario, horas, minutos, *minutos_meses))
+    tabela.definir_linhas(linhas)
     
     # Botão de fechar
     ctk.CTkButton(janela_ranking, 
@@ -328,6 +377,8 @@ X = ctk.CTkLabel(APP, text='X', font=("Times New Roman", 14))
 HORARIO_Saida = ctk.CTkEntry(APP, placeholder_text='Horário de Saída (HH:MM)', font=("Times New Roman", 14))
 ENVIAR = ctk.CTkButton(APP, text='Registrar Ponto', font=("Times New Roman", 14), command=enviar_dados)
 resultado = ctk.CTkLabel(APP, text="", font=("Times New Roman", 12))
+progresso = ctk.CTkLabel(APP, text="", font=("Times New Roman", 12), text_color="gray")
+TAREFAS = ExecutorTarefas(APP, progresso)
 
 # Botão para ver o ranking
 BOTAO_RANKING = ctk.CTkButton(APP, text="Ver Ranking Mensal", font=("Times New Roman", 14),command=mostrar_ranking,fg_color="#3498db")
@@ -335,10 +386,14 @@ BOTAO_RANKING = ctk.CTkButton(APP, text="Ver Ranking Mensal", font=("Times New R
 # Botão para ver o ranking anual
 BOTAO_RANKING_ANUAL = ctk.CTkButton(APP, text="Ranking Anual", font=("Times New Roman", 14), command=mostrar_ranking_anual, fg_color="#3498db")
 
+# Botão para o ranking das janelas móveis (semana, 30 dias, semestre)
+BOTAO_RANKING_MOVEL = ctk.CTkButton(APP, text="Ranking dos Últimos Dias", font=("Times New Roman", 14), command=mostrar_ranking_movel, fg_color="#3498db")
+
 
 # Layout da interface principal
 TITLE.pack(pady=15)
 resultado.pack(pady=5)
+progresso.pack()
 Nome.pack(pady=15)
 HORARIO_ENTRADA.pack(pady=5)
 X.pack(pady=5)
@@ -348,7 +403,20 @@ BOTAO_REGISTRO_MANUAL.pack(pady=10)
 BOTAO_MINUTOS.pack(pady=10)
 BOTAO_RANKING.pack(pady=10)
 BOTAO_RANKING_ANUAL.pack(pady=10)
+BOTAO_RANKING_MOVEL.pack(pady=10)
+
+
+# Grava o que estiver pendente antes de fechar: os pontos já pedidos são
+# concluídos e só os rankings ainda na fila são descartados
+def fechar_aplicacao():
+    if TAREFAS.ocupado:
+        progresso.configure(text="Salvando registros pendentes...")
+        APP.update_idletasks()
+    TAREFAS.encerrar()
+    central_horas.fechar()
+    APP.destroy()
 
+APP.protocol("WM_DELETE_WINDOW", fechar_aplicacao)
 
 # Mantém a janela aberta
 APP.mainloop()
@@ -0,0 +1,277 @@
+from array import array
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from indice_turnos import formatar_horario, ler_horario, turno_registro
+
+# Campos de um registro no formato do arquivo JSON
+CAMPOS = ("data", "minutos", "horas", "descricao", "timestamp")
+# Campos a mais dos registros de turno (HH:MM)
+CAMPOS_TURNO = CAMPOS + ("entrada", "saida")
+
+# Entrada/saída de um registro sem turno nas colunas
+SEM_TURNO = -1
+
+_EPOCA = datetime(1970, 1, 1)
+
+
+@lru_cache(maxsize=8192)
+def _data_de_ordinal(ordinal: int) -> str:
+    """Converte o ordinal de uma data para DD/MM/AAAA"""
+    return date.fromordinal(ordinal).strftime("%d/%m/%Y")
+
+
+@lru_cache(maxsize=8192)
+def _ordinal_de_data(data: str) -> int:
+    """Converte DD/MM/AAAA para o ordinal da data"""
+    return datetime.strptime(data, "%d/%m/%Y").toordinal()
+
+
+def _microssegundos(timestamp: str) -> int:
+    """Converte um timestamp ISO (sem fuso) em microssegundos desde 1970"""
+    return (datetime.fromisoformat(timestamp) - _EPOCA) // timedelta(microseconds=1)
+
+
+def _timestamp_iso(microssegundos: int) -> str:
+    """Converte microssegundos desde 1970 de volta para o timestamp ISO"""
+    return (_EPOCA + timedelta(microseconds=microssegundos)).isoformat()
+
+
+def _minutos_horario(horario) -> int:
+    """Minutos desde a meia-noite de um HH:MM canônico, ou SEM_TURNO"""
+    minutos = ler_horario(horario)
+    return SEM_TURNO if minutos is None else minutos
+
+
+class RegistroCompacto:
+    """Visão somente leitura de um registro guardado em colunas"""
+
+    __slots__ = ("_colunas", "_indice")
+
+    def __init__(self, colunas, indice: int):
+        self._colunas = colunas
+        self._indice = indice
+
+    @property
+    def data(self) -> str:
+        return _data_de_ordinal(self._colunas.dias[self._indice])
+
+    @property
+    def dia(self) -> int:
+        """Ordinal da data, lido da coluna sem conversão"""
+        return self._colunas.dias[self._indice]
+
+    @property
+    def chave(self):
+        """(ano, mes, dia) da data"""
+        data = date.fromordinal(self._colunas.dias[self._indice])
+        return data.year, data.month, data.day
+
+    @property
+    def minutos(self) -> int:
+        return self._colunas.minutos[self._indice]
+
+    @property
+    def horas(self) -> float:
+        return round(self.minutos / 60, 2)
+
+    @property
+    def descricao(self) -> str:
+        return self._colunas.descricoes[self._colunas.ids_descricao[self._indice]]
+
+    @property
+    def timestamp(self) -> str:
+        return _timestamp_iso(self._colunas.timestamps[self._indice])
+
+    @property
+    def entrada(self) -> str:
+        return formatar_horario(self._colunas.entradas[self._indice])
+
+    @property
+    def saida(self) -> str:
+        return formatar_horario(self._colunas.saidas[self._indice])
+
+    def __getitem__(self, chave: str):
+        if chave not in self.keys():
+            raise KeyError(chave)
+        return getattr(self, chave)
+
+    def get(self, chave: str, padrao=None):
+        return getattr(self, chave) if chave in self.keys() else padrao
+
+    def keys(self):
+        return CAMPOS if self._colunas.entradas[self._indice] == SEM_TURNO else CAMPOS_TURNO
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, outro):
+        if isinstance(outro, (RegistroCompacto, dict)):
+            return self.para_dict() == dict(outro.items())
+        return NotImplemented
+
+    def items(self):
+        return [(campo, getattr(self, campo)) for campo in self.keys()]
+
+    def para_dict(self) -> dict:
+        """Retorna o registro como dict, no formato do arquivo JSON"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"RegistroCompacto({self.para_dict()!r})"
+
+
+class RegistrosColunares:
+    """
+    Registros de um usuário guardados em colunas (array) em vez de dicts
+
+    Cada registro ocupa algumas dezenas de bytes: ordinal do dia e minutos
+    em array('i'), timestamp em microssegundos em array('q'), entrada e
+    saída do turno em minutos em array('h') (SEM_TURNO quando não há) e a
+    descrição como índice em uma tabela de textos sem repetição. Registros que não
+    cabem nesse formato sem perda (sem minutos, data sem zeros à esquerda,
+    campos extras...) são guardados também como dict, à parte, para que a
+    conversão de volta para o JSON seja exata.
+    """
+
+    def __init__(self, registros=()):
+        self.dias = array('i')
+        self.minutos = array('i')
+        self.timestamps = array('q')
+        self.ids_descricao = array('i')
+        self.entradas = array('h')
+        self.saidas = array('h')
+        self.descricoes = [""]
+        self._id_por_descricao = {"": 0}
+        self._excecoes = {}
+        for registro in registros:
+            self.append(registro)
+
+    @classmethod
+    def de_colunas(cls, dias, minutos, timestamps, ids_descricao, descricoes: list, id_por_descricao: dict,
+                   excecoes: dict = None, entradas=None, saidas=None):
+        """
+        Monta os registros a partir de colunas já prontas, sem convertê-los um a um
+
+        A tabela de descrições (descricoes e id_por_descricao) é usada sem
+        cópia e pode ser a mesma de vários usuários; descricoes[0] deve ser "".
+        Sem entradas e saídas, nenhum registro tem turno.
+        """
+        registros = cls()
+        registros.dias = dias
+        registros.minutos = minutos
+        registros.timestamps = timestamps
+        registros.ids_descricao = ids_descricao
+        registros.descricoes = descricoes
+        registros._id_por_descricao = id_por_descricao
+        registros._excecoes = excecoes or {}
+        registros.entradas = entradas if entradas is not None else array('h', [SEM_TURNO]) * len(dias)
+        registros.saidas = saidas if saidas is not None else array('h', [SEM_TURNO]) * len(dias)
+        return registros
+
+    def append(self, registro):
+        """Acrescenta um registro no formato do arquivo JSON"""
+        if isinstance(registro, RegistroCompacto):
+            registro = registro.para_dict()
+
+        indice = len(self.dias)
+        ordinal = _ordinal_de_data(registro["data"])
+        minutos = registro.get("minutos", int(registro["horas"] * 60))
+        self.dias.append(ordinal)
+        self.minutos.append(int(minutos))
+
+        if self._cabe_nas_colunas(registro, ordinal):
+            self.timestamps.append(_microssegundos(registro["timestamp"]))
+            self.ids_descricao.append(self._id_descricao(registro["descricao"]))
+            self.entradas.append(_minutos_horario(registro.get("entrada")))
+            self.saidas.append(_minutos_horario(registro.get("saida")))
+        else:
+            self.timestamps.append(0)
+            self.ids_descricao.append(0)
+            self.entradas.append(SEM_TURNO)
+            self.saidas.append(SEM_TURNO)
+            self._excecoes[indice] = registro
+
+    @staticmethod
+    def _cabe_nas_colunas(registro, ordinal: int) -> bool:
+        """Verifica se o registro pode ser reconstruído exatamente a partir das colunas"""
+        chaves = registro.keys()
+        if chaves == set(CAMPOS_TURNO):
+            if SEM_TURNO in (_minutos_horario(registro["entrada"]), _minutos_horario(registro["saida"])):
+                return False
+        elif chaves != set(CAMPOS):
+            return False
+        if not isinstance(registro["minutos"], int):
+            return False
+        if not isinstance(registro["descricao"], str) or not isinstance(registro["timestamp"], str):
+            return False
+        if _data_de_ordinal(ordinal) != registro["data"]:
+            return False
+        if registro["horas"] != round(registro["minutos"] / 60, 2):
+            return False
+        try:
+            return _timestamp_iso(_microssegundos(registro["timestamp"])) == registro["timestamp"]
+        except (TypeError, ValueError):
+            return False
+
+    def _id_descricao(self, descricao: str) -> int:
+        """Índice da descrição na tabela de textos, acrescentando se for nova"""
+        indice = self._id_por_descricao.get(descricao)
+        if indice is None:
+            indice = len(self.descricoes)
+            self.descricoes.append(descricao)
+            self._id_por_descricao[descricao] = indice
+        return indice
+
+    def __len__(self):
+        return len(self.dias)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de registro fora do intervalo")
+        excecao = self._excecoes.get(indice)
+        return excecao if excecao is not None else RegistroCompacto(self, indice)
+
+    def __iter__(self):
+        for indice in range(len(self.dias)):
+            yield self[indice]
+
+    def para_dicts(self) -> list:
+        """Retorna todos os registros como dicts, no formato do arquivo JSON"""
+        return [dict(registro.items()) for registro in self]
+
+    def turnos(self):
+        """Percorre (ordinal do dia, entrada, saida, posição) dos registros de turno"""
+        for posicao, (dia, entrada, saida) in enumerate(zip(self.dias, self.entradas, self.saidas)):
+            if entrada != SEM_TURNO:
+                yield dia, entrada, saida, posicao
+        for posicao, registro in self._excecoes.items():
+            turno = turno_registro(registro)
+            if turno is not None:
+                yield self.dias[posicao], turno[0], turno[1], posicao
+
+    def dias_e_minutos(self):
+        """Percorre (ordinal do dia, minutos) de cada registro, sem montar visões"""
+        return zip(self.dias, self.minutos)
+
+    def somar_meses(self, ano_inicio: int, ano_fim: int):
+        """Soma os minutos por mês, com o mesmo formato de central_horas._somar_meses"""
+        meses = [0] * (12 * (ano_fim - ano_inicio + 1))
+        primeiro = date(ano_inicio, 1, 1).toordinal()
+        ultimo = date(ano_fim, 12, 31).toordinal()
+        posicao_por_dia = {}
+        for dia, minutos in zip(self.dias, self.minutos):
+            if primeiro <= dia <= ultimo:
+                posicao = posicao_por_dia.get(dia)
+                if posicao is None:
+                    data = date.fromordinal(dia)
+                    posicao = posicao_por_dia[dia] = (data.year - ano_inicio) * 12 + data.month - 1
+                meses[posicao] += minutos
+        return meses
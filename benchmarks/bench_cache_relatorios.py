@@ -0,0 +1,77 @@
+"""
+Benchmark do cache de relatórios (cache_relatorios.py)
+
+Gera um histórico sintético (benchmarks/gerador.py) e mede os relatórios
+mensal e anual sem cache, com o cache vazio (primeira chamada) e com o
+cache quente, além do custo de uma inclusão retroativa: só o mês e o ano
+afetados devem ser recalculados.
+
+Uso: python benchmarks/bench_cache_relatorios.py [--registros 200000] [--usuarios 2000]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gerador  # noqa: E402
+from central_horas import CentralHorasEstagio  # noqa: E402
+
+
+def cronometrar(funcao, repeticoes: int):
+    """Mediana em ms de `repeticoes` execuções"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return round(statistics.median(tempos), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--registros", type=int, default=200_000)
+    parser.add_argument("--usuarios", type=int, default=2000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, "horas_estagio.json")
+        gerador.gravar_dados(arquivo, gerador.gerar_dados(usuarios=args.usuarios, limite=args.registros,
+                                                          ano_final=2025))
+        sem_cache = CentralHorasEstagio(arquivo, cache_relatorios=0)
+        com_cache = CentralHorasEstagio(arquivo)
+        sem_cache.carregar_dados()
+        com_cache.carregar_dados()
+
+        resultados = {}
+        for nome, gerar in (("mensal", lambda c: c.gerar_relatorio_mensal(3, 2025)),
+                            ("anual", lambda c: c.gerar_relatorio_anual(2025))):
+            inicio = time.perf_counter()
+            gerar(com_cache)
+            primeira = round((time.perf_counter() - inicio) * 1000, 3)
+            resultados[nome] = {
+                "sem_cache_ms": cronometrar(lambda: gerar(sem_cache), args.repeticoes),
+                "primeira_chamada_ms": primeira,
+                "cache_quente_ms": cronometrar(lambda: gerar(com_cache), args.repeticoes),
+            }
+
+        # Inclusão retroativa em março: abril continua no cache
+        com_cache.gerar_relatorio_mensal(4, 2025)
+        nome = com_cache.usuarios[0]
+        com_cache.adicionar_minutos_passados(nome, "10/03/2025", 30)
+        resultados["apos_inclusao_retroativa"] = {
+            "mensal_marco_ms": cronometrar(lambda: com_cache.gerar_relatorio_mensal(3, 2025), 1),
+            "mensal_abril_ms": cronometrar(lambda: com_cache.gerar_relatorio_mensal(4, 2025), 1),
+        }
+        resultados["estatisticas"] = com_cache.stats()["cache_relatorios"]
+
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
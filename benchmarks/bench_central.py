@@ -0,0 +1,161 @@
+"""
+Suíte de benchmarks da CentralHorasEstagio
+
+Para cada tamanho de histórico, gera dados sintéticos determinísticos
+(benchmarks/gerador.py) e mede carregar_dados, salvar_dados,
+_registrar_minutos (um ponto e pontos seguidos), calcular_minutos_dia/mes,
+gerar_relatorio_mensal e gerar_relatorio_anual. O resultado sai em JSON
+para comparar versões:
+
+    python benchmarks/bench_central.py --saida antes.json
+    python benchmarks/bench_central.py --comparar antes.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import gerador  # noqa: E402
+from central_horas import CentralHorasEstagio  # noqa: E402
+
+MODOS = {
+    "padrao": {},
+    "journal": {"journal": True},
+    "compacto": {"compacto": True},
+}
+
+
+def cronometrar(funcao, repeticoes: int = 1):
+    """Executa a função `repeticoes` vezes e retorna os tempos em ms"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def resumir(tempos):
+    """Estatísticas de uma lista de tempos em ms"""
+    return {
+        "n": len(tempos),
+        "min_ms": round(min(tempos), 4),
+        "mediana_ms": round(statistics.median(tempos), 4),
+        "max_ms": round(max(tempos), 4),
+    }
+
+
+def medir_tamanho(diretorio: str, registros: int, modo: str, args):
+    """Roda todas as medições para um tamanho de histórico e um modo da central"""
+    arquivo = os.path.join(diretorio, f"horas_{registros}_{modo}.json")
+    dados = gerador.gerar_dados(usuarios=gerador.dimensionar(registros, args.anos), anos=args.anos,
+                                ano_final=args.ano_final, limite=registros)
+    gerador.gravar_dados(arquivo, dados)
+    del dados
+
+    opcoes = MODOS[modo]
+    ano, mes = args.ano_final, 6
+    resultado = {}
+
+    central = CentralHorasEstagio(arquivo, **opcoes)
+    resultado["carregar_dados"] = resumir(cronometrar(central.carregar_dados, args.repeticoes))
+    usuario = central.usuarios[0]
+
+    resultado["calcular_minutos_dia"] = resumir(cronometrar(
+        lambda: central.calcular_minutos_dia(usuario, f"15/{mes:02d}/{ano}"), args.consultas))
+    resultado["calcular_minutos_mes"] = resumir(cronometrar(
+        lambda: central.calcular_minutos_mes(usuario, mes, ano), args.consultas))
+    resultado["gerar_relatorio_mensal"] = resumir(cronometrar(
+        lambda: central.gerar_relatorio_mensal(mes, ano), args.relatorios))
+    resultado["gerar_relatorio_anual"] = resumir(cronometrar(
+        lambda: central.gerar_relatorio_anual(ano), args.relatorios))
+    resultado["salvar_dados"] = resumir(cronometrar(central.salvar_dados, args.repeticoes))
+
+    resultado["registrar_minutos"] = resumir(cronometrar(
+        lambda: central._registrar_minutos(usuario, f"15/{mes:02d}/{ano}", 60)))
+    sustentado = cronometrar(lambda: central._registrar_minutos(usuario, f"16/{mes:02d}/{ano}", 30),
+                             args.pontos)
+    resultado["registrar_minutos_sustentado"] = dict(
+        resumir(sustentado), total_ms=round(sum(sustentado), 4),
+        pontos_por_segundo=round(len(sustentado) / (sum(sustentado) / 1000), 1))
+
+    central.fechar()
+    for caminho in os.listdir(diretorio):
+        os.remove(os.path.join(diretorio, caminho))
+    return resultado
+
+
+def versao_codigo():
+    """Commit atual do repositório, se disponível"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual: dict, anterior: dict):
+    """Razão atual/anterior da mediana de cada medição presente nos dois resultados"""
+    razoes = {}
+    for chave, medicoes in atual["resultados"].items():
+        medicoes_anteriores = anterior["resultados"].get(chave, {})
+        for operacao, valores in medicoes.items():
+            if operacao in medicoes_anteriores and medicoes_anteriores[operacao]["mediana_ms"] > 0:
+                razoes.setdefault(chave, {})[operacao] = round(
+                    valores["mediana_ms"] / medicoes_anteriores[operacao]["mediana_ms"], 3)
+    return razoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanhos", default="10000,100000,1000000",
+                        help="quantidades de registros, separadas por vírgula")
+    parser.add_argument("--modos", default="padrao,journal", help=f"modos: {', '.join(MODOS)}")
+    parser.add_argument("--anos", type=int, default=3)
+    parser.add_argument("--ano-final", type=int, default=datetime.now().year)
+    parser.add_argument("--repeticoes", type=int, default=3, help="carregar/salvar")
+    parser.add_argument("--consultas", type=int, default=1000, help="calcular_minutos_*")
+    parser.add_argument("--relatorios", type=int, default=20, help="gerar_relatorio_*")
+    parser.add_argument("--pontos", type=int, default=20, help="registros seguidos")
+    parser.add_argument("--saida", help="grava o JSON neste arquivo além de imprimir")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        for registros in (int(t) for t in args.tamanhos.split(",")):
+            for modo in args.modos.split(","):
+                print(f"medindo {registros} registros ({modo})...", file=sys.stderr)
+                resultados[f"{registros}/{modo}"] = medir_tamanho(diretorio, registros, modo, args)
+
+    saida = {
+        "benchmark": "central",
+        "versao": versao_codigo(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": vars(args),
+        "resultados": resultados,
+    }
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            saida["comparacao"] = comparar(saida, json.load(f))
+
+    texto = json.dumps(saida, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(texto)
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
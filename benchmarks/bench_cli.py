@@ -0,0 +1,106 @@
+"""
+Benchmark de inicialização da linha de comando (cli_horas.py)
+
+Mede, cada um em um processo Python novo: importar cli_horas (que não deve
+trazer central_horas nem customtkinter), o --help, uma consulta do dia e um
+lote de pontos lido do stdin e gravado de uma vez. O tempo de um `python -c
+pass` é descontado, para sobrar só o custo da própria CLI.
+
+Uso: python benchmarks/bench_cli.py [--registros N] [--pontos N] [--alvo-ms MS]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import gerador  # noqa: E402
+
+CLI = os.path.join(RAIZ, "cli_horas.py")
+
+_IMPORTAR = """
+import sys, time
+sys.path.insert(0, {raiz!r})
+inicio = time.perf_counter()
+import cli_horas
+fim = time.perf_counter()
+print((fim - inicio) * 1000, int("central_horas" in sys.modules), int("customtkinter" in sys.modules))
+"""
+
+
+def cronometrar(comando, entrada: str = None) -> float:
+    """Tempo de parede, em ms, de um processo novo executando o comando"""
+    inicio = time.perf_counter()
+    subprocess.run(comando, input=entrada, capture_output=True, text=True, check=True)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def linhas_lote(nomes, pontos: int) -> str:
+    """Comandos ponto de 1 minuto, em horários distintos de cada usuário para não se sobreporem"""
+    linhas = []
+    for i in range(pontos):
+        dia, inicio = divmod(i // len(nomes), 23 * 60)
+        linhas.append(f'ponto "{nomes[i % len(nomes)]}" {inicio // 60:02d}:{inicio % 60:02d} '
+                      f'{(inicio + 1) // 60:02d}:{(inicio + 1) % 60:02d} --data {dia % 28 + 1:02d}/01/2000\n')
+    return "".join(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--registros", type=int, default=100_000)
+    parser.add_argument("--pontos", type=int, default=1000, help="linhas do lote")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--alvo-ms", type=float, default=50.0,
+                        help="tempo máximo de importação de cli_horas")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, "horas_estagio.json")
+        dados = gerador.gerar_dados(usuarios=gerador.dimensionar(args.registros), limite=args.registros)
+        gerador.gravar_dados(arquivo, dados)
+        nomes = list(dados["usuarios"])
+        del dados
+
+        importacoes = []
+        for _ in range(args.repeticoes):
+            saida = subprocess.run([sys.executable, "-c", _IMPORTAR.format(raiz=RAIZ)],
+                                   capture_output=True, text=True, check=True)
+            tempo, central, interface = saida.stdout.split()
+            importacoes.append(float(tempo))
+        importa_central, importa_interface = central == "1", interface == "1"
+
+        base = min(cronometrar([sys.executable, "-c", "pass"]) for _ in range(args.repeticoes))
+        ajuda = min(cronometrar([sys.executable, CLI, "--help"]) for _ in range(args.repeticoes))
+        dia = min(cronometrar([sys.executable, CLI, "--arquivo", arquivo, "dia", nomes[0]])
+                  for _ in range(args.repeticoes))
+
+        lote = cronometrar([sys.executable, CLI, "--arquivo", arquivo, "lote"],
+                           entrada=linhas_lote(nomes, args.pontos))
+
+    importacao = min(importacoes)
+    saida = {
+        "benchmark": "cli",
+        "registros": args.registros,
+        "alvo_ms": args.alvo_ms,
+        "dentro_do_alvo": importacao <= args.alvo_ms and not importa_central and not importa_interface,
+        "python_vazio_ms": base,
+        "resultados": {
+            "importacao_ms": importacao,
+            "importa_central_horas": importa_central,
+            "importa_customtkinter": importa_interface,
+            "ajuda_ms": ajuda - base,
+            "consulta_dia_ms": dia - base,
+            "lote": {"pontos": args.pontos, "total_ms": lote - base, "por_ponto_ms": (lote - base) / args.pontos},
+        },
+    }
+    print(json.dumps(saida, indent=2, ensure_ascii=False))
+    sys.exit(0 if saida["dentro_do_alvo"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark de memória e tempo da exportação de registros (exportacao.py)
+
+Para cada tamanho de histórico, carrega a central e mede com tracemalloc o
+pico de memória alocada durante a exportação de todos os registros, em
+CSV (opções brasileiras) e em JSONL. Como as linhas são escritas em fluxo,
+o pico deve ficar praticamente constante enquanto o total de registros cresce.
+
+Uso: python benchmarks/bench_exportacao.py [--tamanhos 25000,100000,400000] [--compacto]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gerador  # noqa: E402
+from central_horas import CentralHorasEstagio  # noqa: E402
+from exportacao import OPCOES_CSV_BR, exportar_registros  # noqa: E402
+
+FORMATOS = {
+    "csv_br": {"formato": "csv", **OPCOES_CSV_BR},
+    "jsonl": {"formato": "jsonl"},
+}
+
+
+def medir_exportacao(central, usuarios, opcoes: dict):
+    """Exporta para /dev/null e retorna (registros, pico em bytes, segundos)"""
+    gc.collect()
+    with open(os.devnull, 'w', encoding='utf-8', newline='') as destino:
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        total = exportar_registros(central, destino, usuarios=usuarios, **opcoes)
+        duracao = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return total, pico, duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanhos", default="25000,100000,400000",
+                        help="quantidades de registros, separadas por vírgula")
+    parser.add_argument("--compacto", action="store_true", help="central com RegistrosColunares")
+    args = parser.parse_args()
+
+    resultados = []
+    for tamanho in (int(valor) for valor in args.tamanhos.split(",")):
+        with tempfile.TemporaryDirectory() as diretorio:
+            arquivo = os.path.join(diretorio, "horas_estagio.json")
+            gerador.gravar_dados(arquivo, gerador.gerar_dados(usuarios=gerador.dimensionar(tamanho),
+                                                              limite=tamanho))
+            central = CentralHorasEstagio(arquivo, compacto=args.compacto)
+            usuarios = list(central.dados["usuarios"])
+
+            resultado = {"registros": tamanho}
+            for nome, opcoes in FORMATOS.items():
+                total, pico, duracao = medir_exportacao(central, usuarios, opcoes)
+                resultado[nome] = {
+                    "exportados": total,
+                    "pico_kb": round(pico / 1024, 1),
+                    "segundos": round(duracao, 3),
+                    "registros_por_segundo": round(total / duracao),
+                }
+            resultados.append(resultado)
+            del central
+
+    print(json.dumps({"compacto": args.compacto, "resultados": resultados}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de inicialização a frio da central de horas
+
+Mede, cada um em um processo Python novo, o tempo de importar o módulo e
+criar a CentralHorasEstagio (que não deve ler o arquivo) e o tempo até a
+primeira consulta com carregamento completo, só do ano atual ou com os
+dados divididos em partições por ano (e uma consulta a um ano frio,
+lido da partição gzip sob demanda).
+
+Uso: python benchmarks/bench_inicializacao.py [--registros N] [--alvo-ms MS]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import gerador  # noqa: E402
+from central_horas import CentralHorasEstagio  # noqa: E402
+
+_MEDIR = """
+import sys, time
+sys.path.insert(0, {raiz!r})
+inicio = time.perf_counter()
+from central_horas import CentralHorasEstagio
+central = CentralHorasEstagio({arquivo!r}, **{opcoes!r})
+pronto = time.perf_counter()
+{consulta}
+fim = time.perf_counter()
+print((pronto - inicio) * 1000, (fim - pronto) * 1000)
+"""
+
+
+def medir(arquivo: str, opcoes: dict, consulta: str):
+    """Executa a medição em um processo novo e retorna (inicializacao_ms, consulta_ms)"""
+    codigo = _MEDIR.format(raiz=RAIZ, arquivo=arquivo, opcoes=opcoes, consulta=consulta)
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    inicializacao, tempo_consulta = map(float, saida.stdout.split())
+    return inicializacao, tempo_consulta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--registros", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--alvo-ms", type=float, default=100.0,
+                        help="tempo máximo de importação + criação da central")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, "horas_estagio.json")
+        dados = gerador.gerar_dados(usuarios=gerador.dimensionar(args.registros), limite=args.registros)
+        gerador.gravar_dados(arquivo, dados)
+        ano_frio = min(int(registro["data"][-4:])
+                       for usuario in dados["usuarios"].values() for registro in usuario["registros"])
+        del dados
+
+        # Cópia dividida por ano: a primeira gravação com partições converte o arquivo
+        particionado = os.path.join(diretorio, "particionado", "horas_estagio.json")
+        os.makedirs(os.path.dirname(particionado))
+        shutil.copy(arquivo, particionado)
+        opcoes_particoes = {"particionar_por_ano": True, "compressao_anos_frios": "gzip"}
+        CentralHorasEstagio(particionado, **opcoes_particoes).salvar_dados()
+
+        cenarios = {
+            "completo": (arquivo, {}, "central.gerar_relatorio_mensal()"),
+            "apenas_ano_atual": (arquivo, {"carregar_apenas_ano_atual": True}, "central.gerar_relatorio_mensal()"),
+            "particionado": (particionado, opcoes_particoes, "central.gerar_relatorio_mensal()"),
+            "particionado_ano_frio": (particionado, opcoes_particoes,
+                                      f"central.gerar_relatorio_anual({ano_frio})"),
+        }
+        resultados = {}
+        for nome, (caminho, opcoes, consulta) in cenarios.items():
+            medicoes = [medir(caminho, opcoes, consulta) for _ in range(args.repeticoes)]
+            resultados[nome] = {
+                "inicializacao_ms": min(m[0] for m in medicoes),
+                "primeira_consulta_ms": min(m[1] for m in medicoes),
+            }
+
+    inicializacao = max(r["inicializacao_ms"] for r in resultados.values())
+    saida = {
+        "benchmark": "inicializacao",
+        "registros": args.registros,
+        "alvo_ms": args.alvo_ms,
+        "dentro_do_alvo": inicializacao <= args.alvo_ms,
+        "resultados": resultados,
+    }
+    print(json.dumps(saida, indent=2, ensure_ascii=False))
+    sys.exit(0 if saida["dentro_do_alvo"] else 1)
+
+
+if __name__ == "__main__":
+    main()
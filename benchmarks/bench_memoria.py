@@ -0,0 +1,69 @@
+"""
+Benchmark de memória dos registros: lista de dicts x RegistrosColunares
+
+Monta N registros no formato do arquivo JSON (como ficam após json.load) e
+mede, com tracemalloc, quanto cada representação ocupa em memória, além do
+tempo do relatório do ano em cada uma.
+
+Uso: python benchmarks/bench_memoria.py [--registros N]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gerador  # noqa: E402
+from armazem_colunar import RegistrosColunares  # noqa: E402
+from central_horas import _somar_meses  # noqa: E402
+
+def medir(construir):
+    """Retorna (objeto, bytes alocados) para a função construtora"""
+    gc.collect()
+    tracemalloc.start()
+    objeto = construir()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objeto, atual
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--registros", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # Os dicts passam por JSON para terem as mesmas strings independentes
+    # que json.load produz ao ler o arquivo
+    dados = gerador.gerar_dados(usuarios=gerador.dimensionar(args.registros), anos=3,
+                                ano_final=2029, limite=args.registros)
+    texto = json.dumps([registro for usuario in dados["usuarios"].values()
+                        for registro in usuario["registros"]])
+    del dados
+    dicts, bytes_dicts = medir(lambda: json.loads(texto))
+    del texto
+    colunas, bytes_colunas = medir(lambda: RegistrosColunares(dicts))
+
+    resultados = {}
+    for nome, registros, memoria in (("dicts", dicts, bytes_dicts), ("colunar", colunas, bytes_colunas)):
+        inicio = time.perf_counter()
+        _somar_meses(registros, 2027, 2029)
+        resultados[nome] = {
+            "bytes": memoria,
+            "bytes_por_registro": round(memoria / args.registros, 1),
+            "somar_meses_ms": round((time.perf_counter() - inicio) * 1000, 1),
+        }
+
+    print(json.dumps({
+        "benchmark": "memoria",
+        "registros": args.registros,
+        "resultados": resultados,
+        "reducao": round(bytes_dicts / bytes_colunas, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
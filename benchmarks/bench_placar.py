@@ -0,0 +1,83 @@
+"""
+Benchmark do placar de janelas móveis (placar.py)
+
+Preenche um placar com o último semestre de um histórico sintético de muitos
+usuários e compara, para cada janela: o top 10 pelo heap contra ordenar
+todos os totais com sorted(), a posição de um usuário pela lista ordenada
+contra contar quem está acima, e o custo de um registro novo e da virada
+do dia.
+
+Uso: python benchmarks/bench_placar.py [--usuarios 5000] [--registros-por-dia 2000]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from placar import JANELAS, Placar  # noqa: E402
+
+
+def cronometrar(funcao, repeticoes: int):
+    """Mediana em ms de `repeticoes` execuções"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return round(statistics.median(tempos), 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=5000)
+    parser.add_argument("--registros-por-dia", type=int, default=2000)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(42)
+    nomes = [f"Estagiário {numero}" for numero in range(args.usuarios)]
+    hoje = [date(2025, 6, 30)]
+    placar = Placar(relogio=lambda: hoje[0])
+    primeiro = hoje[0].toordinal() - max(JANELAS.values()) + 1
+    itens = [(aleatorio.choice(nomes), ordinal, aleatorio.randint(30, 480))
+             for ordinal in range(primeiro, hoje[0].toordinal() + 1)
+             for _ in range(args.registros_por_dia)]
+
+    inicio = time.perf_counter()
+    placar.carregar(itens)
+    resultados = {"registros": len(itens), "carregar_ms": round((time.perf_counter() - inicio) * 1000, 1)}
+
+    for janela in JANELAS:
+        totais = placar._janelas[janela].totais
+        nome = aleatorio.choice(nomes)
+        resultados[janela] = {
+            "usuarios_na_janela": len(totais),
+            "top10_heap_ms": cronometrar(lambda: placar.maiores(janela, 10), args.repeticoes),
+            "top10_sorted_ms": cronometrar(lambda: sorted(totais.items(), key=lambda item: item[1],
+                                                          reverse=True)[:10], args.repeticoes),
+            "posicao_bisect_ms": cronometrar(lambda: placar.posicao(janela, nome), args.repeticoes),
+            "posicao_contagem_ms": cronometrar(
+                lambda: sum(minutos > totais.get(nome, 0) for minutos in totais.values()), args.repeticoes),
+        }
+
+    resultados["adicionar_ms"] = cronometrar(
+        lambda: placar.adicionar(aleatorio.choice(nomes), hoje[0].toordinal(), 60), args.repeticoes * 20)
+
+    def virar_dia():
+        hoje[0] += timedelta(days=1)
+        for _ in range(args.registros_por_dia):
+            placar.adicionar(aleatorio.choice(nomes), hoje[0].toordinal(), 60)
+        placar.maiores("semana", 1)
+
+    resultados["virada_do_dia_ms"] = cronometrar(virar_dia, 10)
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark de gerar_relatorio_periodo com a contagem dividida entre processos
+
+Gera um histórico sintético grande, com muitos usuários, e mede o
+relatório do período inteiro com 1, 2, 4, ... processos (até o número de
+CPUs ou o informado em --processos). Confere que todos os resultados são
+iguais ao serial e imprime o tempo e o ganho de cada quantidade.
+
+Com --limiar, mede em volta de LIMITE_RELATORIO_PARALELO (1/4, 1/2, 1 e 2
+vezes) o serial e o paralelo forçado com 2 processos. Em uma máquina com
+uma só CPU os filhos se revezam nela: o tempo paralelo é o custo fixo de
+abrir os processos (medido com poucos registros) mais todo o trabalho dos
+filhos, e o ganho com P CPUs é estimado como
+serial / (custo fixo + trabalho dos filhos / P).
+
+Uso: python benchmarks/bench_relatorio_paralelo.py [--registros 1000000] [--processos 1,2,4,8] [--compacto]
+     python benchmarks/bench_relatorio_paralelo.py --limiar [--compacto]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gerador  # noqa: E402
+from central_horas import CentralHorasEstagio  # noqa: E402
+
+
+def potencias_ate(limite: int):
+    quantidade = 1
+    while quantidade < limite:
+        yield quantidade
+        quantidade *= 2
+    yield limite
+
+
+def central_sintetica(diretorio: str, registros: int, anos: int, compacto: bool) -> CentralHorasEstagio:
+    """Central já carregada com um histórico sintético de `anos` anos até o ano atual"""
+    arquivo = os.path.join(diretorio, f"horas_{registros}.json")
+    gerador.gravar_dados(arquivo, gerador.gerar_dados(usuarios=gerador.dimensionar(registros, anos), anos=anos,
+                                                      ano_final=date.today().year, limite=registros))
+    central = CentralHorasEstagio(arquivo, compacto=compacto)
+    central.carregar_dados()
+    return central
+
+
+def mediana_relatorio(central, anos: int, processos: int, repeticoes: int, forcar: bool = False) -> float:
+    """Mediana, em ms, de gerar_relatorio_periodo; forcar ignora LIMITE_RELATORIO_PARALELO"""
+    ano_fim = date.today().year
+    central.processos_relatorio = processos
+    if forcar:
+        central.LIMITE_RELATORIO_PARALELO = 0
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        central.gerar_relatorio_periodo(ano_fim - anos + 1, ano_fim)
+        tempos.append(time.perf_counter() - inicio)
+    if forcar:
+        del central.LIMITE_RELATORIO_PARALELO
+    return statistics.median(tempos) * 1000
+
+
+def medir_limiar(args):
+    """Serial e paralelo (2 processos) em volta de LIMITE_RELATORIO_PARALELO, com a estimativa por CPUs"""
+    limite = CentralHorasEstagio.LIMITE_RELATORIO_PARALELO
+    cpus = os.cpu_count() or 1
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        minima = central_sintetica(diretorio, 1000, args.anos, args.compacto)
+        custo_fixo = mediana_relatorio(minima, args.anos, 2, args.repeticoes, forcar=True) - \
+            mediana_relatorio(minima, args.anos, 1, args.repeticoes)
+        for registros in (limite // 4, limite // 2, limite, limite * 2):
+            central = central_sintetica(diretorio, registros, args.anos, args.compacto)
+            serial = mediana_relatorio(central, args.anos, 1, args.repeticoes)
+            paralelo = mediana_relatorio(central, args.anos, 2, args.repeticoes, forcar=True)
+            resultado = {"registros": registros, "serial_ms": round(serial, 1), "paralelo_2_ms": round(paralelo, 1),
+                         "ganho_2": round(serial / paralelo, 2)}
+            if cpus == 1:
+                filhos = paralelo - custo_fixo
+                resultado["filhos_us_por_registro"] = round(filhos * 1000 / registros, 3)
+                resultado["ganho_estimado"] = {
+                    cpus_estimadas: round(serial / (custo_fixo + filhos / cpus_estimadas), 2)
+                    for cpus_estimadas in (2, 4, 8)
+                }
+            resultados.append(resultado)
+    print(json.dumps({
+        "limite_relatorio_paralelo": limite,
+        "cpus": cpus,
+        "compacto": args.compacto,
+        "custo_fixo_ms": round(custo_fixo, 1),
+        "resultados": resultados,
+    }, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--registros", type=int, default=1_000_000)
+    parser.add_argument("--anos", type=int, default=3)
+    parser.add_argument("--processos", help="quantidades de processos, separadas por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--compacto", action="store_true", help="central com RegistrosColunares")
+    parser.add_argument("--limiar", action="store_true", help="mede em volta de LIMITE_RELATORIO_PARALELO")
+    args = parser.parse_args()
+    if args.limiar:
+        medir_limiar(args)
+        return
+
+    if args.processos:
+        quantidades = [int(valor) for valor in args.processos.split(",")]
+    else:
+        quantidades = list(potencias_ate(os.cpu_count() or 1))
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, "horas_estagio.json")
+        ano_fim = date.today().year
+        ano_inicio = ano_fim - args.anos + 1
+        gerador.gravar_dados(arquivo, gerador.gerar_dados(usuarios=gerador.dimensionar(args.registros, args.anos),
+                                                          anos=args.anos, ano_final=ano_fim, limite=args.registros))
+        central = CentralHorasEstagio(arquivo, compacto=args.compacto)
+        central.carregar_dados()
+
+        referencia = None
+        resultados = []
+        for processos in quantidades:
+            central.processos_relatorio = processos
+            tempos = []
+            for _ in range(args.repeticoes):
+                inicio = time.perf_counter()
+                relatorios = central.gerar_relatorio_periodo(ano_inicio, ano_fim)
+                tempos.append(time.perf_counter() - inicio)
+            if referencia is None:
+                referencia = relatorios
+            elif relatorios != referencia:
+                sys.exit(f"Relatório com {processos} processos difere do serial")
+            resultados.append({"processos": processos, "segundos": round(statistics.median(tempos), 3)})
+
+    serial = resultados[0]["segundos"]
+    for resultado in resultados:
+        resultado["ganho"] = round(serial / resultado["segundos"], 2)
+    print(json.dumps({
+        "registros": args.registros,
+        "usuarios": len(central.usuarios),
+        "cpus": os.cpu_count(),
+        "compacto": args.compacto,
+        "resultados": resultados,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
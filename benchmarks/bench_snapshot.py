@@ -0,0 +1,84 @@
+"""
+Benchmark de inicialização: arquivo JSON x snapshot binário (snapshot_binario.py)
+
+Para cada tamanho de histórico, grava os mesmos dados nos dois formatos e,
+em um processo novo para cada medição, cronometra a carga da central
+(carregar_dados, incluindo os contadores) e mede o pico de memória do
+processo.
+
+Uso: python benchmarks/bench_snapshot.py [--tamanhos 100000,400000,1000000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import gerador  # noqa: E402
+from snapshot_binario import json_para_binario  # noqa: E402
+
+# Executado em um processo novo: imprime segundos e pico de memória em KB
+_MEDICAO = """
+import resource, sys, time
+sys.path.insert(0, {raiz!r})
+modo, arquivo = sys.argv[1], sys.argv[2]
+inicio = time.perf_counter()
+from central_horas import CentralHorasEstagio
+CentralHorasEstagio(arquivo, compacto=modo == "compacto").carregar_dados()
+duracao = time.perf_counter() - inicio
+# VmHWM é do próprio processo; ru_maxrss pode herdar o pico do processo pai
+pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+try:
+    with open("/proc/self/status") as status:
+        pico = next(int(linha.split()[1]) for linha in status if linha.startswith("VmHWM:"))
+except OSError:
+    pass
+print(duracao, pico)
+"""
+
+
+def medir(modo: str, arquivo: str, repeticoes: int):
+    """Menor tempo (s) e maior pico de memória (KB) entre as repetições"""
+    tempos, picos = [], []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", _MEDICAO.format(raiz=RAIZ), modo, arquivo],
+                               capture_output=True, text=True, check=True).stdout.split()
+        tempos.append(float(saida[0]))
+        picos.append(int(saida[1]))
+    return {"segundos": round(min(tempos), 3), "pico_mb": round(max(picos) / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanhos", default="100000,400000,1000000",
+                        help="quantidades de registros, separadas por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    resultados = []
+    for tamanho in (int(valor) for valor in args.tamanhos.split(",")):
+        with tempfile.TemporaryDirectory() as diretorio:
+            arquivo_json = os.path.join(diretorio, "horas_estagio.json")
+            arquivo_binario = os.path.join(diretorio, "horas_estagio.bin")
+            gerador.gravar_dados(arquivo_json, gerador.gerar_dados(usuarios=gerador.dimensionar(tamanho),
+                                                                   limite=tamanho))
+            json_para_binario(arquivo_json, arquivo_binario)
+
+            resultados.append({
+                "registros": tamanho,
+                "bytes": {"json": os.path.getsize(arquivo_json), "binario": os.path.getsize(arquivo_binario)},
+                "json": medir("padrao", arquivo_json, args.repeticoes),
+                "json_compacto": medir("compacto", arquivo_json, args.repeticoes),
+                "binario": medir("padrao", arquivo_binario, args.repeticoes),
+                "binario_compacto": medir("compacto", arquivo_binario, args.repeticoes),
+            })
+
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark da detecção de turnos sobrepostos (indice_turnos.py)
+
+Monta o histórico de turnos de um usuário com alguns por dia e mede: a
+conferência de um turno novo no índice (deve ficar constante conforme o
+histórico cresce), a auditoria completa por ordenação e, para comparação,
+a auditoria ingênua que compara todos os pares do mesmo dia.
+
+Uso: python benchmarks/bench_turnos.py [--tamanhos 10000,100000,1000000]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indice_turnos import IndiceTurnos, sobreposicoes  # noqa: E402
+
+
+def gerar_turnos(quantidade: int, aleatorio: random.Random):
+    """Turnos de 1 a 4 horas, quatro por dia em média, alguns sobrepostos"""
+    turnos = []
+    for posicao in range(quantidade):
+        entrada = aleatorio.randrange(6 * 60, 18 * 60)
+        turnos.append((730_000 + posicao // 4, entrada, entrada + aleatorio.randrange(60, 240), posicao))
+    return turnos
+
+
+def auditoria_ingenua(turnos):
+    """Compara cada turno com todos os anteriores do mesmo dia (quadrática no dia)"""
+    por_dia = {}
+    conflitos = 0
+    for dia, entrada, saida, _ in turnos:
+        vistos = por_dia.setdefault(dia, [])
+        conflitos += any(outra_entrada < saida and outra_saida > entrada for outra_entrada, outra_saida in vistos)
+        vistos.append((entrada, saida))
+    return conflitos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanhos", default="10000,100000,1000000",
+                        help="quantidades de turnos no histórico, separadas por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=2000)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(7)
+    resultados = []
+    for tamanho in (int(valor) for valor in args.tamanhos.split(",")):
+        turnos = gerar_turnos(tamanho, aleatorio)
+        inicio = time.perf_counter()
+        indice = IndiceTurnos.construir(turno[:3] for turno in turnos)
+        construir = time.perf_counter() - inicio
+
+        tempos = []
+        for _ in range(args.repeticoes):
+            dia = 730_000 + aleatorio.randrange(tamanho // 4)
+            entrada = aleatorio.randrange(6 * 60, 18 * 60)
+            inicio = time.perf_counter()
+            indice.conflito(dia, entrada, entrada + 60)
+            tempos.append((time.perf_counter() - inicio) * 1_000_000)
+
+        inicio = time.perf_counter()
+        encontrados = len(sobreposicoes(turnos))
+        auditoria = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        auditoria_ingenua(turnos)
+        ingenua = time.perf_counter() - inicio
+
+        resultados.append({
+            "turnos": tamanho,
+            "construir_indice_s": round(construir, 3),
+            "conferir_turno_us": round(statistics.median(tempos), 2),
+            "auditoria_s": round(auditoria, 3),
+            "auditoria_ingenua_s": round(ingenua, 3),
+            "sobrepostos": encontrados,
+        })
+
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
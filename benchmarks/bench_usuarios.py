@@ -0,0 +1,86 @@
+"""
+Benchmark do cadastro de usuários com milhares de estagiários
+
+Gera um histórico sintético com muitos usuários (benchmarks/gerador.py),
+desativa uma parte deles e mede: validação de nomes (adicionar ponto para
+usuários sorteados), cadastro de usuários novos, renomeação e os
+relatórios mensal e anual. A validação deve ficar constante por chamada
+enquanto o número de usuários cresce.
+
+Uso: python benchmarks/bench_usuarios.py [--usuarios 500,5000] [--registros 50000] [--sqlite]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gerador  # noqa: E402
+from central_horas import CentralHorasEstagio  # noqa: E402
+from central_horas_sqlite import CentralHorasSQLite  # noqa: E402
+
+
+def cronometrar(funcao, repeticoes: int):
+    """Mediana em ms de `repeticoes` execuções"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return round(statistics.median(tempos), 4)
+
+
+def montar_central(diretorio: str, usuarios: int, registros: int, sqlite: bool):
+    arquivo = os.path.join(diretorio, "horas_estagio.json")
+    gerador.gravar_dados(arquivo, gerador.gerar_dados(usuarios=usuarios, limite=registros))
+    if not sqlite:
+        return CentralHorasEstagio(arquivo, journal=True)
+    central = CentralHorasSQLite(os.path.join(diretorio, "horas_estagio.db"))
+    central.importar_json(arquivo)
+    return central
+
+
+def medir(usuarios: int, registros: int, sqlite: bool):
+    aleatorio = random.Random(42)
+    with tempfile.TemporaryDirectory() as diretorio:
+        central = montar_central(diretorio, usuarios, registros, sqlite)
+        nomes = central.usuarios
+        for nome in aleatorio.sample(nomes, len(nomes) // 10):
+            central.desativar_usuario(nome)
+        ativos = central.usuarios
+
+        novos, renomeaveis = iter(range(200)), iter(range(50))
+        resultado = {
+            "usuarios": usuarios,
+            "ativos": len(ativos),
+            "validar_usuario_ms": cronometrar(lambda: central._validar_usuario(aleatorio.choice(ativos)), 2000),
+            "ponto_ms": cronometrar(
+                lambda: central.adicionar_minutos_passados(aleatorio.choice(ativos), "10/03/2025", 30), 200),
+            "cadastrar_usuario_ms": cronometrar(lambda: central.cadastrar_usuario(f"Novo {next(novos)}"), 200),
+            "renomear_usuario_ms": cronometrar(
+                lambda: (lambda i: central.renomear_usuario(f"Novo {i}", f"Renomeado {i}"))(next(renomeaveis)), 50),
+            "relatorio_mensal_ms": cronometrar(lambda: central.gerar_relatorio_mensal(3, 2025), 20),
+            "relatorio_anual_ms": cronometrar(lambda: central.gerar_relatorio_anual(2025), 5),
+        }
+        central.fechar()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", default="500,5000", help="quantidades de usuários, separadas por vírgula")
+    parser.add_argument("--registros", type=int, default=50_000)
+    parser.add_argument("--sqlite", action="store_true", help="mede a CentralHorasSQLite")
+    args = parser.parse_args()
+
+    resultados = [medir(int(valor), args.registros, args.sqlite) for valor in args.usuarios.split(",")]
+    print(json.dumps({"sqlite": args.sqlite, "registros": args.registros, "resultados": resultados}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Teste de carga do servidor_horas em localhost
+
+Sobe o servidor em um processo próprio, sobre um arquivo com histórico
+sintético (ou usa um já em execução, com --url), e dispara requisições
+de vários clientes keep-alive ao mesmo tempo: uma mistura de relatórios,
+totais e pontos. Imprime requisições por segundo e percentis de latência
+por tipo de requisição.
+
+Uso: python benchmarks/carga_servidor.py [--clientes N] [--duracao S] [--fracao-escrita F]
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import gerador  # noqa: E402
+from cliente_horas import ClienteHoras, ErroServidor  # noqa: E402
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def subir_servidor(arquivo: str, porta: int):
+    """Inicia o servidor em outro processo e espera ele responder"""
+    processo = subprocess.Popen(
+        [sys.executable, os.path.join(RAIZ, "servidor_horas.py"), "--arquivo", arquivo, "--porta", str(porta)],
+        stdout=subprocess.DEVNULL,
+    )
+    cliente = ClienteHoras(f"http://127.0.0.1:{porta}", timeout=1)
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        try:
+            cliente._requisitar("GET", "/saude")
+            cliente.fechar()
+            return processo
+        except ErroServidor:
+            if processo.poll() is not None:
+                raise RuntimeError("Servidor terminou antes de responder")
+            time.sleep(0.1)
+    processo.kill()
+    raise RuntimeError("Servidor não respondeu a tempo")
+
+
+def percentil(ordenados, fracao: float) -> float:
+    return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]
+
+
+def cliente_de_carga(url: str, semente: int, fim: float, fracao_escrita: float, latencias: dict, erros: list):
+    """Laço de um cliente: sorteia e cronometra requisições até o fim"""
+    aleatorio = random.Random(semente)
+    cliente = ClienteHoras(url)
+    usuarios = gerador.USUARIOS_PADRAO
+    locais = {}
+    while time.perf_counter() < fim:
+        usuario = aleatorio.choice(usuarios)
+        sorteio = aleatorio.random()
+        if sorteio < fracao_escrita:
+            tipo = "ponto"
+            chamada = lambda: cliente.adicionar_minutos_passados(usuario, "10/03/2025", 30, "carga")  # noqa: E731
+        elif sorteio < fracao_escrita + (1 - fracao_escrita) / 3:
+            tipo = "relatorio_mensal"
+            chamada = lambda: cliente.gerar_relatorio_mensal(3, 2025)  # noqa: E731
+        elif sorteio < fracao_escrita + 2 * (1 - fracao_escrita) / 3:
+            tipo = "relatorio_anual"
+            chamada = lambda: cliente.gerar_relatorio_anual(2025)  # noqa: E731
+        else:
+            tipo = "minutos_mes"
+            chamada = lambda: cliente.calcular_minutos_mes(usuario, 3, 2025)  # noqa: E731
+        inicio = time.perf_counter()
+        try:
+            chamada()
+        except ErroServidor as e:
+            erros.append(str(e))
+            continue
+        locais.setdefault(tipo, []).append((time.perf_counter() - inicio) * 1000)
+    cliente.fechar()
+    for tipo, valores in locais.items():
+        latencias.setdefault(tipo, []).extend(valores)
+
+
+def resumir(valores):
+    ordenados = sorted(valores)
+    return {
+        "requisicoes": len(ordenados),
+        "media_ms": statistics.fmean(ordenados),
+        "p50_ms": percentil(ordenados, 0.50),
+        "p95_ms": percentil(ordenados, 0.95),
+        "p99_ms": percentil(ordenados, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="servidor já em execução (senão sobe um local)")
+    parser.add_argument("--registros", type=int, default=50_000, help="histórico do servidor local")
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--duracao", type=float, default=10.0, help="segundos de carga")
+    parser.add_argument("--fracao-escrita", type=float, default=0.1)
+    args = parser.parse_args()
+
+    processo = None
+    with tempfile.TemporaryDirectory() as diretorio:
+        url = args.url
+        if url is None:
+            arquivo = os.path.join(diretorio, "horas_estagio.json")
+            gerador.gravar_dados(arquivo, gerador.gerar_dados(limite=args.registros))
+            porta = porta_livre()
+            processo = subir_servidor(arquivo, porta)
+            url = f"http://127.0.0.1:{porta}"
+
+        try:
+            latencias, erros = {}, []
+            fim = time.perf_counter() + args.duracao
+            threads = [
+                threading.Thread(target=cliente_de_carga,
+                                 args=(url, semente, fim, args.fracao_escrita, latencias, erros))
+                for semente in range(args.clientes)
+            ]
+            inicio = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            duracao = time.perf_counter() - inicio
+        finally:
+            if processo is not None:
+                processo.terminate()
+                processo.wait()
+
+    todas = [valor for valores in latencias.values() for valor in valores]
+    resultado = {
+        "clientes": args.clientes,
+        "duracao_s": duracao,
+        "requisicoes_por_segundo": len(todas) / duracao,
+        "erros": len(erros),
+        "geral": resumir(todas) if todas else None,
+        "por_tipo": {tipo: resumir(valores) for tipo, valores in sorted(latencias.items())},
+    }
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Gerador determinístico de dados sintéticos para a central de horas
+
+Produz o mesmo conteúdo de um horas_estagio.json real: N usuários com
+registros nos dias úteis de Y anos (um ou dois turnos por dia), descrições
+repetidas e uma fração de registros antigos que só têm o campo "horas".
+A mesma semente gera sempre os mesmos dados.
+"""
+import json
+import math
+import random
+from datetime import date, datetime, timedelta
+
+USUARIOS_PADRAO = ["Márcio", "Samuel", "Caio", "Robson"]
+
+DESCRICOES = [
+    "",
+    "Atendimento no balcão",
+    "Organização de documentos",
+    "Reunião de equipe",
+    "Apoio em evento",
+    "Levantamento de dados",
+]
+
+# Média de registros por usuário por ano: ~261 dias úteis, 90% deles
+# trabalhados, com 1 turno (2/3 das vezes) ou 2 turnos
+REGISTROS_POR_ANO = 261 * 0.9 * 4 / 3
+
+
+def nomes_usuarios(quantidade: int):
+    """Os quatro usuários padrão seguidos de estagiários numerados"""
+    extras = [f"Estagiário {i:05d}" for i in range(1, max(0, quantidade - len(USUARIOS_PADRAO)) + 1)]
+    return (USUARIOS_PADRAO + extras)[:quantidade]
+
+
+def dimensionar(total_registros: int, anos: int = 3):
+    """Quantidade de usuários para chegar a cerca de total_registros em `anos` anos"""
+    # Margem de 5% para compensar a variação aleatória; use com limite=
+    return max(1, math.ceil(total_registros * 1.05 / (anos * REGISTROS_POR_ANO)))
+
+
+def gerar_registros(anos: int, ano_final: int, aleatorio: random.Random, fracao_legado: float):
+    """Gera os registros de um usuário, em ordem de data"""
+    dia = date(ano_final - anos + 1, 1, 1)
+    fim = date(ano_final, 12, 31)
+    while dia <= fim:
+        if dia.weekday() < 5 and aleatorio.random() < 0.9:
+            for turno in range(aleatorio.choice((1, 1, 2))):
+                minutos = aleatorio.randint(120, 300)
+                if aleatorio.random() < fracao_legado:
+                    yield {"data": dia.strftime("%d/%m/%Y"), "horas": round(minutos / 60, 2)}
+                    continue
+                momento = datetime(dia.year, dia.month, dia.day, 12 + 6 * turno,
+                                   aleatorio.randint(0, 59), aleatorio.randint(0, 59),
+                                   aleatorio.randint(0, 999999))
+                yield {
+                    "data": dia.strftime("%d/%m/%Y"),
+                    "minutos": minutos,
+                    "horas": round(minutos / 60, 2),
+                    "descricao": aleatorio.choice(DESCRICOES),
+                    "timestamp": momento.isoformat()
+                }
+        dia += timedelta(days=1)
+
+
+def gerar_dados(usuarios: int = 4, anos: int = 3, ano_final: int = None, semente: int = 42,
+                fracao_legado: float = 0.05, limite: int = None):
+    """
+    Gera a estrutura completa de dados da central
+
+    Args:
+        usuarios (int): Quantidade de usuários
+        anos (int): Anos de histórico, terminando em ano_final
+        ano_final (int): Último ano com registros (padrão: ano atual)
+        semente (int): Semente do gerador aleatório
+        fracao_legado (float): Fração de registros só com "horas"
+        limite (int): Total máximo de registros (corta o último usuário)
+
+    Returns:
+        dict: Dados no formato do horas_estagio.json
+    """
+    ano_final = ano_final if ano_final is not None else date.today().year
+    aleatorio = random.Random(semente)
+    dados = {"usuarios": {}, "ultima_atualizacao": None}
+    total = 0
+    for nome in nomes_usuarios(usuarios):
+        registros = []
+        for registro in gerar_registros(anos, ano_final, aleatorio, fracao_legado):
+            if limite is not None and total >= limite:
+                break
+            registros.append(registro)
+            total += 1
+        dados["usuarios"][nome] = {"registros": registros}
+    return dados
+
+
+def gravar_dados(caminho: str, dados: dict):
+    """Grava os dados como a central grava o arquivo (indentado, UTF-8)"""
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, indent=4, ensure_ascii=False)
+
+
+def contar_registros(dados: dict) -> int:
+    """Total de registros em todos os usuários"""
+    return sum(len(usuario["registros"]) for usuario in dados["usuarios"].values())
@@ -0,0 +1,96 @@
+"""
+Teste de estresse de vários processos gravando no mesmo arquivo de dados
+
+Cada processo cria a sua CentralHorasEstagio(multiprocesso=True) sobre o
+mesmo horas_estagio.json e registra pontos ao mesmo tempo que os outros.
+O journal é pequeno para forçar compactações concorrentes. No fim, uma
+central nova confere que cada ponto aparece exatamente uma vez e que os
+contadores batem com os registros.
+
+Uso: python benchmarks/stress_multiprocesso.py [--processos N] [--registros N]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from central_horas import CentralHorasEstagio  # noqa: E402
+
+USUARIOS = ("Márcio", "Samuel", "Caio", "Robson")
+
+
+def bater_pontos(arquivo: str, processo: int, registros: int, limite_journal: int, largada):
+    """Registra pontos identificados por "p<processo>-<n>" na descrição"""
+    central = CentralHorasEstagio(arquivo, multiprocesso=True, limite_journal=limite_journal,
+                                  compacto=processo % 2 == 1)
+    largada.wait()
+    for numero in range(registros):
+        usuario = USUARIOS[(processo + numero) % len(USUARIOS)]
+        data = f"{numero % 28 + 1:02d}/{numero % 12 + 1:02d}/2025"
+        if numero % 10 == 9:
+            central.registrar_lote([{"nome": usuario, "data": data, "minutos": 15,
+                                     "descricao": f"p{processo}-{numero}"}])
+        else:
+            central.registrar_minutos(usuario, data, 15, f"p{processo}-{numero}")
+        if numero % 25 == 0:
+            central.gerar_relatorio_mensal(1, 2025)  # leitura concorrente, sincroniza
+    central.fechar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processos", type=int, default=8)
+    parser.add_argument("--registros", type=int, default=300, help="pontos por processo")
+    parser.add_argument("--limite-journal", type=int, default=16 * 1024,
+                        help="bytes do journal que disparam a compactação")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, "horas_estagio.json")
+        contexto = multiprocessing.get_context("spawn")
+        largada = contexto.Event()
+        processos = [
+            contexto.Process(target=bater_pontos,
+                             args=(arquivo, numero, args.registros, args.limite_journal, largada))
+            for numero in range(args.processos)
+        ]
+        for processo in processos:
+            processo.start()
+        time.sleep(1)  # deixa os processos subirem antes da largada
+        inicio = time.perf_counter()
+        largada.set()
+        for processo in processos:
+            processo.join()
+        duracao = time.perf_counter() - inicio
+
+        falhas = [processo.exitcode for processo in processos if processo.exitcode != 0]
+        central = CentralHorasEstagio(arquivo, multiprocesso=True)
+        descricoes = Counter(
+            registro["descricao"]
+            for usuario in central.dados["usuarios"].values()
+            for registro in usuario["registros"]
+        )
+        esperadas = {f"p{processo}-{numero}"
+                     for processo in range(args.processos) for numero in range(args.registros)}
+        perdidas = esperadas - descricoes.keys()
+        duplicadas = [descricao for descricao, vezes in descricoes.items() if vezes > 1]
+        divergencias = central.verificar_consistencia()
+        central.fechar()
+
+    total = args.processos * args.registros
+    print(f"{total} pontos de {args.processos} processos em {duracao:.2f} s "
+          f"({total / duracao:.0f} pontos/s)")
+    print(f"processos com erro: {len(falhas)}; perdidos: {len(perdidas)}; "
+          f"duplicados: {len(duplicadas)}; divergências nos contadores: {len(divergencias)}")
+    if falhas or perdidas or duplicadas or divergencias:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import marshal
+import threading
+from collections import OrderedDict
+
+
+class CacheRelatorios:
+    """
+    Cache LRU de relatórios prontos, marcados com a versão dos dados
+
+    Cada entrada guarda a versão com que o relatório foi gerado; se a versão
+    pedida for outra, a entrada está velha e conta como falta. Os relatórios
+    ficam serializados com marshal: cada leitura devolve uma cópia nova, e
+    quem a altera não estraga o que está no cache.
+    """
+
+    def __init__(self, capacidade: int = 64):
+        """
+        Args:
+            capacidade (int): Máximo de relatórios guardados; os usados há
+                mais tempo saem primeiro
+        """
+        self.capacidade = capacidade
+        self._entradas = OrderedDict()  # chave -> (versão, relatório serializado)
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+
+    def obter(self, chave, versao):
+        """Cópia do relatório guardado com essa versão, ou None"""
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[0] != versao:
+                if entrada is not None:
+                    del self._entradas[chave]
+                self.faltas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            conteudo = entrada[1]
+        return marshal.loads(conteudo)
+
+    def guardar(self, chave, versao, relatorio: dict):
+        """Guarda uma cópia do relatório, descartando o menos usado se passar da capacidade"""
+        conteudo = marshal.dumps(relatorio)
+        with self._trava:
+            self._entradas[chave] = (versao, conteudo)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+                self.descartes += 1
+
+    def limpar(self):
+        """Descarta todas as entradas, mantendo os contadores"""
+        with self._trava:
+            self._entradas.clear()
+
+    def estatisticas(self) -> dict:
+        """Acertos, faltas, descartes por LRU e ocupação"""
+        with self._trava:
+            consultas = self.acertos + self.faltas
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acertos": self.acertos / consultas if consultas else 0.0,
+                "descartes": self.descartes,
+                "entradas": len(self._entradas),
+                "capacidade": self.capacidade,
+            }
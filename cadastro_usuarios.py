@@ -0,0 +1,178 @@
+from datetime import datetime
+
+
+class CadastroUsuarios:
+    """
+    Cadastro de estagiários com identificadores estáveis
+
+    Envolve o dict guardado em dados["cadastro"] no arquivo:
+
+        {"proximo_id": 5, "usuarios": {"1": {"nome": "Márcio", "ativo": true, ...}}}
+
+    e mantém ao lado um índice de nome para id, para que validar um nome
+    seja O(1) mesmo com milhares de usuários. Toda alteração é descrita por
+    uma entrada (dict) que pode ir para o journal e ser reaplicada depois
+    com aplicar().
+    """
+
+    OPERACOES = ("cadastrar", "desativar", "reativar", "renomear")
+
+    def __init__(self, dados_cadastro: dict):
+        self._dados = dados_cadastro
+        self._id_por_nome = {usuario["nome"]: int(chave) for chave, usuario in dados_cadastro["usuarios"].items()}
+        self._listas = None
+
+    @staticmethod
+    def migrar(dados: dict, usuarios_padrao=()):
+        """
+        Cria dados["cadastro"] em arquivos anteriores ao cadastro
+
+        Os usuários padrão recebem os primeiros ids, na ordem dada, e os
+        demais que já têm registros no arquivo vêm em seguida; todos ativos.
+        """
+        if "cadastro" in dados:
+            return
+        for nome in usuarios_padrao:
+            dados["usuarios"].setdefault(nome, {"registros": []})
+        nomes = list(usuarios_padrao) + [nome for nome in dados["usuarios"] if nome not in usuarios_padrao]
+        dados["cadastro"] = {
+            "proximo_id": len(nomes) + 1,
+            "usuarios": {
+                str(numero): {"nome": nome, "ativo": True}
+                for numero, nome in enumerate(nomes, 1)
+            },
+        }
+
+    def id_de(self, nome: str):
+        """Id do usuário com esse nome, ativo ou não, ou None"""
+        return self._id_por_nome.get(nome)
+
+    def nome_de(self, id_usuario: int):
+        """Nome atual do usuário com esse id, ou None"""
+        usuario = self._dados["usuarios"].get(str(id_usuario))
+        return usuario["nome"] if usuario is not None else None
+
+    def existe(self, nome: str) -> bool:
+        """Verifica se o nome está cadastrado, ativo ou não"""
+        return nome in self._id_por_nome
+
+    def ativo(self, nome: str) -> bool:
+        """Verifica se o nome pertence a um usuário cadastrado e ativo"""
+        id_usuario = self._id_por_nome.get(nome)
+        return id_usuario is not None and self._dados["usuarios"][str(id_usuario)]["ativo"]
+
+    def nomes_ativos(self) -> list:
+        """Nomes dos usuários ativos, por ordem de id"""
+        return self._nomes()[0]
+
+    def nomes_inativos(self) -> list:
+        """Nomes dos usuários desativados, por ordem de id"""
+        return self._nomes()[1]
+
+    def _nomes(self):
+        """(ativos, inativos), refeitos só depois de uma alteração"""
+        if self._listas is None:
+            ativos, inativos = [], []
+            for _, usuario in self._ordenados():
+                (ativos if usuario["ativo"] else inativos).append(usuario["nome"])
+            self._listas = (ativos, inativos)
+        return self._listas
+
+    def listar(self, incluir_inativos: bool = False) -> list:
+        """Usuários como dicts com id, nome e ativo, por ordem de id"""
+        return [
+            {"id": id_usuario, "nome": usuario["nome"], "ativo": usuario["ativo"]}
+            for id_usuario, usuario in self._ordenados()
+            if incluir_inativos or usuario["ativo"]
+        ]
+
+    def _ordenados(self):
+        return sorted((int(chave), usuario) for chave, usuario in self._dados["usuarios"].items())
+
+    def preparar(self, operacao: str, nome: str, novo_nome: str = None) -> dict:
+        """
+        Valida uma alteração e monta a entrada que a descreve, sem aplicá-la
+
+        Args:
+            operacao (str): "cadastrar", "desativar", "reativar" ou "renomear"
+            nome (str): Nome do usuário (o novo, ao cadastrar)
+            novo_nome (str): Novo nome, ao renomear
+
+        Returns:
+            dict: Entrada para aplicar() e para o journal
+
+        Raises:
+            ValueError: Nome vazio, repetido ou inexistente
+        """
+        if operacao not in self.OPERACOES:
+            raise ValueError(f"Operação de cadastro {operacao} não existe")
+        if operacao == "cadastrar":
+            self._validar_nome_livre(nome)
+            return {"tipo": "cadastro", "operacao": operacao, "id": self._dados["proximo_id"], "nome": nome,
+                    "em": datetime.now().isoformat()}
+
+        id_usuario = self._id_por_nome.get(nome)
+        if id_usuario is None:
+            raise ValueError(f"Usuário {nome} não encontrado")
+        entrada = {"tipo": "cadastro", "operacao": operacao, "id": id_usuario, "em": datetime.now().isoformat()}
+        if operacao == "renomear":
+            self._validar_nome_livre(novo_nome)
+            entrada["nome"] = novo_nome
+        elif self._dados["usuarios"][str(id_usuario)]["ativo"] == (operacao == "reativar"):
+            raise ValueError(f"Usuário {nome} já está {'ativo' if operacao == 'reativar' else 'inativo'}")
+        return entrada
+
+    def _validar_nome_livre(self, nome):
+        if not isinstance(nome, str) or not nome.strip():
+            raise ValueError("Nome do usuário não pode ser vazio")
+        if nome != nome.strip():
+            raise ValueError("Nome do usuário não pode começar nem terminar com espaços")
+        if nome in self._id_por_nome:
+            raise ValueError(f"Já existe um usuário chamado {nome}")
+
+    def aplicar(self, entrada: dict):
+        """
+        Aplica uma entrada de cadastro (de preparar() ou do journal)
+
+        Returns:
+            str: Nome anterior, quando a entrada é uma renomeação; senão None
+        """
+        self._listas = None
+        chave = str(entrada["id"])
+        operacao = entrada["operacao"]
+        if operacao == "cadastrar":
+            self._dados["usuarios"][chave] = {"nome": entrada["nome"], "ativo": True, "desde": entrada.get("em")}
+            self._dados["proximo_id"] = max(self._dados["proximo_id"], entrada["id"] + 1)
+            self._id_por_nome[entrada["nome"]] = entrada["id"]
+        elif operacao in ("desativar", "reativar"):
+            self._dados["usuarios"][chave]["ativo"] = operacao == "reativar"
+        elif operacao == "renomear":
+            usuario = self._dados["usuarios"][chave]
+            anterior = usuario["nome"]
+            usuario["nome"] = entrada["nome"]
+            del self._id_por_nome[anterior]
+            self._id_por_nome[entrada["nome"]] = entrada["id"]
+            return anterior
+        return None
+
+    def diferencas(self, outro_cadastro: dict):
+        """
+        Entradas que levam este cadastro ao estado de outro (mais recente)
+
+        Usado para acompanhar um arquivo gravado por outro processo.
+        """
+        entradas = []
+        for chave, usuario in sorted(outro_cadastro["usuarios"].items(), key=lambda item: int(item[0])):
+            atual = self._dados["usuarios"].get(chave)
+            id_usuario = int(chave)
+            if atual is None:
+                entradas.append({"tipo": "cadastro", "operacao": "cadastrar", "id": id_usuario,
+                                 "nome": usuario["nome"], "em": usuario.get("desde")})
+                atual = {"nome": usuario["nome"], "ativo": True}
+            elif atual["nome"] != usuario["nome"]:
+                entradas.append({"tipo": "cadastro", "operacao": "renomear", "id": id_usuario,
+                                 "nome": usuario["nome"]})
+            if atual["ativo"] != usuario["ativo"]:
+                entradas.append({"tipo": "cadastro", "id": id_usuario,
+                                 "operacao": "reativar" if usuario["ativo"] else "desativar"})
+        return entradas
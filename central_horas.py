@@ -1,39 +1,1352 @@
+import atexit
+import csv
 import json
+import multiprocessing
 import os
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+from armazem_colunar import RegistrosColunares
+from cache_relatorios import CacheRelatorios
+from cadastro_usuarios import CadastroUsuarios
+from indice_datas import IndiceDatas
+from indice_turnos import IndiceTurnos, formatar_horario, sobreposicoes, turno_registro
+from instrumentacao import Instrumentacao
+from particoes_anuais import (COMPRESSOES, FORMATO_MANIFESTO, caminho_particao, converter_particao, eh_manifesto,
+                              gravar_particao, ler_particao, remover_particao)
+from placar import JANELAS, Placar
+from persistencia import (GravadorAssincrono, Journal, ReservaArquivo, TravaArquivo, assinatura_arquivo,
+                          caminho_journal, caminho_trava, escrever_atomico)
+from snapshot_binario import eh_snapshot_binario, ler_snapshot, serializar_snapshot
+
+def _minutos_registro(registro: dict) -> int:
+    """Minutos de um registro; registros antigos só guardam as horas"""
+    return registro.get("minutos", int(registro["horas"] * 60))
+
+def _chave_data(data: str):
+    """Converte uma data DD/MM/AAAA em (ano, mes, dia)"""
+    data_convertida = datetime.strptime(data, "%d/%m/%Y")
+    return data_convertida.year, data_convertida.month, data_convertida.day
+
+def _ordinal_data(data: str) -> int:
+    """Converte uma data DD/MM/AAAA no seu ordinal (dias desde 01/01/0001)"""
+    return date(*_chave_data(data)).toordinal()
+
+def _ordinal_limite(valor) -> int:
+    """Ordinal de um limite de período dado como DD/MM/AAAA, date ou datetime"""
+    if isinstance(valor, str):
+        try:
+            return _ordinal_data(valor)
+        except ValueError:
+            raise ValueError(f"Data inválida: {valor!r}. Use DD/MM/AAAA")
+    if isinstance(valor, datetime):
+        valor = valor.date()
+    if isinstance(valor, date):
+        return valor.toordinal()
+    raise ValueError(f"Data inválida: {valor!r}. Use DD/MM/AAAA ou date")
+
+def _chave_ordinal(ordinal: int):
+    """Converte o ordinal de uma data em (ano, mes, dia)"""
+    data = date.fromordinal(ordinal)
+    return data.year, data.month, data.day
+
+class Registro(dict):
+    """
+    Registro no formato do arquivo (um dict) que carrega a data já convertida
+
+    `chave` (ano, mes, dia) e `dia` (ordinal) são calculados uma vez, na
+    inclusão ou na carga, e ficam fora do dict: não vão para o JSON nem
+    entram na comparação com outros registros.
+    """
+    __slots__ = ("chave", "dia")
+
+def _preparar_registro(registro, datas: dict = None) -> Registro:
+    """
+    Registro com a data convertida a partir de um dict no formato do arquivo
+
+    Args:
+        datas (dict): DD/MM/AAAA -> (chave, ordinal) já convertidos na mesma
+            carga, para que cada data distinta passe por strptime uma vez
+    """
+    data = registro["data"]
+    convertida = datas.get(data) if datas is not None else None
+    if convertida is None:
+        chave = _chave_data(data)
+        convertida = (chave, date(*chave).toordinal())
+        if datas is not None:
+            datas[data] = convertida
+    novo = Registro(registro)
+    novo.chave, novo.dia = convertida
+    return novo
+
+def _preparar_registros(dados: dict):
+    """Troca os dicts de registros lidos do disco por Registro (colunas já guardam o ordinal)"""
+    datas = {}
+    for usuario in dados["usuarios"].values():
+        registros = usuario["registros"]
+        if not isinstance(registros, RegistrosColunares):
+            usuario["registros"] = [
+                registro if isinstance(registro, Registro) else _preparar_registro(registro, datas)
+                for registro in registros
+            ]
+
+def _chave_registro(registro):
+    """(ano, mes, dia) do registro: a guardada nele ou, em um dict comum, convertida agora"""
+    try:
+        return registro.chave
+    except AttributeError:
+        return _chave_data(registro["data"])
+
+def _dia_registro(registro) -> int:
+    """Ordinal da data do registro: o guardado nele ou, em um dict comum, convertido agora"""
+    try:
+        return registro.dia
+    except AttributeError:
+        return _ordinal_data(registro["data"])
+
+def _somar_meses(registros, ano_inicio: int, ano_fim: int):
+    """
+    Soma os minutos dos registros por mês em uma única passada
+
+    Returns:
+        list: 12 posições por ano do período; a posição de (ano, mes) é
+        (ano - ano_inicio) * 12 + mes - 1
+    """
+    if isinstance(registros, RegistrosColunares):
+        return registros.somar_meses(ano_inicio, ano_fim)
+    
+    meses = [0] * (12 * (ano_fim - ano_inicio + 1))
+    for registro in registros:
+        ano, mes, _ = _chave_registro(registro)
+        if ano_inicio <= ano <= ano_fim:
+            meses[(ano - ano_inicio) * 12 + mes - 1] += _minutos_registro(registro)
+    return meses
+
+# Registros lidos pelos processos do relatório paralelo. Com fork, os filhos
+# herdam esta referência e nada precisa ser serializado para eles
+_registros_compartilhados = {}
+
+def _somar_meses_compartilhados(nomes, ano_inicio: int, ano_fim: int):
+    """Executado nos processos filhos (fork): soma os meses dos usuários herdados"""
+    return {nome: _somar_meses(_registros_compartilhados[nome], ano_inicio, ano_fim) for nome in nomes}
+
+def _fork_seguro() -> bool:
+    """
+    Indica se os processos do relatório podem ser criados com fork agora
+
+    Só com uma única thread viva: um fork com outras threads (gravação
+    assíncrona, servidor) pode herdar travas presas por elas. Sem fork não há
+    relatório paralelo: serializar os registros para forkserver/spawn custa
+    mais do que contá-los (ver benchmarks/bench_relatorio_paralelo.py).
+    """
+    return "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+def _dividir_usuarios(tamanhos: dict, partes: int):
+    """Reparte os usuários em lotes com quantidades de registros parecidas"""
+    lotes = [[] for _ in range(partes)]
+    cargas = [0] * partes
+    for nome in sorted(tamanhos, key=tamanhos.get, reverse=True):
+        menor = cargas.index(min(cargas))
+        lotes[menor].append(nome)
+        cargas[menor] += tamanhos[nome]
+    return [lote for lote in lotes if lote]
+
+def _serializar(objeto):
+    """Converte para JSON os registros guardados em colunas"""
+    if isinstance(objeto, RegistrosColunares):
+        return objeto.para_dicts()
+    if hasattr(objeto, "para_dict"):
+        return objeto.para_dict()
+    raise TypeError(f"Objeto do tipo {type(objeto).__name__} não é serializável em JSON")
+
+class ErroLote(ValueError):
+    """Lote rejeitado na validação; erros traz (linha, mensagem) de cada problema"""
+
+    def __init__(self, erros):
+        self.erros = erros
+        resumo = "; ".join(f"linha {linha}: {mensagem}" for linha, mensagem in erros[:5])
+        if len(erros) > 5:
+            resumo += f"; ... (+{len(erros) - 5})"
+        super().__init__(f"{len(erros)} registro(s) inválido(s) - {resumo}")
+
+
+def _turnos_registros(registros):
+    """(ordinal do dia, entrada, saida, posição) de cada registro de turno, dicts ou colunas"""
+    if isinstance(registros, RegistrosColunares):
+        yield from registros.turnos()
+        return
+    for posicao, registro in enumerate(registros):
+        turno = turno_registro(registro)
+        if turno is not None:
+            yield _dia_registro(registro), turno[0], turno[1], posicao
 
 class CentralHorasEstagio:
-    def __init__(self, arquivo_dados: str = "horas_estagio.json"):
+    # Cadastrados automaticamente em um arquivo novo (ou anterior ao cadastro)
+    USUARIOS_PADRAO = ("Márcio", "Samuel", "Caio", "Robson")
+
+    # Abaixo disso, abrir os processos custa mais do que contar os registros.
+    # Medido com bench_relatorio_paralelo.py --limiar (máquina de uma CPU) em
+    # 200 mil registros: 55 ms serial, 5 ms fixos para abrir os processos e
+    # 0,42 us por registro nos filhos (0,29 us em modo compacto). Ganho
+    # estimado: 1,2x com 2 CPUs e 2,1x com 4 (compacto: 1,5x e 2,7x)
+    LIMITE_RELATORIO_PARALELO = 200_000
+
+    # O que fazer com um turno duplicado ou sobreposto a outro do mesmo dia
+    POLITICAS_TURNOS = ("rejeitar", "sinalizar", "permitir")
+
+    # Métodos cronometrados quando a instrumentação está ligada
+    METODOS_INSTRUMENTADOS = (
+        "carregar_dados", "_completar_carga", "_carregar_anos", "salvar_dados", "_gravar_arquivo",
+        "_incluir_registros", "_registrar_minutos", "registrar_lote", "importar_registros",
+        "calcular_minutos_dia", "calcular_minutos_mes", "calcular_minutos_ano",
+        "calcular_minutos_totais", "gerar_relatorio_mensal", "gerar_relatorio_anual",
+        "gerar_relatorio_periodo", "ranking_janela", "get_registros_usuario",
+    )
+
+    def __init__(self, arquivo_dados: str = "horas_estagio.json", journal: bool = False,
+                 limite_journal: int = 1024 * 1024, carregar_apenas_ano_atual: bool = False,
+                 escrita_assincrona: bool = False, intervalo_escrita: float = 0.5,
+                 tamanho_fila_escrita: int = 64, compacto: bool = False,
+                 instrumentar: bool = False, arquivo_estatisticas: str = None,
+                 intervalo_estatisticas: float = 60.0, multiprocesso: bool = False,
+                 processos_relatorio: int = 1, snapshot_binario: bool = False,
+                 cache_relatorios: int = 64, turnos_sobrepostos: str = "rejeitar",
+                 particionar_por_ano: bool = False, compressao_anos_frios: str = None,
+                 exclusivo: bool = False):
+        """
+        Os dados não são lidos aqui: o arquivo é carregado no primeiro acesso.
+        
+        Args:
+            arquivo_dados (str): Caminho do arquivo JSON com os dados
+            journal (bool): Anexa cada novo registro a um journal em vez de
+                reescrever o arquivo inteiro a cada ponto
+            limite_journal (int): Tamanho em bytes a partir do qual o journal
+                é compactado de volta no arquivo principal
+            carregar_apenas_ano_atual (bool): Mantém em memória só os registros
+                do ano corrente; os demais anos são trazidos quando uma
+                consulta ou gravação precisar deles
+            escrita_assincrona (bool): salvar_dados só agenda a gravação, feita
+                por uma thread própria; use flush()/fechar() antes de sair
+            intervalo_escrita (float): Segundos em que gravações seguidas são
+                agrupadas em uma só
+            tamanho_fila_escrita (int): Gravações pendentes antes de
+                salvar_dados passar a esperar
+            compacto (bool): Guarda os registros em colunas (RegistrosColunares)
+                em vez de uma lista de dicts, ocupando bem menos memória
+            instrumentar (bool): Mede chamadas, latências e bytes gravados,
+                consultáveis em stats(); desligado, não há custo algum
+            arquivo_estatisticas (str): Com a instrumentação ligada, grava
+                stats() neste arquivo JSON periodicamente
+            intervalo_estatisticas (float): Segundos entre essas gravações
+            multiprocesso (bool): Permite que vários processos gravem no mesmo
+                arquivo: cada gravação trava o arquivo (fcntl) e antes incorpora
+                os registros novos dos outros processos. Implica journal=True
+            processos_relatorio (int): Processos usados por gerar_relatorio_periodo
+                para recontar os registros em paralelo (0 = um por CPU). Só
+                para uso em lote (scripts): os processos são criados com fork,
+                que exige uma única thread viva (ver _fork_seguro). Por isso
+                não combina com escrita_assincrona nem com arquivo_estatisticas
+                e não existe no servidor; se houver outras threads na hora do
+                relatório, ou abaixo de LIMITE_RELATORIO_PARALELO registros, a
+                contagem é serial
+            snapshot_binario (bool): Grava o arquivo principal no formato binário
+                de snapshot_binario.py em vez de JSON. A leitura reconhece os
+                dois formatos, então um arquivo JSON existente é convertido na
+                próxima gravação
+            cache_relatorios (int): Relatórios mensais e anuais guardados prontos
+                (LRU) até que um registro do período os invalide; 0 desliga
+            turnos_sobrepostos (str): Turno (entrada/saída) que duplica ou se
+                sobrepõe a outro do usuário no mesmo dia: "rejeitar" (ValueError),
+                "sinalizar" (grava com "sobreposto": True) ou "permitir"
+            particionar_por_ano (bool): Divide os registros em um arquivo por
+                ano (ver particoes_anuais.py), e o arquivo principal vira o
+                manifesto deles. A carga lê só o ano corrente, os demais anos
+                são lidos quando uma consulta precisar deles e cada gravação
+                reescreve apenas os anos alterados. Um arquivo inteiro existente
+                é dividido na próxima gravação
+            compressao_anos_frios (str): Com particionar_por_ano, comprime as
+                partições dos anos anteriores ao corrente ("gzip" ou "lzma");
+                com ou sem compressão, elas ficam somente leitura
+            exclusivo (bool): Reserva o arquivo de dados (ReservaArquivo) até
+                fechar(), para que outro processo não o grave ao mesmo tempo.
+                Se outro processo já o reservou, levanta ArquivoEmUso
+        """
+        if turnos_sobrepostos not in self.POLITICAS_TURNOS:
+            raise ValueError(f"turnos_sobrepostos deve ser um de: {', '.join(self.POLITICAS_TURNOS)}")
+        if compressao_anos_frios not in COMPRESSOES:
+            raise ValueError("compressao_anos_frios deve ser gzip, lzma ou None")
+        if particionar_por_ano and (multiprocesso or snapshot_binario):
+            raise ValueError("particionar_por_ano não pode ser combinado com multiprocesso nem com snapshot_binario")
+        if exclusivo and multiprocesso:
+            raise ValueError("exclusivo não pode ser combinado com multiprocesso")
+        if processos_relatorio != 1:
+            if "fork" not in multiprocessing.get_all_start_methods():
+                raise ValueError("processos_relatorio exige fork, que não existe nesta plataforma")
+            if escrita_assincrona or (instrumentar and arquivo_estatisticas is not None):
+                # As threads de gravação e de estatísticas impediriam o fork em todo relatório
+                raise ValueError("processos_relatorio não pode ser combinado com escrita_assincrona "
+                                 "nem com arquivo_estatisticas")
         self.arquivo_dados = arquivo_dados
-        self.usuarios = ["Márcio", "Samuel", "Caio", "Robson"]
+        # Antes de qualquer leitura do arquivo
+        self._reserva = ReservaArquivo(caminho_trava(arquivo_dados)) if exclusivo else None
+        self.journal = Journal(caminho_journal(arquivo_dados)) if journal or multiprocesso else None
+        self._trava_arquivo = TravaArquivo(caminho_trava(arquivo_dados)) if multiprocesso else None
+        self.limite_journal = limite_journal
+        self.apenas_ano = datetime.now().year if carregar_apenas_ano_atual or particionar_por_ano else None
+        self.compacto = compacto
+        self.snapshot_binario = snapshot_binario
+        self.processos_relatorio = processos_relatorio or os.cpu_count() or 1
+        self.turnos_sobrepostos = turnos_sobrepostos
+        self.particionar = particionar_por_ano
+        self.compressao_anos_frios = compressao_anos_frios
+        # Com partições: entrada do manifesto por ano, anos já lidos e anos a regravar
+        self._particoes = {}
+        self._anos_carregados = set()
+        self._anos_alterados = set()
+        self._seq_journal = 0
+        self._seq_carga = 0
+        self._geracao = 0
+        self._assinatura = None
+        self._posicao_journal = 0
+        self._carregado = False
+        self._indices_datas = {}
+        self._indices_meses = {}
+        self._indices_turnos = {}
+        # Versão geral dos dados (recarga, cadastro...) e versões por (ano, mes)
+        # e por ano, que só mudam com registros daquele período
+        self._versao_dados = 0
+        self._versoes_periodo = {}
+        self._cache_relatorios = CacheRelatorios(cache_relatorios) if cache_relatorios else None
+        self._placar = None
+        self._trava = threading.RLock()
+        self._gravador = None
+        self._instrumentacao = None
+        if instrumentar:
+            # Antes do gravador, para que ele receba o _gravar_arquivo cronometrado
+            self._instrumentacao = Instrumentacao()
+            self._instrumentacao.instrumentar(self, self.METODOS_INSTRUMENTADOS)
+            if arquivo_estatisticas is not None:
+                self._instrumentacao.iniciar_despejo(arquivo_estatisticas, intervalo_estatisticas, self.stats)
+        if escrita_assincrona:
+            self._gravador = GravadorAssincrono(self._gravar_arquivo, intervalo_escrita, tamanho_fila_escrita)
+            atexit.register(self.fechar)
+        self._totais = self._novos_totais()
         self.dados = self._inicializar_dados()
-        self.carregar_dados()
+        self._cadastro = None
+
+    @property
+    def dados(self):
+        """Dados em memória, carregados do arquivo no primeiro acesso"""
+        if not self._carregado:
+            self.carregar_dados()
+        return self._dados
+
+    @dados.setter
+    def dados(self, valor):
+        self._dados = valor
+
+    @property
+    def _totais(self):
+        """Contadores materializados, montados junto com o carregamento dos dados"""
+        if not self._carregado:
+            self.carregar_dados()
+        return self._totais_materializados
+
+    @_totais.setter
+    def _totais(self, valor):
+        self._totais_materializados = valor
+
+    @property
+    def _cadastro(self):
+        """Cadastro de usuários, montado junto com o carregamento dos dados"""
+        if not self._carregado:
+            self.carregar_dados()
+        return self._cadastro_carregado
+
+    @_cadastro.setter
+    def _cadastro(self, valor):
+        self._cadastro_carregado = valor
+
+    @property
+    def usuarios(self):
+        """Nomes dos usuários ativos, na ordem do cadastro"""
+        return self._cadastro.nomes_ativos()
 
     def _inicializar_dados(self):
         """Inicializa a estrutura de dados com os usuários padrão"""
-        return {
-            "usuarios": {user: {"registros": []} for user in self.usuarios},
+        dados = {
+            "usuarios": {user: {"registros": []} for user in self.USUARIOS_PADRAO},
             "ultima_atualizacao": None
         }
+        CadastroUsuarios.migrar(dados)
+        return dados
+
+    def _exclusivo(self):
+        """Trava da instância e, no modo multiprocesso, também a do arquivo"""
+        if self._trava_arquivo is None:
+            return self._trava
+        return self._travas_multiprocesso()
+
+    @contextmanager
+    def _travas_multiprocesso(self):
+        # Sempre nessa ordem, para que threads e processos não se travem
+        with self._trava, self._trava_arquivo:
+            yield
 
     def carregar_dados(self):
-        """Carrega os dados do arquivo JSON se existir"""
-        if os.path.exists(self.arquivo_dados):
+        """Carrega os dados do arquivo JSON se existir e reaplica o journal"""
+        with self._exclusivo():
+            self._carregado = True
+            self._assinatura = assinatura_arquivo(self.arquivo_dados)
+            seq_particoes = None
+            if self.particionar:
+                dados_carregados, seq_particoes = self._ler_particoes()
+            else:
+                dados_carregados = self._ler_dados()
+            self.dados = dados_carregados if dados_carregados is not None else self._inicializar_dados()
+            
+            self._geracao = self.dados.get("geracao", 0)
+            self._seq_journal = self.dados.get("journal_seq", 0)
+            if self.journal is not None:
+                self._seq_journal = self._reaplicar_journal(self.dados, self._seq_journal, seq_anos=seq_particoes)
+                self._posicao_journal = self.journal.tamanho()
+            self._seq_carga = self._seq_journal
+            # Uma única conversão das datas, usada pelos filtros, contadores e índices abaixo
+            _preparar_registros(self.dados)
+            
+            if self.particionar:
+                self._atualizar_carga_parcial()
+            elif self.apenas_ano is not None:
+                for usuario in self.dados["usuarios"].values():
+                    usuario["registros"] = [
+                        reg for reg in usuario["registros"]
+                        if _chave_registro(reg)[0] == self.apenas_ano
+                    ]
+            if self.compacto:
+                self._compactar_registros()
+            self._totais = self._calcular_totais()
+            self._indices_datas = {}
+            self._indices_meses = {}
+            self._indices_turnos = {}
+            self._cadastro = CadastroUsuarios(self.dados["cadastro"])
+            self._placar = None
+            self._nova_versao()
+
+    def _nova_versao(self):
+        """Invalida todos os relatórios em cache"""
+        self._versao_dados += 1
+        self._versoes_periodo = {}
+
+    def _ler_dados(self):
+        """Lê o arquivo JSON, se existir, criando o cadastro em arquivos antigos"""
+        if not os.path.exists(self.arquivo_dados):
+            return None
+        
+        if eh_snapshot_binario(self.arquivo_dados):
+            # Em modo compacto as colunas são copiadas direto do buffer mapeado
+            dados_carregados = ler_snapshot(self.arquivo_dados, compacto=self.compacto)
+        else:
             with open(self.arquivo_dados, 'r', encoding='utf-8') as f:
                 dados_carregados = json.load(f)
-                
-                # Garante que todos os usuários padrão existam
-                for user in self.usuarios:
-                    if user not in dados_carregados["usuarios"]:
-                        dados_carregados["usuarios"][user] = {"registros": []}
-                
-                self.dados = dados_carregados
+            if dados_carregados.get("formato") == FORMATO_MANIFESTO:
+                raise ValueError(f"{self.arquivo_dados} é um manifesto de partições; use particionar_por_ano=True")
+        
+        CadastroUsuarios.migrar(dados_carregados, self.USUARIOS_PADRAO)
+        return dados_carregados
+
+    def _reaplicar_journal(self, dados: dict, seq: int, ate: int = None, seq_anos: dict = None) -> int:
+        """
+        Aplica aos dados as entradas do journal ainda não incorporadas ao arquivo
+
+        Args:
+            dados (dict): Dados lidos do arquivo principal
+            seq (int): Última sequência já incorporada ao arquivo principal
+            ate (int): Ignora entradas com sequência maior que esta
+            seq_anos (dict): Com partições, ano -> última sequência já
+                incorporada à partição daquele ano
+
+        Returns:
+            int: Número de sequência da última entrada aplicada
+        """
+        cadastro = None
+        for entrada in self.journal.ler():
+            # Entradas já compactadas (crash entre a gravação e a limpeza do journal)
+            if entrada["seq"] <= seq or (ate is not None and entrada["seq"] > ate):
+                continue
+            if entrada.get("tipo") == "cadastro":
+                cadastro = cadastro or CadastroUsuarios(dados["cadastro"])
+                anterior = cadastro.aplicar(entrada)
+                if anterior is not None:
+                    dados["usuarios"][entrada["nome"]] = dados["usuarios"].pop(anterior, {"registros": []})
+                elif entrada["operacao"] == "cadastrar":
+                    dados["usuarios"].setdefault(entrada["nome"], {"registros": []})
+            elif not seq_anos or entrada["seq"] > seq_anos.get(_chave_registro(entrada["registro"])[0], 0):
+                usuario = dados["usuarios"].setdefault(entrada["usuario"], {"registros": []})
+                usuario["registros"].append(entrada["registro"])
+            seq = entrada["seq"]
+        return seq
+
+    def _garantir_anos(self, ano_inicio: int, ano_fim: int = None):
+        """Carrega os anos que ficaram de fora de um carregamento parcial"""
+        ano_fim = ano_fim if ano_fim is not None else ano_inicio
+        if self.particionar:
+            if self.apenas_ano is not None:
+                self._carregar_anos(range(ano_inicio, ano_fim + 1))
+        elif self.apenas_ano is not None and (ano_inicio, ano_fim) != (self.apenas_ano, self.apenas_ano):
+            self._completar_carga()
+        if self._trava_arquivo is not None:
+            self.sincronizar()
+
+    def _completar_carga(self):
+        """Traz para a memória os registros dos anos deixados de fora"""
+        if self.particionar:
+            self._carregar_anos()
+            return
+        if self._trava_arquivo is not None:
+            # Recarrega tudo, para que a ordem dos registros em memória continue
+            # a mesma do arquivo (ver _mesclar_arquivo)
+            with self._exclusivo():
+                self.apenas_ano = None
+                if self._carregado:
+                    self.carregar_dados()
+            return
+        
+        with self._trava:
+            ano_carregado = self.apenas_ano
+            self.apenas_ano = None
+            if ano_carregado is None or not self._carregado:
+                return
+            
+            # Os índices por data e de turnos são refeitos sob demanda, em vez
+            # de receberem os anos antigos um a um
+            self._indices_datas = {}
+            self._indices_meses = {}
+            self._indices_turnos = {}
+            
+            # O ano já carregado está completo em memória, assim como tudo o que
+            # foi registrado depois do carregamento; do disco vêm só os demais
+            # anos até aquele momento
+            completos = self._ler_dados() or self._inicializar_dados()
+            if self.journal is not None:
+                self._reaplicar_journal(completos, completos.get("journal_seq", 0), ate=self._seq_carga)
+            # Usuários renomeados depois do carregamento são achados pelo id
+            ids = CadastroUsuarios(completos["cadastro"])
+            _preparar_registros(completos)
+            for nome_antigo, usuario in completos["usuarios"].items():
+                nome = self._cadastro.nome_de(ids.id_de(nome_antigo)) or nome_antigo
+                self.dados["usuarios"].setdefault(nome, {"registros": []})
+                for registro in usuario["registros"]:
+                    if _chave_registro(registro)[0] != ano_carregado:
+                        self._adicionar_registro(nome, registro)
+            if self.compacto:
+                self._compactar_registros()
+
+    def _ler_particoes(self):
+        """
+        Lê o manifesto e as partições do ano corrente e dos anos com registros no journal
+
+        Um arquivo de antes das partições é lido inteiro, e todos os seus anos
+        são divididos em partições na próxima gravação.
+
+        Returns:
+            tuple: (dados, ano -> journal_seq de cada partição lida)
+        """
+        self._particoes = {}
+        self._anos_carregados = set()
+        self._anos_alterados = set()
+        if not os.path.exists(self.arquivo_dados):
+            return None, {}
+        if not eh_manifesto(self.arquivo_dados):
+            dados = self._ler_dados()
+            anos = {_chave_registro(registro)[0]
+                    for usuario in dados["usuarios"].values() for registro in usuario["registros"]}
+            self._anos_carregados = set(anos)
+            self._anos_alterados = set(anos)
+            return dados, {}
+        
+        with open(self.arquivo_dados, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        del dados["formato"]
+        self._particoes = {int(ano): entrada for ano, entrada in dados.pop("particoes").items()}
+        cadastro = CadastroUsuarios(dados["cadastro"])
+        dados["usuarios"] = {usuario["nome"]: {"registros": []} for usuario in cadastro.listar(incluir_inativos=True)}
+        
+        # Anos com registros ainda só no journal são lidos já, para que
+        # a reaplicação os encontre completos
+        anos = {datetime.now().year}
+        if self.journal is not None:
+            pendentes = self._anos_no_journal(dados.get("journal_seq", 0))
+            anos |= pendentes
+            self._anos_alterados |= pendentes
+        seq_particoes = {}
+        for ano in sorted(anos):
+            usuarios, seq_particoes[ano] = self._ler_particao(ano, cadastro)
+            for nome, registros in usuarios.items():
+                dados["usuarios"].setdefault(nome, {"registros": []})["registros"].extend(registros)
+            self._anos_carregados.add(ano)
+        return dados, seq_particoes
+
+    def _anos_no_journal(self, seq: int) -> set:
+        """Anos dos registros do journal posteriores à sequência"""
+        return {
+            _chave_registro(entrada["registro"])[0] for entrada in self.journal.ler()
+            if entrada["seq"] > seq and entrada.get("tipo") != "cadastro"
+        }
+
+    def _ler_particao(self, ano: int, cadastro: CadastroUsuarios):
+        """
+        Registros gravados na partição de um ano, pelo nome atual de cada usuário
+
+        Returns:
+            tuple: (nome -> registros, journal_seq da partição); vazios se o
+            ano não tem partição
+        """
+        entrada = self._particoes.get(ano)
+        if entrada is None:
+            return {}, 0
+        caminho = os.path.join(os.path.dirname(self.arquivo_dados), entrada["arquivo"])
+        particao = ler_particao(caminho, entrada["compressao"])
+        # Usuários renomeados depois da gravação da partição são achados pelo id
+        ids = particao["ids"]
+        usuarios = {
+            cadastro.nome_de(ids.get(nome)) or nome: registros
+            for nome, registros in particao["usuarios"].items()
+        }
+        return usuarios, particao["journal_seq"]
+
+    def _carregar_anos(self, anos=None):
+        """
+        Lê as partições ainda não carregadas dos anos pedidos (padrão: todas)
+
+        Cada ano é lido inteiro, de uma vez: um ano em memória está sempre
+        completo, e os registros novos dele só são incluídos depois disso.
+        """
+        with self._trava:
+            usuarios = self.dados["usuarios"]
+            anos = self._particoes if anos is None else anos
+            faltando = sorted(ano for ano in anos if ano in self._particoes and ano not in self._anos_carregados)
+            if not faltando:
+                return
+            # Os índices por data e de turnos são refeitos sob demanda
+            self._indices_datas = {}
+            self._indices_meses = {}
+            self._indices_turnos = {}
+            datas = {}
+            for ano in faltando:
+                registros_ano, _ = self._ler_particao(ano, self._cadastro)
+                for nome, registros in registros_ano.items():
+                    usuarios.setdefault(nome, {"registros": self._nova_lista()})
+                    for registro in registros:
+                        self._adicionar_registro(nome, _preparar_registro(registro, datas))
+                self._anos_carregados.add(ano)
+            self._atualizar_carga_parcial()
+
+    def _atualizar_carga_parcial(self):
+        """Com partições, apenas_ano fica preenchido enquanto houver partição não lida"""
+        faltando = self._particoes.keys() - self._anos_carregados
+        self.apenas_ano = datetime.now().year if faltando else None
+
+    def sincronizar(self):
+        """Incorpora os registros gravados por outros processos (modo multiprocesso)"""
+        if self._trava_arquivo is None:
+            return
+        with self._exclusivo():
+            self._incorporar_alteracoes()
+
+    def _incorporar_alteracoes(self):
+        """
+        Traz para a memória só o que outros processos gravaram desde a última leitura
+        
+        Deve ser chamado com a trava do arquivo. O arquivo principal só é
+        relido se mudou no disco e com outra geração (outro processo compactou
+        o journal); do journal, lê-se apenas o trecho depois da última posição lida.
+        """
+        if not self._carregado:
+            self.carregar_dados()
+            return
+        
+        assinatura = assinatura_arquivo(self.arquivo_dados)
+        if assinatura != self._assinatura:
+            self._assinatura = assinatura
+            dados = self._ler_dados()
+            if dados is not None and dados.get("geracao", 0) != self._geracao:
+                self._mesclar_arquivo(dados)
+        
+        if self.journal.tamanho(atualizar=True) < self._posicao_journal:
+            # Journal encolheu sem troca de geração: estado inesperado, relê tudo
+            self.carregar_dados()
+            return
+        for entrada in self.journal.ler(self._posicao_journal):
+            if entrada["seq"] > self._seq_journal:
+                if entrada.get("tipo") == "cadastro":
+                    self._aplicar_cadastro(entrada)
+                else:
+                    self.dados["usuarios"].setdefault(entrada["usuario"], {"registros": self._nova_lista()})
+                    self._adicionar_registro(entrada["usuario"], entrada["registro"])
+                self._seq_journal = entrada["seq"]
+        self._posicao_journal = self.journal.tamanho()
+
+    def _mesclar_arquivo(self, dados: dict):
+        """
+        Acrescenta os registros do arquivo principal que ainda não estão em memória
+        
+        Todo processo aplica os registros na ordem de sequência do journal,
+        então a lista em memória de cada usuário é um prefixo da lista do
+        arquivo: basta acrescentar o que vem depois dela.
+        """
+        for entrada in self._cadastro.diferencas(dados["cadastro"]):
+            self._aplicar_cadastro(entrada)
+        for nome, usuario in dados["usuarios"].items():
+            registros = usuario["registros"]
+            if self.apenas_ano is not None:
+                registros = [reg for reg in registros if _chave_registro(reg)[0] == self.apenas_ano]
+            em_memoria = self.dados["usuarios"].setdefault(nome, {"registros": self._nova_lista()})["registros"]
+            for registro in registros[len(em_memoria):]:
+                self._adicionar_registro(nome, registro)
+        
+        self._geracao = dados.get("geracao", 0)
+        self._seq_journal = max(self._seq_journal, dados.get("journal_seq", 0))
+        # Quem compactou limpou o journal; o que houver nele agora é posterior
+        self._posicao_journal = 0
+
+    def _nova_lista(self):
+        """Lista de registros vazia, no formato em uso (dicts ou colunas)"""
+        return RegistrosColunares() if self.compacto else []
+
+    def _compactar_registros(self):
+        """Troca as listas de registros em dict pelo armazenamento em colunas"""
+        for usuario in self.dados["usuarios"].values():
+            if not isinstance(usuario["registros"], RegistrosColunares):
+                usuario["registros"] = RegistrosColunares(usuario["registros"])
+
+    @staticmethod
+    def _novos_totais():
+        """
+        Cria os contadores materializados de minutos, vazios
+
+        Chaves: "dia" (nome, ano, mes, dia), "mes" (nome, ano, mes),
+        "ano" (nome, ano), "geral_mes" (ano, mes) e "geral_ano" ano.
+        """
+        return {"dia": {}, "mes": {}, "ano": {}, "geral_mes": {}, "geral_ano": {}}
+
+    def _calcular_totais(self):
+        """Recalcula todos os contadores percorrendo os registros uma vez"""
+        totais = self._novos_totais()
+        for nome, usuario in self.dados["usuarios"].items():
+            registros = usuario["registros"]
+            if isinstance(registros, RegistrosColunares):
+                # Lê direto das colunas, sem montar uma visão por registro
+                for ordinal, minutos in registros.dias_e_minutos():
+                    ano, mes, dia = _chave_ordinal(ordinal)
+                    CentralHorasEstagio._somar_minutos(totais, nome, ano, mes, dia, minutos)
+                continue
+            for registro in registros:
+                self._somar_registro(totais, nome, registro)
+        return totais
+
+    @staticmethod
+    def _somar_registro(totais: dict, nome: str, registro: dict):
+        """Soma os minutos de um registro em cada contador (O(1))"""
+        ano, mes, dia = _chave_registro(registro)
+        CentralHorasEstagio._somar_minutos(totais, nome, ano, mes, dia, _minutos_registro(registro))
+
+    @staticmethod
+    def _somar_minutos(totais: dict, nome: str, ano: int, mes: int, dia: int, minutos: int):
+        """Soma minutos de um dia do usuário em cada contador"""
+        for tipo, chave in (("dia", (nome, ano, mes, dia)),
+                            ("mes", (nome, ano, mes)),
+                            ("ano", (nome, ano)),
+                            ("geral_mes", (ano, mes)),
+                            ("geral_ano", ano)):
+            contador = totais[tipo]
+            contador[chave] = contador.get(chave, 0) + minutos
+
+    def verificar_consistencia(self, corrigir: bool = False):
+        """
+        Compara os contadores materializados com uma recontagem completa
+
+        Args:
+            corrigir (bool): Substitui os contadores pelos valores recontados
+
+        Returns:
+            list: Divergências como (tipo, chave, valor_materializado,
+            valor_recontado); vazia quando tudo confere
+        """
+        recontados = self._calcular_totais()
+        divergencias = []
+        for tipo, contador in recontados.items():
+            materializado = self._totais[tipo]
+            for chave in contador.keys() | materializado.keys():
+                if materializado.get(chave, 0) != contador.get(chave, 0):
+                    divergencias.append((tipo, chave, materializado.get(chave, 0), contador.get(chave, 0)))
+        if corrigir:
+            self._totais = recontados
+            self._placar = None
+            self._nova_versao()
+        return divergencias
 
     def salvar_dados(self):
-        """Salva os dados no arquivo JSON"""
-        self.dados["ultima_atualizacao"] = datetime.now().isoformat()
-        with open(self.arquivo_dados, 'w', encoding='utf-8') as f:
-            json.dump(self.dados, f, indent=4, ensure_ascii=False)
+        """
+        Salva os dados no arquivo JSON, incorporando e limpando o journal
+        
+        Com escrita assíncrona, apenas agenda a gravação e retorna.
+        """
+        if self.apenas_ano is not None and not self.particionar:
+            self._completar_carga()
+        with self._trava:
+            # A thread de gravação serializa self.dados com esta trava
+            self.dados["ultima_atualizacao"] = datetime.now().isoformat()
+        if self._gravador is not None:
+            self._gravador.agendar()
+        else:
+            self._gravar_arquivo()
+
+    def _gravar_arquivo(self):
+        """Grava o arquivo principal de forma atômica e descarta o journal incorporado"""
+        if self._trava_arquivo is not None:
+            self._gravar_arquivo_multiprocesso()
+            return
+        if self.particionar:
+            self._gravar_particoes()
+            return
+        
+        # A serialização é feita sob a trava para capturar um estado
+        # consistente; a escrita em disco, não
+        with self._trava:
+            if self.journal is not None:
+                self.dados["journal_seq"] = self._seq_journal
+            seq = self._seq_journal
+            conteudo = self._serializar_dados()
+        
+        escrever_atomico(self.arquivo_dados, conteudo)
+        if self._instrumentacao is not None:
+            self._instrumentacao.registrar_bytes("salvar_dados", len(conteudo))
+        self._descartar_journal_ate(seq)
+
+    def _descartar_journal_ate(self, seq: int):
+        """Tira do journal as entradas já gravadas no arquivo principal"""
+        if self.journal is not None:
+            with self._trava:
+                if self._seq_journal == seq:
+                    self.journal.limpar()
+                else:
+                    # Entradas anexadas durante a escrita continuam no journal
+                    self.journal.descartar_ate(seq)
+
+    def _gravar_particoes(self):
+        """
+        Grava as partições dos anos alterados, congela os anos que esfriaram e, por último, o manifesto
+
+        Cada partição guarda o journal_seq com que foi gravada: se a gravação
+        parar no meio, a próxima carga não reaplica a uma partição já nova as
+        entradas do journal que ela contém. Anos anteriores ao corrente são
+        gravados com compressao_anos_frios e somente leitura.
+        """
+        ano_atual = datetime.now().year
+        diretorio = os.path.dirname(self.arquivo_dados)
+        with self._trava:
+            if self.journal is not None:
+                self.dados["journal_seq"] = self._seq_journal
+            seq = self._seq_journal
+            anos = self._anos_alterados
+            self._anos_alterados = set()
+            por_ano = {ano: {} for ano in anos}
+            for nome, usuario in self.dados["usuarios"].items():
+                for registro in usuario["registros"]:
+                    registros_ano = por_ano.get(_chave_registro(registro)[0])
+                    if registros_ano is not None:
+                        registros_ano.setdefault(nome, []).append(registro)
+            
+            # (ano, entrada nova, conteúdo ou None para só converter o arquivo)
+            gravacoes = []
+            for ano, usuarios in sorted(por_ano.items()):
+                particao = {
+                    "ano": ano,
+                    "journal_seq": seq,
+                    "ids": {nome: self._cadastro.id_de(nome) for nome in usuarios},
+                    "usuarios": usuarios,
+                }
+                conteudo = json.dumps(particao, indent=4, ensure_ascii=False, default=_serializar).encode('utf-8')
+                gravacoes.append((ano, self._entrada_particao(ano, ano_atual, sum(map(len, usuarios.values()))),
+                                  conteudo))
+            for ano, entrada in sorted(self._particoes.items()):
+                if ano < ano_atual and not entrada["fria"] and ano not in anos:
+                    gravacoes.append((ano, self._entrada_particao(ano, ano_atual, entrada["registros"]), None))
+            anteriores = {ano: self._particoes.get(ano) for ano, _, _ in gravacoes}
+        
+        gravados = 0
+        try:
+            for ano, entrada, conteudo in gravacoes:
+                caminho = os.path.join(diretorio, entrada["arquivo"])
+                if conteudo is None:
+                    anterior = anteriores[ano]
+                    gravados += converter_particao(os.path.join(diretorio, anterior["arquivo"]),
+                                                   anterior["compressao"], caminho, entrada["compressao"],
+                                                   somente_leitura=True)
+                else:
+                    gravados += gravar_particao(caminho, conteudo, entrada["compressao"], entrada["fria"])
+            
+            with self._trava:
+                particoes = dict(self._particoes)
+                particoes.update((ano, entrada) for ano, entrada, _ in gravacoes)
+                manifesto = {"formato": FORMATO_MANIFESTO}
+                manifesto.update((chave, valor) for chave, valor in self.dados.items() if chave != "usuarios")
+                manifesto["particoes"] = {str(ano): entrada for ano, entrada in sorted(particoes.items())}
+                conteudo = json.dumps(manifesto, indent=4, ensure_ascii=False).encode('utf-8')
+            escrever_atomico(self.arquivo_dados, conteudo)
+            gravados += len(conteudo)
+        except BaseException:
+            # O manifesto no disco ainda é o anterior; os anos voltam a ficar pendentes
+            with self._trava:
+                self._anos_alterados |= anos
+            raise
+        
+        with self._trava:
+            for ano, entrada, conteudo in gravacoes:
+                self._particoes[ano] = entrada
+                if conteudo is not None:
+                    self._anos_carregados.add(ano)
+        
+        # Arquivos que mudaram de nome (outra compressão) só saem depois do manifesto novo
+        for ano, entrada, _ in gravacoes:
+            anterior = anteriores[ano]
+            if anterior is not None and anterior["arquivo"] != entrada["arquivo"]:
+                remover_particao(os.path.join(diretorio, anterior["arquivo"]))
+        if self._instrumentacao is not None:
+            self._instrumentacao.registrar_bytes("salvar_dados", gravados)
+        self._descartar_journal_ate(seq)
+
+    def juntar_particoes(self) -> int:
+        """
+        Volta os dados divididos por ano para um único arquivo JSON
+
+        Caminho de volta de particionar_por_ano: lê todas as partições, grava
+        o arquivo inteiro no lugar do manifesto e só então apaga as partições.
+        Depois disso a central segue sem partições, e o arquivo volta a abrir
+        sem particionar_por_ano. Pela linha de comando:
+        `python cli_horas.py --arquivo horas_estagio.json juntar-particoes`.
+
+        Returns:
+            int: Partições apagadas
+
+        Raises:
+            ValueError: A central não foi aberta com particionar_por_ano
+        """
+        if not self.particionar:
+            raise ValueError("A central não está dividida por ano (particionar_por_ano)")
+        self.flush()
+        self._carregar_anos()
+        with self._trava:
+            particoes, anos_alterados = self._particoes, self._anos_alterados
+            self.particionar = False
+            self._particoes = {}
+            self._anos_alterados = set()
+        try:
+            self._gravar_arquivo()
+        except BaseException:
+            # O manifesto no disco continua valendo
+            with self._trava:
+                self.particionar = True
+                self._particoes = particoes
+                self._anos_alterados |= anos_alterados
+            raise
+        
+        diretorio = os.path.dirname(self.arquivo_dados)
+        for entrada in particoes.values():
+            remover_particao(os.path.join(diretorio, entrada["arquivo"]))
+        return len(particoes)
+
+    def _entrada_particao(self, ano: int, ano_atual: int, registros: int) -> dict:
+        """Entrada do manifesto para a partição de um ano, com a compressão que a idade dele pede"""
+        fria = ano < ano_atual
+        compressao = self.compressao_anos_frios if fria else None
+        arquivo = os.path.basename(caminho_particao(self.arquivo_dados, ano, compressao))
+        return {"arquivo": arquivo, "compressao": compressao, "fria": fria, "registros": registros}
+
+    def _serializar_dados(self) -> bytes:
+        """Conteúdo do arquivo principal, em JSON indentado ou no formato binário"""
+        if self.snapshot_binario:
+            return serializar_snapshot(self.dados)
+        return json.dumps(self.dados, indent=4, ensure_ascii=False, default=_serializar).encode('utf-8')
+
+    def _gravar_arquivo_multiprocesso(self):
+        """Compacta o journal no arquivo principal com a trava do arquivo, do início ao fim"""
+        with self._exclusivo():
+            self._incorporar_alteracoes()
+            self._geracao += 1
+            self.dados["geracao"] = self._geracao
+            self.dados["journal_seq"] = self._seq_journal
+            conteudo = self._serializar_dados()
+            escrever_atomico(self.arquivo_dados, conteudo)
+            # Com a trava, nenhum outro processo anexou nada depois da sincronização
+            self.journal.limpar()
+            self._posicao_journal = 0
+            self._assinatura = assinatura_arquivo(self.arquivo_dados)
+        if self._instrumentacao is not None:
+            self._instrumentacao.registrar_bytes("salvar_dados", len(conteudo))
+
+    def flush(self):
+        """Aguarda a conclusão das gravações agendadas (escrita assíncrona)"""
+        if self._gravador is not None:
+            self._gravador.flush()
+
+    def fechar(self):
+        """Grava o que estiver pendente e encerra as threads de escrita e de estatísticas"""
+        try:
+            if self._gravador is not None:
+                # Relança o erro de uma gravação em segundo plano, depois de liberar o resto
+                self._gravador.fechar()
+        finally:
+            if self._gravador is not None:
+                # Sem isso, o registro no atexit mantém a central viva até o fim do processo
+                atexit.unregister(self.fechar)
+            if self._instrumentacao is not None:
+                self._instrumentacao.parar_despejo()
+            if self._trava_arquivo is not None:
+                self._trava_arquivo.fechar()
+            if self._reserva is not None:
+                self._reserva.fechar()
+
+    def stats(self):
+        """
+        Estatísticas de uso da central
+        
+        Returns:
+            dict: "registros" (total e por usuário dos dados em memória),
+            "cache_relatorios" (acertos, faltas e descartes), "particoes"
+            (anos com partição e os já lidos, com particionar_por_ano) e, com a
+            instrumentação ligada, "metodos" (chamadas, total, média e
+            p50/p95/p99 em ms) e "bytes_gravados" (por salvar_dados e journal)
+        """
+        por_usuario = self._contar_registros()
+        estatisticas = {
+            "instrumentacao": self._instrumentacao is not None,
+            "carregado": self._carregado,
+            "registros": {"total": sum(por_usuario.values()), "por_usuario": por_usuario},
+        }
+        if self.journal is not None:
+            estatisticas["journal_bytes"] = self.journal.tamanho()
+        if self._cache_relatorios is not None:
+            estatisticas["cache_relatorios"] = self._cache_relatorios.estatisticas()
+        if self.particionar:
+            estatisticas["particoes"] = {
+                "anos": sorted(self._particoes),
+                "carregadas": sorted(self._anos_carregados & self._particoes.keys()),
+            }
+        if self._instrumentacao is not None:
+            estatisticas.update(self._instrumentacao.estatisticas())
+        return estatisticas
+
+    def _contar_registros(self):
+        """Quantidade de registros em memória por usuário, sem forçar o carregamento"""
+        if not self._carregado:
+            return {}
+        with self._trava:
+            return {nome: len(usuario["registros"]) for nome, usuario in self._dados["usuarios"].items()}
+
+    def _incluir_registros(self, novos, persistir: bool = True):
+        """
+        Inclui registros recém-criados na memória e os persiste no journal ou no arquivo principal
+
+        Args:
+            novos (list): Pares (nome, registro), gravados com uma única escrita
+            persistir (bool): Grava em disco; desligado, cabe a quem chama
+                salvar os dados depois
+        """
+        escritos = 0
+        self._garantir_anos_novos(novos)
+        with self._exclusivo():
+            if self._trava_arquivo is not None:
+                # Primeiro o que os outros processos gravaram, para que a ordem
+                # em memória siga a do journal
+                self._incorporar_alteracoes()
+                for nome, _ in novos:
+                    if not self._usuario_existe(nome):
+                        raise ValueError(f"Usuário {nome} não está cadastrado ou está inativo")
+            self._conferir_turnos(novos)
+            for nome, registro in novos:
+                self._adicionar_registro(nome, registro)
+            if self.particionar:
+                self._anos_alterados.update(_chave_registro(registro)[0] for _, registro in novos)
+            
+            if persistir and self.journal is not None:
+                escritos = self._anexar_ao_journal(
+                    {"usuario": nome, "registro": registro} for nome, registro in novos
+                )
+        if escritos and self._instrumentacao is not None:
+            self._instrumentacao.registrar_bytes("journal", escritos)
+        
+        # Fora da trava: com escrita assíncrona, salvar_dados pode esperar
+        # pela thread de gravação, que também precisa da trava
+        if persistir and (self.journal is None or self.journal.tamanho() >= self.limite_journal):
+            self.salvar_dados()
+
+    def _garantir_anos_novos(self, novos):
+        """
+        Carrega os anos dos turnos novos, para conferi-los com todo o histórico do dia
+
+        Com partições, carrega os anos de todos os registros novos: um ano só
+        recebe registros depois de estar inteiro em memória.
+        """
+        anos = [
+            _chave_registro(registro)[0] for _, registro in novos
+            if self.particionar or "entrada" in registro
+        ]
+        if anos:
+            self._garantir_anos(min(anos), max(anos))
+
+    def _conferir_turnos(self, novos):
+        """
+        Aplica turnos_sobrepostos aos turnos novos que conflitam com os já registrados ou entre si
+
+        Raises:
+            ValueError: Turno duplicado ou sobreposto, com a política "rejeitar";
+                ErroLote se vier de um lote com mais de um item
+        """
+        if self.turnos_sobrepostos == "permitir":
+            return
+        conflitos = self._conflitos_turnos(novos)
+        if not conflitos:
+            return
+        if self.turnos_sobrepostos == "sinalizar":
+            for posicao, _ in conflitos:
+                novos[posicao][1]["sobreposto"] = True
+            return
+        if len(novos) == 1:
+            raise ValueError(conflitos[0][1])
+        raise ErroLote([(posicao + 1, mensagem) for posicao, mensagem in conflitos])
+
+    def _conflitos_turnos(self, novos, pendentes: dict = None):
+        """
+        Confere cada turno novo com o índice de turnos do usuário e com os anteriores da mesma leva
+
+        Args:
+            novos (list): Pares (nome, registro); registros sem turno são ignorados
+            pendentes (dict): nome -> IndiceTurnos com os turnos já conferidos e
+                ainda não gravados; recebe os turnos de `novos`
+
+        Returns:
+            list: (posição em novos, mensagem) de cada turno duplicado ou sobreposto
+        """
+        pendentes = {} if pendentes is None else pendentes
+        conflitos = []
+        for posicao, (nome, registro) in enumerate(novos):
+            turno = turno_registro(registro)
+            if turno is None:
+                continue
+            ordinal = _dia_registro(registro)
+            existente = self._turno_em_conflito(nome, ordinal, turno)
+            pendente = pendentes.setdefault(nome, IndiceTurnos())
+            if existente is None:
+                existente = pendente.conflito(ordinal, *turno)
+            pendente.inserir(ordinal, *turno)
+            if existente is not None:
+                conflitos.append((posicao, self._mensagem_conflito(nome, registro["data"], turno, existente)))
+        return conflitos
+
+    def _turno_em_conflito(self, nome: str, ordinal: int, turno):
+        """Turno registrado do usuário no dia que se sobrepõe ao informado (O(log n)), ou None"""
+        return self._indice_turnos(nome).conflito(ordinal, *turno)
+
+    @staticmethod
+    def _mensagem_conflito(nome: str, data: str, turno, existente) -> str:
+        faixa = f"{formatar_horario(turno[0])}-{formatar_horario(turno[1])}"
+        faixa_existente = f"{formatar_horario(existente[0])}-{formatar_horario(existente[1])}"
+        if tuple(existente) == tuple(turno):
+            return f"Turno {faixa} de {nome} em {data} já foi registrado"
+        return f"Turno {faixa} de {nome} em {data} se sobrepõe ao turno {faixa_existente}"
+
+    def _indice_turnos(self, nome: str) -> IndiceTurnos:
+        """Índice dos turnos do usuário por dia, montado no primeiro uso (com a trava)"""
+        indice = self._indices_turnos.get(nome)
+        if indice is None:
+            registros = self.dados["usuarios"][nome]["registros"]
+            indice = self._indices_turnos[nome] = IndiceTurnos.construir(
+                (dia, entrada, saida) for dia, entrada, saida, _ in _turnos_registros(registros)
+            )
+        return indice
+
+    def auditar_sobreposicoes(self, nome: str = None):
+        """
+        Procura em todo o histórico turnos duplicados ou sobrepostos no mesmo dia, em O(n log n)
+
+        Args:
+            nome (str): Só esse usuário (padrão: todos, inclusive inativos)
+
+        Returns:
+            list: Um dict por turno em conflito, com "nome", "data", "turno" e
+            "conflita_com" (HH:MM-HH:MM), "duplicado" e as posições dos dois
+            registros em get_registros_usuario ("posicao" e "posicao_conflito")
+        """
+        if self.apenas_ano is not None:
+            self._completar_carga()
+        self.sincronizar()
+        with self._trava:
+            usuarios = self.dados["usuarios"]
+            if nome is not None and nome not in usuarios:
+                raise ValueError(f"Usuário {nome} não encontrado")
+            nomes = [nome] if nome is not None else list(usuarios)
+            return [
+                self._item_auditoria(usuario, anterior, atual)
+                for usuario in nomes
+                for anterior, atual in sobreposicoes(_turnos_registros(usuarios[usuario]["registros"]))
+            ]
+
+    @staticmethod
+    def _item_auditoria(nome: str, anterior, atual) -> dict:
+        """Converte um par de turnos (ordinal, entrada, saida, posição) no item da auditoria"""
+        dia, entrada, saida, posicao = atual
+        return {
+            "nome": nome,
+            "data": date.fromordinal(dia).strftime("%d/%m/%Y"),
+            "turno": f"{formatar_horario(entrada)}-{formatar_horario(saida)}",
+            "conflita_com": f"{formatar_horario(anterior[1])}-{formatar_horario(anterior[2])}",
+            "duplicado": anterior[1:3] == atual[1:3],
+            "posicao": posicao,
+            "posicao_conflito": anterior[3],
+        }
+
+    def _anexar_ao_journal(self, entradas) -> int:
+        """
+        Numera as entradas e as anexa ao journal com uma única escrita (com a trava)
+        
+        Returns:
+            int: Bytes escritos
+        """
+        numeradas = []
+        for entrada in entradas:
+            self._seq_journal += 1
+            numeradas.append({"seq": self._seq_journal, **entrada})
+        escritos = self.journal.anexar(numeradas)
+        self._posicao_journal = self.journal.tamanho()
+        return escritos
+
+    def _usuario_existe(self, nome: str, incluir_inativos: bool = False) -> bool:
+        """Verifica se o usuário está cadastrado e ativo, ou só cadastrado com incluir_inativos (O(1))"""
+        return self._cadastro.existe(nome) if incluir_inativos else self._cadastro.ativo(nome)
+
+    def _validar_usuario(self, nome: str, incluir_inativos: bool = False):
+        """
+        Levanta ValueError se o nome não for de um usuário cadastrado e ativo
+
+        Consultas passam incluir_inativos, para que o histórico de quem foi
+        desativado continue acessível.
+        """
+        if self._usuario_existe(nome, incluir_inativos):
+            return
+        if self._trava_arquivo is not None:
+            # Pode ter sido cadastrado ou reativado por outro processo
+            self.sincronizar()
+            if self._usuario_existe(nome, incluir_inativos):
+                return
+        if incluir_inativos:
+            raise ValueError(f"Usuário {nome} não está cadastrado")
+        ativos = self.usuarios
+        if len(ativos) <= 10:
+            raise ValueError(f"Usuário {nome} não é válido. Use: {', '.join(ativos)}")
+        raise ValueError(f"Usuário {nome} não está cadastrado ou está inativo")
+
+    def cadastrar_usuario(self, nome: str) -> int:
+        """
+        Cadastra um novo estagiário
+        
+        Args:
+            nome (str): Nome, único entre ativos e inativos
+            
+        Returns:
+            int: Id do usuário, que não muda mesmo se ele for renomeado
+        """
+        return self._alterar_cadastro("cadastrar", nome)
+
+    def desativar_usuario(self, nome: str):
+        """Desativa o usuário: deixa de registrar pontos e só aparece nos relatórios em que tem horas"""
+        self._alterar_cadastro("desativar", nome)
+
+    def reativar_usuario(self, nome: str):
+        """Reativa um usuário desativado"""
+        self._alterar_cadastro("reativar", nome)
+
+    def renomear_usuario(self, nome: str, novo_nome: str):
+        """Renomeia o usuário, mantendo id e registros"""
+        self._alterar_cadastro("renomear", nome, novo_nome)
+
+    def id_usuario(self, nome: str):
+        """Id do usuário, ativo ou não, ou None se o nome não estiver cadastrado"""
+        return self._cadastro.id_de(nome)
+
+    def listar_usuarios(self, incluir_inativos: bool = False):
+        """
+        Lista o cadastro
+        
+        Returns:
+            list: Dicts com "id", "nome" e "ativo", por ordem de id
+        """
+        return self._cadastro.listar(incluir_inativos)
+
+    def _alterar_cadastro(self, operacao: str, nome: str, novo_nome: str = None) -> int:
+        """Valida, aplica e persiste (no journal ou no arquivo) uma alteração do cadastro"""
+        with self._exclusivo():
+            if self._trava_arquivo is not None:
+                self._incorporar_alteracoes()
+            entrada = self._cadastro.preparar(operacao, nome, novo_nome)
+            self._aplicar_cadastro(entrada)
+            if self.journal is not None:
+                self._anexar_ao_journal([entrada])
+        if self.journal is None:
+            self.salvar_dados()
+        return entrada["id"]
+
+    def _aplicar_cadastro(self, entrada: dict):
+        """Aplica uma alteração do cadastro aos dados em memória, contadores e índices"""
+        anterior = self._cadastro.aplicar(entrada)
+        usuarios = self.dados["usuarios"]
+        if entrada["operacao"] == "cadastrar":
+            usuarios.setdefault(entrada["nome"], {"registros": self._nova_lista()})
+        elif anterior is not None:
+            novo = entrada["nome"]
+            usuarios[novo] = usuarios.pop(anterior, None) or {"registros": self._nova_lista()}
+            self._renomear_nos_totais(anterior, novo)
+            if anterior in self._indices_datas:
+                self._indices_datas[novo] = self._indices_datas.pop(anterior)
+            if anterior in self._indices_meses:
+                self._indices_meses[novo] = self._indices_meses.pop(anterior)
+            if anterior in self._indices_turnos:
+                self._indices_turnos[novo] = self._indices_turnos.pop(anterior)
+            if self._placar is not None:
+                self._placar.renomear(anterior, novo)
+        # Muda quem aparece nos relatórios de qualquer período
+        self._nova_versao()
+
+    def _renomear_nos_totais(self, anterior: str, novo: str):
+        """Move os contadores do usuário para o novo nome, visitando só os dias dele"""
+        registros = self.dados["usuarios"][novo]["registros"]
+        if isinstance(registros, RegistrosColunares):
+            dias = {_chave_ordinal(ordinal) for ordinal in registros.dias}
+        else:
+            dias = {_chave_registro(registro) for registro in registros}
+        for ano, mes, dia in dias:
+            for tipo, antiga, nova in (("dia", (anterior, ano, mes, dia), (novo, ano, mes, dia)),
+                                       ("mes", (anterior, ano, mes), (novo, ano, mes)),
+                                       ("ano", (anterior, ano), (novo, ano))):
+                contador = self._totais[tipo]
+                if antiga in contador:
+                    contador[nova] = contador.pop(antiga)
+
+    def _usuarios_relatorio(self, ano_inicio: int, ano_fim: int = None, mes: int = None):
+        """Usuários ativos e, dos inativos, os que têm minutos no período"""
+        usuarios = list(self.usuarios)
+        ano_fim = ano_fim if ano_fim is not None else ano_inicio
+        for nome in self._cadastro.nomes_inativos():
+            if mes is not None:
+                tem_minutos = self._totais["mes"].get((nome, ano_inicio, mes))
+            else:
+                tem_minutos = any(self._totais["ano"].get((nome, ano)) for ano in range(ano_inicio, ano_fim + 1))
+            if tem_minutos:
+                usuarios.append(nome)
+        return usuarios
 
     def registrar_horas(self, nome: str, entrada: str, saida: str):
         """
@@ -44,7 +1357,7 @@ class CentralHorasEstagio:
             entrada (str): Horário de entrada (HH:MM)
             saida (str): Horário de saída (HH:MM)
         """
-        if nome not in self.dados["usuarios"]:
+        if not self._usuario_existe(nome):
             raise ValueError(f"Usuário {nome} não encontrado")
         
         try:
@@ -55,10 +1368,12 @@ class CentralHorasEstagio:
                 raise ValueError("Horário de saída deve ser após o horário de entrada")
             
             minutos_trabalhados = int((hora_saida - hora_entrada).total_seconds() / 60)
-            return self._registrar_minutos(nome, datetime.now().strftime("%d/%m/%Y"), minutos_trabalhados)
-            
         except ValueError as e:
             raise ValueError(f"Formato de hora inválido. Use HH:MM - {str(e)}")
+        
+        # Fora do try: um turno sobreposto não é erro de formato
+        return self._registrar_minutos(nome, datetime.now().strftime("%d/%m/%Y"), minutos_trabalhados,
+                                       entrada=hora_entrada.strftime("%H:%M"), saida=hora_saida.strftime("%H:%M"))
 
     def registrar_minutos(self, nome: str, data: str, minutos: int, descricao: str = ""):
         """
@@ -74,6 +1389,7 @@ class CentralHorasEstagio:
             dict: Registro criado
         """
         try:
+            self._validar_usuario(nome)
             datetime.strptime(data, "%d/%m/%Y")  # Valida formato da data
             if minutos <= 0:
                 raise ValueError("Minutos devem ser positivos")
@@ -83,8 +1399,16 @@ class CentralHorasEstagio:
         except ValueError as e:
             raise ValueError(f"Dados inválidos: {str(e)}")
 
-    def _registrar_minutos(self, nome: str, data: str, minutos: int, descricao: str = ""):
-        """Método interno para registro por minutos"""
+    def _registrar_minutos(self, nome: str, data: str, minutos: int, descricao: str = "",
+                           entrada: str = None, saida: str = None):
+        """Método interno para registro por minutos (com o turno, se houver)"""
+        registro = self._criar_registro(data, minutos, descricao, entrada, saida)
+        self._incluir_registros([(nome, registro)])
+        return registro
+
+    @staticmethod
+    def _criar_registro(data: str, minutos: int, descricao: str = "", entrada: str = None, saida: str = None):
+        """Monta o registro no formato do arquivo, com a data já convertida; entrada e saída em HH:MM"""
         registro = {
             "data": data,
             "minutos": minutos,
@@ -92,22 +1416,51 @@ class CentralHorasEstagio:
             "descricao": descricao,
             "timestamp": datetime.now().isoformat()
         }
-        
-        self.dados["usuarios"][nome]["registros"].append(registro)
-        self.salvar_dados()
-        return registro
+        if entrada is not None:
+            registro["entrada"] = entrada
+            registro["saida"] = saida
+        return _preparar_registro(registro)
+
+    def _adicionar_registro(self, nome: str, registro: dict):
+        """Inclui o registro nos dados em memória, nos contadores e nos índices por data e por mês"""
+        if type(registro) is dict:
+            # Vindo do journal ou de outro processo
+            registro = _preparar_registro(registro)
+        registros = self.dados["usuarios"][nome]["registros"]
+        registros.append(registro)
+        self._somar_registro(self._totais, nome, registro)
+        # Só os relatórios do mês e do ano do registro ficam velhos
+        ano, mes, _ = _chave_registro(registro)
+        versoes = self._versoes_periodo
+        versoes[(ano, mes)] = versoes.get((ano, mes), 0) + 1
+        versoes[ano] = versoes.get(ano, 0) + 1
+        if self._placar is not None:
+            self._placar.adicionar(nome, _dia_registro(registro), _minutos_registro(registro))
+        indice_turnos = self._indices_turnos.get(nome)
+        if indice_turnos is not None:
+            turno = turno_registro(registro)
+            if turno is not None:
+                indice_turnos.inserir(_dia_registro(registro), *turno)
+        indice = self._indices_datas.get(nome)
+        if indice is not None:
+            indice.inserir(_dia_registro(registro), len(registros) - 1)
+        indice_meses = self._indices_meses.get(nome)
+        if indice_meses is not None:
+            indice_meses.setdefault(ano, {}).setdefault(mes, []).append(len(registros) - 1)
 
     def calcular_minutos_dia(self, nome: str, data: str = None):
         """Calcula minutos trabalhados em um dia específico"""
         if data is None:
             data = datetime.now().strftime("%d/%m/%Y")
-            
-        registros_dia = [
-            reg for reg in self.dados["usuarios"][nome]["registros"] 
-            if reg["data"] == data
-        ]
         
-        return sum(reg.get("minutos", reg["horas"] * 60) for reg in registros_dia)
+        self._validar_usuario(nome, incluir_inativos=True)
+        try:
+            ano, mes, dia = _chave_data(data)
+        except ValueError:
+            return 0  # Data em formato inválido não tem registros
+        
+        self._garantir_anos(ano)
+        return self._totais["dia"].get((nome, ano, mes, dia), 0)
 
     def calcular_minutos_mes(self, nome: str, mes: int = None, ano: int = None):
         """Calcula minutos trabalhados no mês"""
@@ -115,13 +1468,30 @@ class CentralHorasEstagio:
         mes = mes if mes is not None else hoje.month
         ano = ano if ano is not None else hoje.year
         
-        registros_mes = [
-            reg for reg in self.dados["usuarios"][nome]["registros"]
-            if datetime.strptime(reg["data"], "%d/%m/%Y").month == mes
-            and datetime.strptime(reg["data"], "%d/%m/%Y").year == ano
-        ]
-        
-        return sum(reg.get("minutos", reg["horas"] * 60) for reg in registros_mes)
+        self._validar_usuario(nome, incluir_inativos=True)
+        self._garantir_anos(ano)
+        return self._totais["mes"].get((nome, ano, mes), 0)
+
+    def calcular_minutos_ano(self, nome: str, ano: int = None):
+        """Calcula minutos trabalhados no ano"""
+        ano = ano if ano is not None else datetime.now().year
+        self._validar_usuario(nome, incluir_inativos=True)
+        self._garantir_anos(ano)
+        return self._totais["ano"].get((nome, ano), 0)
+
+    def calcular_minutos_totais(self, mes: int = None, ano: int = None):
+        """
+        Calcula os minutos de todos os usuários no ano ou, se informado, no mês
+
+        Args:
+            mes (int): Mês (opcional; sem ele, soma o ano inteiro)
+            ano (int): Ano (padrão: ano atual)
+        """
+        ano = ano if ano is not None else datetime.now().year
+        self._garantir_anos(ano)
+        if mes is None:
+            return self._totais["geral_ano"].get(ano, 0)
+        return self._totais["geral_mes"].get((ano, mes), 0)
 
     def calcular_horas_dia(self, nome: str, data: str = None):
         """Calcula horas trabalhadas em um dia (compatibilidade)"""
@@ -149,8 +1519,7 @@ class CentralHorasEstagio:
         """
         try:
             # Verifica se o usuário existe
-            if nome not in self.usuarios:
-                raise ValueError(f"Usuário {nome} não é válido. Use: {', '.join(self.usuarios)}")
+            self._validar_usuario(nome)
             
             # Valida a data
             datetime.strptime(data, "%d/%m/%Y")
@@ -159,14 +1528,17 @@ class CentralHorasEstagio:
             entrada_min = self.converter_horario_para_minutos(entrada)
             saida_min = self.converter_horario_para_minutos(saida)
             
+            if not (0 <= entrada_min < 24 * 60 and 0 <= saida_min < 24 * 60):
+                raise ValueError("Horários devem estar entre 00:00 e 23:59")
             if saida_min <= entrada_min:
                 raise ValueError("Horário de saída deve ser após o horário de entrada")
                 
             # Calcula os minutos trabalhados
             minutos_trabalhados = saida_min - entrada_min
             
-            # Cria e retorna o registro
-            return self._registrar_minutos(nome, data, minutos_trabalhados, descricao)
+            # Cria e retorna o registro, guardando o turno para barrar sobreposições
+            return self._registrar_minutos(nome, data, minutos_trabalhados, descricao,
+                                           formatar_horario(entrada_min), formatar_horario(saida_min))
             
         except ValueError as e:
             raise ValueError(f"Dados inválidos: {str(e)}")
@@ -186,8 +1558,7 @@ class CentralHorasEstagio:
         """
         try:
             # Validação básica
-            if nome not in self.usuarios:
-                raise ValueError(f"Usuário {nome} não é válido. Use: {', '.join(self.usuarios)}")
+            self._validar_usuario(nome)
             
             if minutos <= 0:
                 raise ValueError("Minutos devem ser positivos")
@@ -199,12 +1570,223 @@ class CentralHorasEstagio:
         except ValueError as e:
             raise ValueError(f"Dados inválidos: {str(e)}")
 
+    def registrar_lote(self, itens):
+        """
+        Registra vários itens de uma vez, validando todos antes de gravar
+        
+        Cada item é um dict com "nome", "data" (DD/MM/AAAA), "minutos" ou o par
+        "entrada"/"saida" (HH:MM) e, opcionalmente, "descricao". Se algum item
+        for inválido nada é registrado; caso contrário os dados são salvos
+        uma única vez para o lote inteiro.
+        
+        Args:
+            itens (iterable): Itens a registrar
+            
+        Returns:
+            list: Registros criados, na ordem dos itens
+            
+        Raises:
+            ErroLote: Com a lista de (linha, mensagem) dos itens inválidos
+        """
+        validados = []
+        erros = []
+        for linha, item in enumerate(itens, 1):
+            try:
+                validados.append(self._validar_item_lote(item))
+            except ValueError as e:
+                erros.append((linha, str(e)))
+        
+        if erros:
+            raise ErroLote(erros)
+        return self._gravar_lote(validados)
+
+    def _validar_item_lote(self, item: dict):
+        """
+        Valida um item de lote e o normaliza
+        
+        Returns:
+            tuple: (nome, data, minutos, descricao, turno), com turno
+            (entrada, saida) em HH:MM ou None
+        """
+        if not isinstance(item, dict):
+            raise ValueError("Item deve ser um objeto com nome, data e minutos")
+        
+        nome = item.get("nome")
+        self._validar_usuario(nome)
+        
+        data = item.get("data") or ""
+        try:
+            _chave_data(data)
+        except ValueError:
+            raise ValueError(f"Data inválida: {data!r}. Use DD/MM/AAAA")
+        
+        turno = None
+        if item.get("entrada") and item.get("saida"):
+            entrada = self.converter_horario_para_minutos(item["entrada"])
+            saida = self.converter_horario_para_minutos(item["saida"])
+            if not (0 <= entrada < 24 * 60 and 0 <= saida < 24 * 60):
+                raise ValueError("Horários devem estar entre 00:00 e 23:59")
+            if saida <= entrada:
+                raise ValueError("Horário de saída deve ser após o horário de entrada")
+            turno = (formatar_horario(entrada), formatar_horario(saida))
+        
+        if item.get("minutos") not in (None, ""):
+            try:
+                minutos = int(item["minutos"])
+            except (TypeError, ValueError):
+                raise ValueError(f"Minutos inválidos: {item['minutos']!r}")
+            if turno is not None and minutos != saida - entrada:
+                raise ValueError(f"Minutos ({minutos}) não conferem com entrada e saída ({saida - entrada})")
+        elif turno is not None:
+            minutos = saida - entrada
+        else:
+            raise ValueError("Informe minutos ou entrada e saída")
+        
+        if minutos <= 0:
+            raise ValueError("Minutos devem ser positivos")
+        
+        return nome, data, minutos, item.get("descricao") or "", turno
+
+    def _gravar_lote(self, validados, persistir: bool = True):
+        """
+        Registra itens já validados e os persiste com uma única gravação
+        
+        Args:
+            validados (list): Tuplas (nome, data, minutos, descricao, turno)
+            persistir (bool): Grava em disco ao final; desligado, cabe a quem
+                chama salvar os dados depois
+        """
+        novos = [(nome, self._criar_registro(data, minutos, descricao, *(turno or (None, None))))
+                 for nome, data, minutos, descricao, turno in validados]
+        if novos:
+            self._incluir_registros(novos, persistir)
+        return [registro for _, registro in novos]
+
+    def importar_registros(self, caminho: str, formato: str = None, tamanho_lote: int = 1000,
+                           delimitador: str = ",", limite_erros: int = 100):
+        """
+        Importa registros de um arquivo CSV ou JSONL, em fluxo
+        
+        O arquivo é lido duas vezes, em blocos de tamanho fixo: a primeira
+        passada só valida e a segunda registra. Assim arquivos maiores que a
+        memória não são carregados de uma vez e um arquivo com erros não deixa
+        importação pela metade.
+        
+        Args:
+            caminho (str): Arquivo com os itens (mesmos campos de registrar_lote)
+            formato (str): "csv" ou "jsonl" (padrão: pela extensão do arquivo)
+            tamanho_lote (int): Itens registrados por bloco
+            delimitador (str): Separador de colunas do CSV
+            limite_erros (int): Interrompe a validação após esse número de erros
+            
+        Returns:
+            int: Quantidade de registros importados
+            
+        Raises:
+            ErroLote: Com a lista de (linha, mensagem) dos itens inválidos
+        """
+        if formato is None:
+            formato = "jsonl" if caminho.lower().endswith((".jsonl", ".ndjson")) else "csv"
+        
+        erros = []
+        # Turnos do arquivo já conferidos, para achar também sobreposições
+        # entre linhas dele antes de gravar qualquer bloco
+        pendentes = {}
+        if self.apenas_ano is not None:
+            self._completar_carga()
+        for linha, item in self._ler_itens(caminho, formato, delimitador):
+            try:
+                if isinstance(item, ValueError):
+                    raise item
+                nome, data, _, _, turno = self._validar_item_lote(item)
+                if turno is not None and self.turnos_sobrepostos == "rejeitar":
+                    with self._trava:
+                        conflitos = self._conflitos_turnos(
+                            [(nome, {"data": data, "entrada": turno[0], "saida": turno[1]})], pendentes
+                        )
+                    if conflitos:
+                        raise ValueError(conflitos[0][1])
+            except ValueError as e:
+                erros.append((linha, str(e)))
+                if len(erros) >= limite_erros:
+                    break
+        if erros:
+            raise ErroLote(erros)
+        
+        # No modo journal cada bloco é anexado ao journal; sem ele, o arquivo
+        # principal é regravado uma única vez no fim
+        total = 0
+        itens = (item for _, item in self._ler_itens(caminho, formato, delimitador))
+        while True:
+            bloco = [self._validar_item_lote(item) for item in islice(itens, tamanho_lote)]
+            if not bloco:
+                break
+            self._gravar_lote(bloco, persistir=self.journal is not None)
+            total += len(bloco)
+        
+        if self.journal is None and total:
+            self.salvar_dados()
+        return total
+
+    @staticmethod
+    def _ler_itens(caminho: str, formato: str, delimitador: str = ","):
+        """
+        Gera (linha, item) de um arquivo CSV ou JSONL sem carregá-lo inteiro
+
+        Uma linha JSONL malformada vem com um ValueError no lugar do item.
+        """
+        with open(caminho, 'r', encoding='utf-8', newline='') as f:
+            if formato == "csv":
+                leitor = csv.DictReader(f, delimiter=delimitador)
+                for item in leitor:
+                    yield leitor.line_num, item
+            elif formato == "jsonl":
+                for linha, texto in enumerate(f, 1):
+                    if texto.strip():
+                        try:
+                            yield linha, json.loads(texto)
+                        except ValueError as e:
+                            # O erro fica com a linha, como o de um item inválido
+                            yield linha, ValueError(f"JSON inválido: {e}")
+            else:
+                raise ValueError(f"Formato {formato} não suportado. Use csv ou jsonl")
+
     def gerar_relatorio_mensal(self, mes: int = None, ano: int = None):
         """Gera relatório mensal com conversão precisa de minutos para horas"""
         hoje = datetime.now()
         mes = mes if mes is not None else hoje.month
         ano = ano if ano is not None else hoje.year
         
+        self._garantir_anos(ano)
+        chave = ("mensal", ano, mes)
+        versao = (self._versao_dados, self._versoes_periodo.get((ano, mes), 0))
+        relatorio = self._relatorio_em_cache(chave, versao)
+        if relatorio is not None:
+            return relatorio
+        
+        totais_mes = self._totais["mes"]
+        minutos_por_usuario = {
+            usuario: totais_mes.get((usuario, ano, mes), 0)
+            for usuario in self._usuarios_relatorio(ano, mes=mes)
+        }
+        
+        relatorio = self._montar_relatorio_mensal(mes, ano, minutos_por_usuario)
+        self._guardar_relatorio(chave, versao, relatorio)
+        return relatorio
+
+    def _relatorio_em_cache(self, chave, versao):
+        """Cópia do relatório em cache para essa versão dos dados, ou None"""
+        if self._cache_relatorios is None:
+            return None
+        return self._cache_relatorios.obter(chave, versao)
+
+    def _guardar_relatorio(self, chave, versao, relatorio: dict):
+        if self._cache_relatorios is not None:
+            self._cache_relatorios.guardar(chave, versao, relatorio)
+
+    @staticmethod
+    def _montar_relatorio_mensal(mes: int, ano: int, minutos_por_usuario: dict):
+        """Monta o dicionário do relatório mensal a partir dos minutos de cada usuário"""
         relatorio = {
             "mes": mes,
             "ano": ano,
@@ -213,35 +1795,199 @@ class CentralHorasEstagio:
             "total_horas": 0.0  # Alterado para float para maior precisão
         }
         
-        for usuario in self.usuarios:
-            # Obtém todos os registros do mês
-            registros_mes = [
-                reg for reg in self.dados["usuarios"][usuario]["registros"]
-                if datetime.strptime(reg["data"], "%d/%m/%Y").month == mes
-                and datetime.strptime(reg["data"], "%d/%m/%Y").year == ano
-            ]
-            
-            # Calcula minutos totais de forma robusta
-            minutos_totais = sum(
-                reg.get("minutos", int(reg["horas"] * 60))  # Converte horas para minutos se necessário
-                for reg in registros_mes
-            )
-            
+        for usuario, minutos_totais in minutos_por_usuario.items():
             # Calcula horas com precisão decimal
-            horas_totais = round(minutos_totais / 60, 2)
-            
             relatorio["usuarios"][usuario] = {
                 "minutos": minutos_totais,
-                "horas": horas_totais
+                "horas": round(minutos_totais / 60, 2)
             }
             relatorio["total_minutos"] += minutos_totais
-            relatorio["total_horas"] = round(relatorio["total_minutos"] / 60, 2)
         
+        relatorio["total_horas"] = round(relatorio["total_minutos"] / 60, 2)
         return relatorio
 
+    def ranking_janela(self, janela: str = "semana", quantidade: int = 10):
+        """
+        Ranking dos últimos dias (janela móvel terminando hoje), sem ordenar todos os usuários
+
+        Args:
+            janela (str): "semana" (7 dias), "30_dias" ou "semestre" (182 dias)
+            quantidade (int): Tamanho do ranking
+
+        Returns:
+            list: Dicts com "posicao", "nome", "minutos" e "horas", do maior
+            para o menor; empatados dividem a posição
+        """
+        with self._trava:
+            ranking = self._obter_placar().maiores(janela, quantidade)
+        return [
+            {"posicao": posicao, "nome": nome, "minutos": minutos, "horas": round(minutos / 60, 2)}
+            for posicao, nome, minutos in ranking
+        ]
+
+    def posicao_no_ranking(self, nome: str, janela: str = "semana"):
+        """
+        Posição de um estagiário no ranking de uma janela móvel
+
+        Returns:
+            dict: "nome", "janela", "posicao", "minutos", "horas",
+            "participantes" (usuários com minutos na janela) e
+            "minutos_para_subir" (None para quem está em primeiro)
+        """
+        if self.id_usuario(nome) is None:
+            raise ValueError(f"Usuário {nome} não encontrado")
+        with self._trava:
+            posicao = self._obter_placar().posicao(janela, nome)
+        return {"nome": nome, "janela": janela, **posicao, "horas": round(posicao["minutos"] / 60, 2)}
+
+    def _obter_placar(self) -> Placar:
+        """Placar das janelas móveis, montado dos contadores por dia no primeiro uso"""
+        inicio = date.today() - timedelta(days=max(JANELAS.values()) - 1)
+        self._garantir_anos(inicio.year, date.today().year)
+        with self._trava:
+            if self._placar is None:
+                placar = Placar()
+                placar.carregar(
+                    (nome, date(ano, mes, dia).toordinal(), minutos)
+                    for (nome, ano, mes, dia), minutos in self._totais["dia"].items()
+                    if ano >= inicio.year
+                )
+                self._placar = placar
+            return self._placar
+
     def get_registros_usuario(self, nome: str):
-        """Retorna todos os registros de um usuário"""
-        return self.dados["usuarios"][nome]["registros"]
+        """
+        Retorna todos os registros de um usuário, ativo ou não
+        
+        Raises:
+            ValueError: Usuário não cadastrado
+        """
+        self._validar_usuario(nome, incluir_inativos=True)
+        if self.apenas_ano is not None:
+            self._completar_carga()
+        with self._trava:
+            return self.dados["usuarios"].setdefault(nome, {"registros": self._nova_lista()})["registros"]
+
+    def iterar_registros(self, nome: str):
+        """Percorre todos os registros do usuário, na ordem de inclusão, sem copiá-los"""
+        return iter(self.get_registros_usuario(nome))
+
+    def registros_periodo(self, nome: str, inicio, fim):
+        """
+        Percorre, em ordem de data, os registros do usuário entre duas datas
+        
+        Os registros são entregues um a um, sem copiar o histórico; a busca
+        usa o índice por data do usuário (bisect), montado no primeiro uso.
+        
+        Args:
+            nome (str): Nome do usuário
+            inicio: Primeira data do período (DD/MM/AAAA ou date)
+            fim: Última data do período, inclusive (DD/MM/AAAA ou date)
+            
+        Returns:
+            generator: Registros no formato do arquivo
+            
+        Raises:
+            ValueError: Usuário inexistente ou período inválido (já na chamada)
+        """
+        registros, posicoes = self._posicoes_periodo(nome, inicio, fim)
+        return (registros[posicao] for posicao in posicoes)
+
+    def registros_mes(self, nome: str, mes: int = None, ano: int = None):
+        """
+        Registros do usuário no mês, na ordem de inclusão
+        
+        Lê só o balde do mês no índice usuário -> ano -> mês, montado no
+        primeiro uso e mantido a cada registro incluído; os totais do mês
+        vêm dos contadores materializados, não daqui.
+        
+        Returns:
+            list: Registros no formato do arquivo
+            
+        Raises:
+            ValueError: Usuário não cadastrado
+        """
+        hoje = datetime.now()
+        mes = mes if mes is not None else hoje.month
+        ano = ano if ano is not None else hoje.year
+        
+        self._validar_usuario(nome, incluir_inativos=True)
+        self._garantir_anos(ano)
+        with self._trava:
+            registros = self.dados["usuarios"].setdefault(nome, {"registros": self._nova_lista()})["registros"]
+            indice = self._indices_meses.get(nome)
+            if indice is None:
+                indice = self._indices_meses[nome] = self._indexar_meses(registros)
+            return [registros[posicao] for posicao in indice.get(ano, {}).get(mes, ())]
+
+    @staticmethod
+    def _indexar_meses(registros):
+        """Monta o índice ano -> mês -> posições dos registros em uma passada"""
+        if isinstance(registros, RegistrosColunares):
+            chaves = (_chave_ordinal(ordinal) for ordinal in registros.dias)
+        else:
+            chaves = (_chave_registro(registro) for registro in registros)
+        indice = {}
+        for posicao, (ano, mes, _) in enumerate(chaves):
+            indice.setdefault(ano, {}).setdefault(mes, []).append(posicao)
+        return indice
+
+    def paginar_periodo(self, nome: str, inicio, fim, tamanho_pagina: int = 100):
+        """
+        Como registros_periodo, mas em páginas (listas) de até tamanho_pagina registros
+        
+        Returns:
+            generator: Listas de registros, em ordem de data
+        """
+        if tamanho_pagina <= 0:
+            raise ValueError("Tamanho da página deve ser positivo")
+        registros = self.registros_periodo(nome, inicio, fim)
+        while True:
+            pagina = list(islice(registros, tamanho_pagina))
+            if not pagina:
+                return
+            yield pagina
+
+    def minutos_periodo(self, nome: str, inicio, fim) -> int:
+        """
+        Soma os minutos do usuário entre duas datas (inclusive)
+        
+        Args:
+            nome (str): Nome do usuário
+            inicio: Primeira data do período (DD/MM/AAAA ou date)
+            fim: Última data do período (DD/MM/AAAA ou date)
+        """
+        registros, posicoes = self._posicoes_periodo(nome, inicio, fim)
+        if isinstance(registros, RegistrosColunares):
+            minutos = registros.minutos
+            return sum(minutos[posicao] for posicao in posicoes)
+        return sum(_minutos_registro(registros[posicao]) for posicao in posicoes)
+
+    def _posicoes_periodo(self, nome: str, inicio, fim):
+        """
+        Localiza no índice por data os registros do período
+        
+        Returns:
+            tuple: (lista de registros do usuário, posições na lista em ordem de data)
+        """
+        inicio, fim = _ordinal_limite(inicio), _ordinal_limite(fim)
+        if fim < inicio:
+            raise ValueError("Data final deve ser igual ou posterior à data inicial")
+        
+        self._garantir_anos(date.fromordinal(inicio).year, date.fromordinal(fim).year)
+        with self._trava:
+            if nome not in self.dados["usuarios"]:
+                raise ValueError(f"Usuário {nome} não encontrado")
+            registros = self.dados["usuarios"][nome]["registros"]
+            indice = self._indices_datas.get(nome)
+            if indice is None:
+                if isinstance(registros, RegistrosColunares):
+                    ordinais = registros.dias
+                else:
+                    ordinais = (_dia_registro(registro) for registro in registros)
+                indice = self._indices_datas[nome] = IndiceDatas.construir(ordinais)
+            # Cópia só das posições: registros incluídos depois não afetam a iteração
+            return registros, indice.posicoes_periodo(inicio, fim)
 
     @staticmethod
     def converter_horario_para_minutos(horario: str) -> int:
@@ -253,10 +1999,109 @@ class CentralHorasEstagio:
             raise ValueError("Formato inválido. Use HH:MM")
         
     def gerar_relatorio_anual(self, ano: int = None):
-        """Gera relatório anual com horas e minutos trabalhados"""
+        """
+        Gera relatório anual com horas e minutos trabalhados
+        
+        Não recorre a gerar_relatorio_periodo: os 12 meses de cada usuário já
+        estão somados nos contadores materializados, atualizados a cada
+        registro, e lê-los custa O(usuários) em vez de uma passada pelos
+        registros. Os dois devolvem o mesmo dicionário para o mesmo ano
+        (tests/test_relatorios.py compara ambos com o algoritmo original).
+        """
         hoje = datetime.now()
         ano = ano if ano is not None else hoje.year
         
+        self._garantir_anos(ano)
+        chave = ("anual", ano)
+        versao = (self._versao_dados, self._versoes_periodo.get(ano, 0))
+        relatorio = self._relatorio_em_cache(chave, versao)
+        if relatorio is not None:
+            return relatorio
+        
+        totais_mes = self._totais["mes"]
+        minutos_por_usuario = {
+            usuario: [totais_mes.get((usuario, ano, mes), 0) for mes in range(1, 13)]
+            for usuario in self._usuarios_relatorio(ano)
+        }
+        
+        relatorio = self._montar_relatorio_anual(ano, minutos_por_usuario)
+        self._guardar_relatorio(chave, versao, relatorio)
+        return relatorio
+
+    def gerar_relatorio_periodo(self, ano_inicio: int, ano_fim: int):
+        """
+        Gera os relatórios anuais de vários anos com uma passada pelos registros
+
+        Ao contrário de gerar_relatorio_anual, não usa os contadores
+        materializados: recontam-se os próprios registros de cada usuário.
+        
+        Args:
+            ano_inicio (int): Primeiro ano do período
+            ano_fim (int): Último ano do período (inclusive)
+            
+        Returns:
+            dict: Para cada ano, relatório no formato de gerar_relatorio_anual
+        """
+        if ano_fim < ano_inicio:
+            raise ValueError("Ano final deve ser maior ou igual ao ano inicial")
+        
+        self._garantir_anos(ano_inicio, ano_fim)
+        registros = {
+            usuario: self.dados["usuarios"][usuario]["registros"]
+            for usuario in self._usuarios_relatorio(ano_inicio, ano_fim)
+        }
+        tamanhos = {usuario: len(lista) for usuario, lista in registros.items()}
+        if (self.processos_relatorio > 1 and sum(tamanhos.values()) >= self.LIMITE_RELATORIO_PARALELO
+                and _fork_seguro()):
+            minutos_periodo = self._somar_meses_em_paralelo(registros, tamanhos, ano_inicio, ano_fim)
+        else:
+            minutos_periodo = {
+                usuario: _somar_meses(lista, ano_inicio, ano_fim)
+                for usuario, lista in registros.items()
+            }
+        
+        relatorios = {}
+        for indice, ano in enumerate(range(ano_inicio, ano_fim + 1)):
+            minutos_por_usuario = {
+                usuario: meses[indice * 12:(indice + 1) * 12]
+                for usuario, meses in minutos_periodo.items()
+            }
+            relatorios[ano] = self._montar_relatorio_anual(ano, minutos_por_usuario)
+        return relatorios
+
+    def _somar_meses_em_paralelo(self, registros: dict, tamanhos: dict, ano_inicio: int, ano_fim: int):
+        """
+        Divide os usuários entre processos e junta as somas por mês de cada um
+        
+        Os processos são criados com fork e herdam os registros; só é
+        chamado quando _fork_seguro() permite.
+        
+        Returns:
+            dict: Usuário -> lista de _somar_meses, na ordem de `registros`
+        """
+        lotes = _dividir_usuarios(tamanhos, self.processos_relatorio * 4)
+        processos = min(self.processos_relatorio, len(lotes))
+        parciais = {}
+        _registros_compartilhados.update(registros)
+        try:
+            with ProcessPoolExecutor(processos, mp_context=multiprocessing.get_context("fork")) as executor:
+                for parcial in executor.map(_somar_meses_compartilhados, lotes,
+                                            [ano_inicio] * len(lotes), [ano_fim] * len(lotes)):
+                    parciais.update(parcial)
+        finally:
+            _registros_compartilhados.clear()
+        return {usuario: parciais[usuario] for usuario in registros}
+
+    @staticmethod
+    def _montar_relatorio_anual(ano: int, minutos_por_usuario: dict):
+        """
+        Monta o dicionário do relatório anual
+
+        Args:
+            ano (int): Ano do relatório
+            minutos_por_usuario (dict): Para cada usuário, sequência com os
+                minutos de janeiro a dezembro
+        """
         relatorio = {
             "ano": ano,
             "usuarios": {},
@@ -265,52 +2110,55 @@ class CentralHorasEstagio:
             "meses": {mes: {"total_minutos": 0, "total_horas": 0.0} for mes in range(1, 13)}
         }
         
-        for usuario in self.usuarios:
-            # Inicializa os dados do usuário
-            relatorio["usuarios"][usuario] = {
-                "minutos": 0,
-                "horas": 0.0,
-                "meses": {mes: {"minutos": 0, "horas": 0.0} for mes in range(1, 13)}
-            }
-            
-            # Obtém todos os registros do ano
-            registros_ano = [
-                reg for reg in self.dados["usuarios"][usuario]["registros"]
-                if datetime.strptime(reg["data"], "%d/%m/%Y").year == ano
-            ]
-            
-            # Calcula totais por mês
-            for mes in range(1, 13):
-                registros_mes = [
-                    reg for reg in registros_ano
-                    if datetime.strptime(reg["data"], "%d/%m/%Y").month == mes
-                ]
-                
-                minutos_mes = sum(
-                    reg.get("minutos", int(reg["horas"] * 60))
-                    for reg in registros_mes
-                )
-                horas_mes = round(minutos_mes / 60, 2)
-                
-                relatorio["usuarios"][usuario]["meses"][mes] = {
+        for usuario, minutos_meses in minutos_por_usuario.items():
+            meses_usuario = {}
+            for mes, minutos_mes in enumerate(minutos_meses, 1):
+                meses_usuario[mes] = {
                     "minutos": minutos_mes,
-                    "horas": horas_mes
+                    "horas": round(minutos_mes / 60, 2)
                 }
-                
-                # Atualiza totais do usuário
-                relatorio["usuarios"][usuario]["minutos"] += minutos_mes
-                relatorio["usuarios"][usuario]["horas"] = round(
-                    relatorio["usuarios"][usuario]["minutos"] / 60, 2)
-                
                 # Atualiza totais gerais
                 relatorio["meses"][mes]["total_minutos"] += minutos_mes
-                relatorio["meses"][mes]["total_horas"] = round(
-                    relatorio["meses"][mes]["total_minutos"] / 60, 2)
-                
-                relatorio["total_minutos"] += minutos_mes
-                relatorio["total_horas"] = round(relatorio["total_minutos"] / 60, 2)
+            
+            minutos_usuario = sum(minutos_meses)
+            relatorio["usuarios"][usuario] = {
+                "minutos": minutos_usuario,
+                "horas": round(minutos_usuario / 60, 2),
+                "meses": meses_usuario
+            }
+            relatorio["total_minutos"] += minutos_usuario
         
+        for totais_mes in relatorio["meses"].values():
+            totais_mes["total_horas"] = round(totais_mes["total_minutos"] / 60, 2)
+        relatorio["total_horas"] = round(relatorio["total_minutos"] / 60, 2)
         return relatorio
 
-# Instância global para ser usada no seu código
-central_horas = CentralHorasEstagio()
+def criar_central(arquivo_dados: str = "horas_estagio.json", **opcoes):
+    """
+    Cria a central com o armazenamento adequado ao arquivo de dados
+
+    Arquivos .db/.sqlite/.sqlite3 usam o banco SQLite; os demais, o JSON,
+    dividido por ano se o arquivo já for um manifesto de partições.
+    """
+    if arquivo_dados.endswith((".db", ".sqlite", ".sqlite3")):
+        from central_horas_sqlite import CentralHorasSQLite
+        return CentralHorasSQLite(arquivo_dados, **opcoes)
+    if "particionar_por_ano" not in opcoes and eh_manifesto(arquivo_dados):
+        opcoes["particionar_por_ano"] = True
+    return CentralHorasEstagio(arquivo_dados, **opcoes)
+
+_central_padrao = None
+
+def obter_central_padrao():
+    """Retorna a instância compartilhada da central, criada no primeiro uso"""
+    global _central_padrao
+    if _central_padrao is None:
+        _central_padrao = CentralHorasEstagio()
+    return _central_padrao
+
+def __getattr__(nome: str):
+    # Compatibilidade com `from central_horas import central_horas`, sem
+    # criar a instância (nem ler o arquivo) na importação do módulo
+    if nome == "central_horas":
+        return obter_central_padrao()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
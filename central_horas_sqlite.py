@@ -0,0 +1,548 @@
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from cadastro_usuarios import CadastroUsuarios
+from central_horas import CentralHorasEstagio, _ordinal_limite, criar_central
+from indice_turnos import formatar_horario, sobreposicoes, turno_registro
+from placar import JANELAS, Placar
+
+# Minutos do registro; registros antigos só têm horas
+_MINUTOS = "COALESCE(r.minutos, CAST(r.horas * 60 AS INTEGER))"
+
+# Colunas lidas para montar um registro (ver _registro_de_linha)
+_COLUNAS_REGISTRO = "r.data, r.minutos, r.horas, r.descricao, r.timestamp, r.entrada, r.saida, r.sobreposto"
+
+# Colunas acrescentadas depois da criação da tabela de registros
+_COLUNAS_NOVAS_REGISTROS = {
+    "entrada": "INTEGER",
+    "saida": "INTEGER",
+    "sobreposto": "INTEGER NOT NULL DEFAULT 0",
+}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE,
+    ativo INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS registros (
+    id INTEGER PRIMARY KEY,
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id),
+    data TEXT NOT NULL,
+    data_iso TEXT NOT NULL,
+    minutos INTEGER,
+    horas REAL NOT NULL,
+    descricao TEXT,
+    timestamp TEXT,
+    entrada INTEGER,
+    saida INTEGER,
+    sobreposto INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_registros_usuario_data ON registros(usuario_id, data_iso);
+CREATE INDEX IF NOT EXISTS idx_registros_data ON registros(data_iso);
+CREATE TABLE IF NOT EXISTS metadados (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+
+def _data_iso(data: str) -> str:
+    """Converte DD/MM/AAAA para AAAA-MM-DD, que ordena e compara como texto"""
+    return datetime.strptime(data, "%d/%m/%Y").strftime("%Y-%m-%d")
+
+
+def _intervalo_mes(mes: int, ano: int):
+    """Retorna o primeiro dia do mês e o primeiro dia do mês seguinte em ISO"""
+    inicio = date(ano, mes, 1)
+    fim = date(ano + 1, 1, 1) if mes == 12 else date(ano, mes + 1, 1)
+    return inicio.isoformat(), fim.isoformat()
+
+
+class CentralHorasSQLite(CentralHorasEstagio):
+    """
+    Central de horas armazenada em um banco SQLite local
+
+    Os registros não são carregados em memória: os totais de dia, mês e ano
+    são calculados pelo banco com GROUP BY sobre os índices de usuário e data.
+    """
+
+    def __init__(self, arquivo_dados: str = "horas_estagio.db", instrumentar: bool = False,
+                 arquivo_estatisticas: str = None, intervalo_estatisticas: float = 60.0,
+                 turnos_sobrepostos: str = "rejeitar"):
+        # As chamadas podem vir de threads de trabalho (interface gráfica); o
+        # SQLite serializa o acesso à conexão
+        self.conexao = sqlite3.connect(arquivo_dados, check_same_thread=False)
+        self.conexao.executescript(_ESQUEMA)
+        self._migrar_esquema()
+        super().__init__(arquivo_dados, instrumentar=instrumentar, arquivo_estatisticas=arquivo_estatisticas,
+                         intervalo_estatisticas=intervalo_estatisticas, turnos_sobrepostos=turnos_sobrepostos)
+        self.carregar_dados()
+
+    def _migrar_esquema(self):
+        """Acrescenta as colunas que faltam em bancos criados antes do cadastro de usuários e dos turnos"""
+        colunas = {linha[1] for linha in self.conexao.execute("PRAGMA table_info(usuarios)")}
+        if "ativo" not in colunas:
+            with self.conexao:
+                self.conexao.execute("ALTER TABLE usuarios ADD COLUMN ativo INTEGER NOT NULL DEFAULT 1")
+        colunas = {linha[1] for linha in self.conexao.execute("PRAGMA table_info(registros)")}
+        with self.conexao:
+            for coluna, tipo in _COLUNAS_NOVAS_REGISTROS.items():
+                if coluna not in colunas:
+                    self.conexao.execute(f"ALTER TABLE registros ADD COLUMN {coluna} {tipo}")
+
+    def _inicializar_dados(self):
+        """Os dados ficam no banco; não há cópia em memória"""
+        return None
+
+    def carregar_dados(self):
+        """Cadastra os usuários padrão em um banco novo"""
+        self._carregado = True
+        with self._transacao_gravacao():
+            if self.conexao.execute("SELECT 1 FROM usuarios LIMIT 1").fetchone() is None:
+                self.conexao.executemany(
+                    "INSERT INTO usuarios (nome) VALUES (?)",
+                    [(user,) for user in self.USUARIOS_PADRAO]
+                )
+
+    @property
+    def usuarios(self):
+        """Nomes dos usuários ativos, na ordem do cadastro"""
+        return [linha[0] for linha in self.conexao.execute("SELECT nome FROM usuarios WHERE ativo = 1 ORDER BY id")]
+
+    def id_usuario(self, nome: str):
+        """Id do usuário, ativo ou não, ou None se o nome não estiver cadastrado"""
+        return self._id_usuario(nome)
+
+    def listar_usuarios(self, incluir_inativos: bool = False):
+        """Lista o cadastro como dicts com "id", "nome" e "ativo", por ordem de id"""
+        filtro = "" if incluir_inativos else " WHERE ativo = 1"
+        linhas = self.conexao.execute(f"SELECT id, nome, ativo FROM usuarios{filtro} ORDER BY id")
+        return [{"id": id_usuario, "nome": nome, "ativo": bool(ativo)} for id_usuario, nome, ativo in linhas]
+
+    def _alterar_cadastro(self, operacao: str, nome: str, novo_nome: str = None) -> int:
+        """Valida com as regras de CadastroUsuarios e aplica a alteração na tabela usuarios"""
+        with self._transacao_gravacao():
+            entrada = self._ler_cadastro().preparar(operacao, nome, novo_nome)
+            if operacao == "cadastrar":
+                self.conexao.execute("INSERT INTO usuarios (id, nome) VALUES (?, ?)", (entrada["id"], nome))
+            elif operacao == "renomear":
+                self.conexao.execute("UPDATE usuarios SET nome = ? WHERE id = ?", (novo_nome, entrada["id"]))
+            else:
+                self.conexao.execute("UPDATE usuarios SET ativo = ? WHERE id = ?",
+                                     (int(operacao == "reativar"), entrada["id"]))
+            self._marcar_atualizacao()
+        return entrada["id"]
+
+    def _ler_cadastro(self) -> CadastroUsuarios:
+        """Monta um CadastroUsuarios com a tabela usuarios, para validar alterações"""
+        usuarios = {
+            str(id_usuario): {"nome": nome, "ativo": bool(ativo)}
+            for id_usuario, nome, ativo in self.conexao.execute("SELECT id, nome, ativo FROM usuarios")
+        }
+        proximo_id = max(map(int, usuarios), default=0) + 1
+        return CadastroUsuarios({"proximo_id": proximo_id, "usuarios": usuarios})
+
+    def _usuarios_relatorio(self, ano_inicio: int, ano_fim: int = None, mes: int = None):
+        """Usuários ativos e, dos inativos, os que têm registros no período"""
+        if mes is not None:
+            intervalo = _intervalo_mes(mes, ano_inicio)
+        else:
+            ano_fim = ano_fim if ano_fim is not None else ano_inicio
+            intervalo = (f"{ano_inicio:04d}-01-01", f"{ano_fim + 1:04d}-01-01")
+        inativos = [linha[0] for linha in self.conexao.execute(
+            "SELECT u.nome FROM usuarios u WHERE u.ativo = 0 AND EXISTS ("
+            "SELECT 1 FROM registros r WHERE r.usuario_id = u.id AND r.data_iso >= ? AND r.data_iso < ?"
+            ") ORDER BY u.id",
+            intervalo
+        )]
+        return self.usuarios + inativos
+
+    def salvar_dados(self):
+        """Registra a data da última atualização; os registros já são gravados na inserção"""
+        with self._transacao_gravacao():
+            self._marcar_atualizacao()
+
+    def _marcar_atualizacao(self):
+        """Atualiza a data da última atualização (sem commit)"""
+        self.conexao.execute(
+            "INSERT OR REPLACE INTO metadados (chave, valor) VALUES ('ultima_atualizacao', ?)",
+            (datetime.now().isoformat(),)
+        )
+
+    def _usuario_existe(self, nome: str, incluir_inativos: bool = False) -> bool:
+        """Verifica se o usuário está cadastrado e ativo (ou só cadastrado, com incluir_inativos) no banco"""
+        linha = self.conexao.execute("SELECT ativo FROM usuarios WHERE nome = ?", (nome,)).fetchone()
+        return bool(linha and (incluir_inativos or linha[0]))
+
+    def _id_usuario(self, nome: str):
+        """Retorna o id do usuário ou None se não existir"""
+        linha = self.conexao.execute("SELECT id FROM usuarios WHERE nome = ?", (nome,)).fetchone()
+        return linha[0] if linha else None
+
+    def _id_usuario_ativo(self, nome: str) -> int:
+        """
+        Id do usuário que vai receber registros, lido dentro da transação de escrita
+
+        Raises:
+            ValueError: Usuário não cadastrado ou inativo, como no JSON
+        """
+        linha = self.conexao.execute("SELECT id FROM usuarios WHERE nome = ? AND ativo = 1", (nome,)).fetchone()
+        if linha is None:
+            raise ValueError(f"Usuário {nome} não está cadastrado ou está inativo")
+        return linha[0]
+
+    def _registrar_minutos(self, nome: str, data: str, minutos: int, descricao: str = "",
+                           entrada: str = None, saida: str = None):
+        """Método interno para registro por minutos (com o turno, se houver)"""
+        registro = self._criar_registro(data, minutos, descricao, entrada, saida)
+        with self._transacao_gravacao():
+            self._conferir_turnos([(nome, registro)])
+            self._inserir_registros(self._id_usuario_ativo(nome), [registro])
+            self._marcar_atualizacao()
+        return registro
+
+    def _gravar_lote(self, validados, persistir: bool = True):
+        """Registra itens já validados em uma única transação"""
+        novos = [(nome, self._criar_registro(data, minutos, descricao, *(turno or (None, None))))
+                 for nome, data, minutos, descricao, turno in validados]
+        with self._transacao_gravacao():
+            self._conferir_turnos(novos)
+            # Na ordem dos itens (r.id é a ordem de get_registros_usuario);
+            # itens seguidos do mesmo usuário vão em um só executemany
+            for nome, grupo in groupby(novos, key=itemgetter(0)):
+                self._inserir_registros(self._id_usuario_ativo(nome), [registro for _, registro in grupo])
+            self._marcar_atualizacao()
+        return [registro for _, registro in novos]
+
+    @contextmanager
+    def _transacao_gravacao(self):
+        """
+        Transação de escrita em que a conferência dos turnos e o INSERT são atômicos
+
+        A trava da central separa as threads, que dividem a conexão; o BEGIN
+        IMMEDIATE reserva a escrita no banco antes da conferência, contra
+        outras conexões (outros processos). Toda escrita na conexão passa por
+        aqui: um commit de fora da trava encerraria a transação de outra thread.
+        """
+        with self._trava, self.conexao:
+            self.conexao.execute("BEGIN IMMEDIATE")
+            yield
+
+    def _inserir_registros(self, usuario_id: int, registros):
+        """Insere registros no formato do JSON para um usuário (sem commit)"""
+        self.conexao.executemany(
+            "INSERT INTO registros (usuario_id, data, data_iso, minutos, horas, descricao, timestamp, "
+            "entrada, saida, sobreposto) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (usuario_id, reg["data"], _data_iso(reg["data"]), reg.get("minutos"),
+                 reg.get("horas", reg.get("minutos", 0) / 60), reg.get("descricao"), reg.get("timestamp"),
+                 *(turno_registro(reg) or (None, None)), int(bool(reg.get("sobreposto"))))
+                for reg in registros
+            ]
+        )
+
+    def calcular_minutos_dia(self, nome: str, data: str = None):
+        """Calcula minutos trabalhados em um dia específico"""
+        if data is None:
+            data = datetime.now().strftime("%d/%m/%Y")
+
+        self._validar_usuario(nome, incluir_inativos=True)
+        try:
+            data_iso = _data_iso(data)
+        except ValueError:
+            return 0  # Data em formato inválido não tem registros
+        linha = self.conexao.execute(
+            f"SELECT COALESCE(SUM({_MINUTOS}), 0) FROM registros r "
+            "JOIN usuarios u ON u.id = r.usuario_id WHERE u.nome = ? AND r.data_iso = ?",
+            (nome, data_iso)
+        ).fetchone()
+        return linha[0]
+
+    def calcular_minutos_mes(self, nome: str, mes: int = None, ano: int = None):
+        """Calcula minutos trabalhados no mês"""
+        hoje = datetime.now()
+        mes = mes if mes is not None else hoje.month
+        ano = ano if ano is not None else hoje.year
+
+        self._validar_usuario(nome, incluir_inativos=True)
+        linha = self.conexao.execute(
+            f"SELECT COALESCE(SUM({_MINUTOS}), 0) FROM registros r "
+            "JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE u.nome = ? AND r.data_iso >= ? AND r.data_iso < ?",
+            (nome, *_intervalo_mes(mes, ano))
+        ).fetchone()
+        return linha[0]
+
+    def calcular_minutos_ano(self, nome: str, ano: int = None):
+        """Calcula minutos trabalhados no ano"""
+        ano = ano if ano is not None else datetime.now().year
+
+        self._validar_usuario(nome, incluir_inativos=True)
+        linha = self.conexao.execute(
+            f"SELECT COALESCE(SUM({_MINUTOS}), 0) FROM registros r "
+            "JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE u.nome = ? AND r.data_iso >= ? AND r.data_iso < ?",
+            (nome, f"{ano:04d}-01-01", f"{ano + 1:04d}-01-01")
+        ).fetchone()
+        return linha[0]
+
+    def calcular_minutos_totais(self, mes: int = None, ano: int = None):
+        """Calcula os minutos de todos os usuários no ano ou, se informado, no mês"""
+        ano = ano if ano is not None else datetime.now().year
+        if mes is None:
+            intervalo = (f"{ano:04d}-01-01", f"{ano + 1:04d}-01-01")
+        else:
+            intervalo = _intervalo_mes(mes, ano)
+
+        linha = self.conexao.execute(
+            f"SELECT COALESCE(SUM({_MINUTOS}), 0) FROM registros r "
+            "WHERE r.data_iso >= ? AND r.data_iso < ?",
+            intervalo
+        ).fetchone()
+        return linha[0]
+
+    def verificar_consistencia(self, corrigir: bool = False):
+        """Não há contadores materializados: os totais vêm sempre do banco"""
+        return []
+
+    def gerar_relatorio_mensal(self, mes: int = None, ano: int = None):
+        """Gera relatório mensal agregando os minutos de cada usuário no banco"""
+        hoje = datetime.now()
+        mes = mes if mes is not None else hoje.month
+        ano = ano if ano is not None else hoje.year
+
+        totais = dict(self.conexao.execute(
+            f"SELECT u.nome, SUM({_MINUTOS}) FROM registros r "
+            "JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE r.data_iso >= ? AND r.data_iso < ? GROUP BY r.usuario_id",
+            _intervalo_mes(mes, ano)
+        ))
+        minutos_por_usuario = {usuario: totais.get(usuario, 0) for usuario in self._usuarios_relatorio(ano, mes=mes)}
+        return self._montar_relatorio_mensal(mes, ano, minutos_por_usuario)
+
+    def gerar_relatorio_anual(self, ano: int = None):
+        """Gera relatório anual agregando os minutos por usuário e mês no banco"""
+        hoje = datetime.now()
+        ano = ano if ano is not None else hoje.year
+
+        minutos_por_usuario = {usuario: [0] * 12 for usuario in self._usuarios_relatorio(ano)}
+        linhas = self.conexao.execute(
+            f"SELECT u.nome, CAST(substr(r.data_iso, 6, 2) AS INTEGER), SUM({_MINUTOS}) "
+            "FROM registros r JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE r.data_iso >= ? AND r.data_iso < ? GROUP BY r.usuario_id, 2",
+            (f"{ano:04d}-01-01", f"{ano + 1:04d}-01-01")
+        )
+        for usuario, mes, minutos in linhas:
+            if usuario in minutos_por_usuario:
+                minutos_por_usuario[usuario][mes - 1] = minutos
+        return self._montar_relatorio_anual(ano, minutos_por_usuario)
+
+    def gerar_relatorio_periodo(self, ano_inicio: int, ano_fim: int):
+        """Gera os relatórios anuais de vários anos com uma única consulta ao banco"""
+        if ano_fim < ano_inicio:
+            raise ValueError("Ano final deve ser maior ou igual ao ano inicial")
+
+        anos = range(ano_inicio, ano_fim + 1)
+        usuarios = self._usuarios_relatorio(ano_inicio, ano_fim)
+        minutos = {ano: {usuario: [0] * 12 for usuario in usuarios} for ano in anos}
+        linhas = self.conexao.execute(
+            f"SELECT u.nome, CAST(substr(r.data_iso, 1, 4) AS INTEGER), "
+            f"CAST(substr(r.data_iso, 6, 2) AS INTEGER), SUM({_MINUTOS}) "
+            "FROM registros r JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE r.data_iso >= ? AND r.data_iso < ? GROUP BY r.usuario_id, 2, 3",
+            (f"{ano_inicio:04d}-01-01", f"{ano_fim + 1:04d}-01-01")
+        )
+        for usuario, ano, mes, total in linhas:
+            if usuario in minutos[ano]:
+                minutos[ano][usuario][mes - 1] = total
+        return {ano: self._montar_relatorio_anual(ano, minutos[ano]) for ano in anos}
+
+    def _obter_placar(self) -> Placar:
+        """Placar montado a cada consulta com os minutos por dia do último semestre, somados no banco"""
+        inicio = date.today() - timedelta(days=max(JANELAS.values()) - 1)
+        linhas = self.conexao.execute(
+            f"SELECT u.nome, r.data_iso, SUM({_MINUTOS}) FROM registros r "
+            "JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE r.data_iso >= ? GROUP BY r.usuario_id, r.data_iso",
+            (inicio.isoformat(),)
+        )
+        placar = Placar()
+        placar.carregar((nome, date.fromisoformat(data_iso).toordinal(), minutos) for nome, data_iso, minutos in linhas)
+        return placar
+
+    def get_registros_usuario(self, nome: str):
+        """Retorna todos os registros de um usuário, no formato do arquivo JSON"""
+        return list(self.iterar_registros(nome))
+
+    def iterar_registros(self, nome: str):
+        """Percorre os registros do usuário lendo do banco aos poucos"""
+        self._validar_usuario(nome, incluir_inativos=True)
+        linhas = self.conexao.execute(
+            f"SELECT {_COLUNAS_REGISTRO} FROM registros r "
+            "JOIN usuarios u ON u.id = r.usuario_id WHERE u.nome = ? ORDER BY r.id",
+            (nome,)
+        )
+        return (self._registro_de_linha(linha) for linha in linhas)
+
+    @staticmethod
+    def _registro_de_linha(linha):
+        """Converte as colunas de _COLUNAS_REGISTRO em registro no formato do JSON"""
+        data, minutos, horas, descricao, timestamp, entrada, saida, sobreposto = linha
+        registro = {"data": data}
+        if minutos is not None:
+            registro["minutos"] = minutos
+        registro["horas"] = horas
+        if descricao is not None:
+            registro["descricao"] = descricao
+        if timestamp is not None:
+            registro["timestamp"] = timestamp
+        if entrada is not None:
+            registro["entrada"] = formatar_horario(entrada)
+            registro["saida"] = formatar_horario(saida)
+        if sobreposto:
+            registro["sobreposto"] = True
+        return registro
+
+    def _turno_em_conflito(self, nome: str, ordinal: int, turno):
+        """Turno do usuário no dia que se sobrepõe ao informado, pelo índice (usuario_id, data_iso)"""
+        return self.conexao.execute(
+            "SELECT r.entrada, r.saida FROM registros r JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE u.nome = ? AND r.data_iso = ? AND r.entrada < ? AND r.saida > ? LIMIT 1",
+            (nome, date.fromordinal(ordinal).isoformat(), turno[1], turno[0])
+        ).fetchone()
+
+    def auditar_sobreposicoes(self, nome: str = None):
+        """Procura turnos duplicados ou sobrepostos em todo o banco, usuário a usuário"""
+        if nome is not None and self._id_usuario(nome) is None:
+            raise ValueError(f"Usuário {nome} não encontrado")
+        # Posição do registro na ordem de get_registros_usuario (r.id)
+        linhas = self.conexao.execute(
+            "SELECT u.nome, r.data_iso, r.entrada, r.saida, r.posicao FROM ("
+            "SELECT usuario_id, data_iso, entrada, saida, "
+            "ROW_NUMBER() OVER (PARTITION BY usuario_id ORDER BY id) - 1 AS posicao FROM registros"
+            ") r JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE r.entrada IS NOT NULL AND (? IS NULL OR u.nome = ?) ORDER BY r.usuario_id",
+            (nome, nome)
+        )
+        resultado = []
+        for usuario, turnos in groupby(linhas, key=itemgetter(0)):
+            turnos = ((date.fromisoformat(data_iso).toordinal(), entrada, saida, posicao)
+                      for _, data_iso, entrada, saida, posicao in turnos)
+            resultado.extend(self._item_auditoria(usuario, anterior, atual)
+                             for anterior, atual in sobreposicoes(turnos))
+        return resultado
+
+    def registros_periodo(self, nome: str, inicio, fim):
+        """Percorre em ordem de data os registros do período, lidos do banco aos poucos"""
+        inicio_iso, fim_iso = self._limites_iso(nome, inicio, fim)
+        linhas = self.conexao.execute(
+            f"SELECT {_COLUNAS_REGISTRO} FROM registros r "
+            "JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE u.nome = ? AND r.data_iso BETWEEN ? AND ? ORDER BY r.data_iso, r.id",
+            (nome, inicio_iso, fim_iso)
+        )
+        return (self._registro_de_linha(linha) for linha in linhas)
+
+    def registros_mes(self, nome: str, mes: int = None, ano: int = None):
+        """Registros do usuário no mês, na ordem de inclusão, pelo índice (usuario_id, data_iso)"""
+        hoje = datetime.now()
+        mes = mes if mes is not None else hoje.month
+        ano = ano if ano is not None else hoje.year
+
+        self._validar_usuario(nome, incluir_inativos=True)
+        linhas = self.conexao.execute(
+            f"SELECT {_COLUNAS_REGISTRO} FROM registros r "
+            "JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE u.nome = ? AND r.data_iso >= ? AND r.data_iso < ? ORDER BY r.id",
+            (nome, *_intervalo_mes(mes, ano))
+        )
+        return [self._registro_de_linha(linha) for linha in linhas]
+
+    def minutos_periodo(self, nome: str, inicio, fim) -> int:
+        """Soma os minutos do usuário entre duas datas (inclusive)"""
+        inicio_iso, fim_iso = self._limites_iso(nome, inicio, fim)
+        linha = self.conexao.execute(
+            f"SELECT COALESCE(SUM({_MINUTOS}), 0) FROM registros r JOIN usuarios u ON u.id = r.usuario_id "
+            "WHERE u.nome = ? AND r.data_iso BETWEEN ? AND ?",
+            (nome, inicio_iso, fim_iso)
+        ).fetchone()
+        return linha[0]
+
+    def _limites_iso(self, nome: str, inicio, fim):
+        """Valida o período e o usuário e retorna os limites em AAAA-MM-DD"""
+        inicio, fim = _ordinal_limite(inicio), _ordinal_limite(fim)
+        if fim < inicio:
+            raise ValueError("Data final deve ser igual ou posterior à data inicial")
+        if not self._usuario_existe(nome, incluir_inativos=True):
+            raise ValueError(f"Usuário {nome} não encontrado")
+        return date.fromordinal(inicio).isoformat(), date.fromordinal(fim).isoformat()
+
+    def _contar_registros(self):
+        """Quantidade de registros por usuário, contada no banco"""
+        linhas = self.conexao.execute(
+            "SELECT u.nome, COUNT(r.id) FROM usuarios u "
+            "LEFT JOIN registros r ON r.usuario_id = u.id GROUP BY u.id ORDER BY u.id"
+        )
+        return dict(linhas)
+
+    def importar_json(self, arquivo_json: str) -> int:
+        """
+        Importa para um banco sem registros tudo o que a central JSON tem gravado
+
+        O arquivo é aberto por criar_central com o journal, então vale para
+        qualquer formato que a central grava (JSON inteiro, snapshot binário
+        ou manifesto de partições) e inclui os registros ainda só no journal.
+        O cadastro vem junto: ids, nomes atuais e usuários inativos.
+
+        Args:
+            arquivo_json (str): Caminho do arquivo horas_estagio.json
+
+        Returns:
+            int: Quantidade de registros importados
+
+        Raises:
+            ValueError: O banco já tem registros (importar de novo os duplicaria)
+        """
+        origem = criar_central(arquivo_json, journal=True)
+        try:
+            cadastro = origem.listar_usuarios(incluir_inativos=True)
+            registros = {usuario["nome"]: origem.get_registros_usuario(usuario["nome"]) for usuario in cadastro}
+            total = 0
+            with self._transacao_gravacao():
+                if self.conexao.execute("SELECT 1 FROM registros LIMIT 1").fetchone() is not None:
+                    raise ValueError(f"O banco {self.arquivo_dados} já tem registros; importe para um banco novo")
+                # Sem registros, o cadastro padrão do banco novo dá lugar ao do arquivo
+                self.conexao.execute("DELETE FROM usuarios")
+                self.conexao.executemany(
+                    "INSERT INTO usuarios (id, nome, ativo) VALUES (?, ?, ?)",
+                    [(usuario["id"], usuario["nome"], int(usuario["ativo"])) for usuario in cadastro]
+                )
+                for usuario in cadastro:
+                    self._inserir_registros(usuario["id"], registros[usuario["nome"]])
+                    total += len(registros[usuario["nome"]])
+                self._marcar_atualizacao()
+        finally:
+            origem.fechar()
+        return total
+
+    def flush(self):
+        """Nada a aguardar: cada registro é gravado na própria transação"""
+
+    def fechar(self):
+        """Fecha a conexão com o banco"""
+        super().fechar()
+        self.conexao.close()
+
+
+if __name__ == "__main__":
+    # Uso: python central_horas_sqlite.py horas_estagio.json horas_estagio.db
+    if len(sys.argv) != 3:
+        sys.exit("Uso: python central_horas_sqlite.py <arquivo.json> <arquivo.db>")
+    central = CentralHorasSQLite(sys.argv[2])
+    print(f"{central.importar_json(sys.argv[1])} registros importados para {sys.argv[2]}")
+    central.fechar()
@@ -0,0 +1,273 @@
+"""
+Interface de linha de comando da central de horas, sem interface gráfica
+
+Não importa customtkinter nem cria a central na importação: a central só é
+aberta (e o arquivo só é lido) quando um comando precisa dela.
+
+Uso: python cli_horas.py [--arquivo horas_estagio.json] [--formato tabela|json] COMANDO ...
+
+Comandos:
+    ponto NOME ENTRADA SAIDA [--data DD/MM/AAAA] [--descricao TEXTO]
+    minutos NOME DATA MINUTOS [--descricao TEXTO]
+    dia NOME [--data DD/MM/AAAA]
+    mes NOME [--mes M] [--ano AAAA]
+    relatorio-mensal [--mes M] [--ano AAAA]
+    relatorio-anual [--ano AAAA]
+    lote [ARQUIVO]              um comando ponto ou minutos por linha (padrão: stdin)
+    juntar-particoes            volta o arquivo dividido por ano a um único JSON
+"""
+import argparse
+import sys
+from datetime import datetime
+
+MESES = ("Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez")
+
+
+class _ParserLote(argparse.ArgumentParser):
+    """Parser das linhas do lote: erros viram ValueError, com a linha, em vez de encerrar o processo"""
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def _adicionar_comandos_registro(subparsers):
+    """Subcomandos que gravam registros, usados também nas linhas do lote"""
+    ponto = subparsers.add_parser("ponto", help="registra um turno (hoje, se não informar --data)")
+    ponto.add_argument("nome")
+    ponto.add_argument("entrada", help="HH:MM")
+    ponto.add_argument("saida", help="HH:MM")
+    ponto.add_argument("--data", help="DD/MM/AAAA (padrão: hoje)")
+    ponto.add_argument("--descricao", default="")
+
+    minutos = subparsers.add_parser("minutos", help="lança minutos trabalhados em uma data passada")
+    minutos.add_argument("nome")
+    minutos.add_argument("data", help="DD/MM/AAAA")
+    minutos.add_argument("minutos", type=int)
+    minutos.add_argument("--descricao", default="")
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Ponto de estágio pela linha de comando")
+    parser.add_argument("--arquivo", default="horas_estagio.json",
+                        help="arquivo de dados (.json ou .db/.sqlite para o SQLite)")
+    parser.add_argument("--formato", choices=("tabela", "json"), default="tabela")
+    parser.add_argument("--sem-journal", action="store_true",
+                        help="regrava o arquivo inteiro a cada ponto em vez de usar o journal")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    _adicionar_comandos_registro(subparsers)
+
+    dia = subparsers.add_parser("dia", help="minutos de um usuário em um dia")
+    dia.add_argument("nome")
+    dia.add_argument("--data", help="DD/MM/AAAA (padrão: hoje)")
+
+    mes = subparsers.add_parser("mes", help="minutos de um usuário em um mês")
+    mes.add_argument("nome")
+    mes.add_argument("--mes", type=int)
+    mes.add_argument("--ano", type=int)
+
+    mensal = subparsers.add_parser("relatorio-mensal", help="ranking do mês")
+    mensal.add_argument("--mes", type=int)
+    mensal.add_argument("--ano", type=int)
+
+    anual = subparsers.add_parser("relatorio-anual", help="horas de cada usuário por mês do ano")
+    anual.add_argument("--ano", type=int)
+
+    lote = subparsers.add_parser("lote", help="aplica vários comandos ponto/minutos com uma única gravação")
+    lote.add_argument("origem", metavar="ARQUIVO", nargs="?", type=argparse.FileType("r", encoding="utf-8"),
+                      default=sys.stdin, help="arquivo com um comando por linha (padrão: stdin)")
+
+    subparsers.add_parser("juntar-particoes",
+                          help="volta o arquivo dividido por ano (manifesto e partições) a um único JSON")
+    return parser
+
+
+def abrir_central(args):
+    """
+    Cria a central do arquivo pedido; só aqui central_horas é importado
+
+    O JSON é aberto com exclusivo: com a interface gráfica ou o servidor
+    usando o mesmo arquivo, a CLI se recusa a rodar em vez de gravar por
+    cima deles. O SQLite já coordena os processos sozinho.
+
+    Raises:
+        ArquivoEmUso: Outro processo mantém o arquivo aberto
+    """
+    from central_horas import criar_central
+
+    if args.arquivo.endswith((".db", ".sqlite", ".sqlite3")):
+        return criar_central(args.arquivo)
+    return criar_central(args.arquivo, journal=not args.sem_journal, exclusivo=True)
+
+
+def tabela(cabecalho, linhas) -> str:
+    """Alinha as colunas em texto; números à direita (horas com duas casas), o resto à esquerda"""
+    textos = [
+        [f"{valor:.2f}" if isinstance(valor, float) else str(valor) for valor in linha]
+        for linha in [cabecalho, *linhas]
+    ]
+    larguras = [max(len(linha[coluna]) for linha in textos) for coluna in range(len(cabecalho))]
+    numericas = [
+        all(isinstance(linha[coluna], (int, float)) for linha in linhas) for coluna in range(len(cabecalho))
+    ]
+    saida = []
+    for posicao, linha in enumerate(textos):
+        celulas = [
+            texto.rjust(largura) if numerica else texto.ljust(largura)
+            for texto, largura, numerica in zip(linha, larguras, numericas)
+        ]
+        saida.append("  ".join(celulas).rstrip())
+        if posicao == 0:
+            saida.append("  ".join("-" * largura for largura in larguras))
+    return "\n".join(saida)
+
+
+def itens_lote(entrada):
+    """
+    Converte as linhas do lote em itens de registrar_lote
+
+    Linhas vazias e comentários (#) são ignorados; cada linha usa a mesma
+    sintaxe dos comandos ponto e minutos.
+
+    Returns:
+        tuple: (itens, número da linha de cada item)
+
+    Raises:
+        ErroLote: Com (linha, mensagem) das linhas que não são comandos válidos
+    """
+    import shlex
+
+    from central_horas import ErroLote
+
+    parser = _ParserLote(prog="lote", add_help=False)
+    _adicionar_comandos_registro(parser.add_subparsers(dest="comando", required=True))
+    hoje = datetime.now().strftime("%d/%m/%Y")
+    itens, linhas, erros = [], [], []
+    for numero, texto in enumerate(entrada, 1):
+        if not texto.strip() or texto.lstrip().startswith("#"):
+            continue
+        try:
+            comando = parser.parse_args(shlex.split(texto))
+        except ValueError as e:
+            erros.append((numero, str(e)))
+            continue
+        item = {"nome": comando.nome, "descricao": comando.descricao}
+        if comando.comando == "ponto":
+            item.update(data=comando.data or hoje, entrada=comando.entrada, saida=comando.saida)
+        else:
+            item.update(data=comando.data, minutos=comando.minutos)
+        itens.append(item)
+        linhas.append(numero)
+    if erros:
+        raise ErroLote(erros)
+    return itens, linhas
+
+
+def executar(args, central):
+    """Executa o comando e devolve o que imprimir: objeto para JSON e texto para tabela"""
+    hoje = datetime.now()
+    if args.comando == "ponto":
+        if args.data is None and not args.descricao:
+            registro = central.registrar_horas(args.nome, args.entrada, args.saida)
+        else:
+            data = args.data or hoje.strftime("%d/%m/%Y")
+            registro = central.adicionar_registro_manual(args.nome, data, args.entrada, args.saida, args.descricao)
+        return registro, f"Registro salvo para {args.nome}: {registro['data']} {args.entrada}-{args.saida} " \
+                         f"({registro['horas']}h)"
+
+    if args.comando == "minutos":
+        registro = central.adicionar_minutos_passados(args.nome, args.data, args.minutos, args.descricao)
+        return registro, f"Registro salvo para {args.nome}: {registro['data']} {args.minutos}m " \
+                         f"({registro['horas']}h)"
+
+    if args.comando == "dia":
+        data = args.data or hoje.strftime("%d/%m/%Y")
+        minutos = central.calcular_minutos_dia(args.nome, data)
+        resultado = {"nome": args.nome, "data": data, "minutos": minutos, "horas": round(minutos / 60, 2)}
+        return resultado, f"{args.nome}: {minutos}m ({resultado['horas']}h)"
+
+    if args.comando == "mes":
+        mes, ano = args.mes or hoje.month, args.ano or hoje.year
+        minutos = central.calcular_minutos_mes(args.nome, mes, ano)
+        resultado = {"nome": args.nome, "mes": mes, "ano": ano, "minutos": minutos, "horas": round(minutos / 60, 2)}
+        return resultado, f"{args.nome}: {minutos}m ({resultado['horas']}h)"
+
+    if args.comando == "relatorio-mensal":
+        relatorio = central.gerar_relatorio_mensal(args.mes, args.ano)
+        usuarios = sorted(relatorio["usuarios"].items(), key=lambda item: item[1]["minutos"], reverse=True)
+        linhas = [
+            (posicao, nome, dados["horas"], dados["minutos"]) for posicao, (nome, dados) in enumerate(usuarios, 1)
+        ]
+        texto = tabela(("Posição", "Nome", "Horas", "Minutos"), linhas)
+        total = f"Total {relatorio['mes']:02d}/{relatorio['ano']}: {relatorio['total_horas']:.2f}h " \
+                f"({relatorio['total_minutos']}m)"
+        return relatorio, f"{texto}\n{total}"
+
+    if args.comando == "relatorio-anual":
+        relatorio = central.gerar_relatorio_anual(args.ano)
+        usuarios = sorted(relatorio["usuarios"].items(), key=lambda item: item[1]["minutos"], reverse=True)
+        linhas = [
+            (nome, *(dados["meses"][mes]["horas"] for mes in range(1, 13)), dados["horas"])
+            for nome, dados in usuarios
+        ]
+        linhas.append(("Total", *(relatorio["meses"][mes]["total_horas"] for mes in range(1, 13)),
+                       relatorio["total_horas"]))
+        return relatorio, f"Horas em {relatorio['ano']}\n" + tabela(("Nome", *MESES, "Total"), linhas)
+
+    if args.comando == "lote":
+        from central_horas import ErroLote
+
+        itens, linhas = itens_lote(args.origem)
+        try:
+            registros = central.registrar_lote(itens)
+        except ErroLote as e:
+            # Posições dos itens de volta para as linhas da entrada
+            raise ErroLote([(linhas[posicao - 1], mensagem) for posicao, mensagem in e.erros])
+        return {"registrados": len(registros)}, f"{len(registros)} registros gravados"
+
+    if args.comando == "juntar-particoes":
+        removidas = central.juntar_particoes()
+        return {"particoes_removidas": removidas}, f"{removidas} partições reunidas em {args.arquivo}"
+
+    raise ValueError(f"Comando {args.comando} não suportado")
+
+
+def main(argv=None) -> int:
+    from persistencia import ArquivoEmUso
+
+    args = criar_parser().parse_args(argv)
+    try:
+        central = abrir_central(args)
+    except ArquivoEmUso:
+        print(f"erro: {args.arquivo} está aberto em outro processo (interface gráfica ou servidor)",
+              file=sys.stderr)
+        return 1
+    try:
+        resultado, texto = executar(args, central)
+    except ValueError as e:
+        erros = getattr(e, "erros", None)
+        if erros:
+            for linha, mensagem in erros:
+                print(f"erro na linha {linha}: {mensagem}", file=sys.stderr)
+        else:
+            print(f"erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        central.fechar()
+
+    if args.formato == "json":
+        import json
+        texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    try:
+        print(texto)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Quem lia a saída encerrou antes (ex.: | head); o descritor vai para
+        # o devnull para que o flush na saída do interpretador não falhe de novo
+        import os
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
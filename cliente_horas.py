@@ -0,0 +1,135 @@
+import http.client
+import json
+from urllib.parse import urlencode, urlsplit
+
+
+class ErroServidor(ValueError):
+    """Erro devolvido pelo servidor de horas ou falha ao falar com ele"""
+
+
+def _chaves_inteiras(meses: dict) -> dict:
+    """Converte de volta para int as chaves de mês, que o JSON transforma em texto"""
+    return {int(mes): valor for mes, valor in meses.items()}
+
+
+class ClienteHoras:
+    """
+    Cliente do servidor_horas com a mesma interface da CentralHorasEstagio
+
+    Usa uma única conexão HTTP mantida aberta (keep-alive) entre as
+    chamadas. Erros de validação do servidor chegam como ErroServidor, que é
+    um ValueError, como os da central local.
+    """
+
+    def __init__(self, url: str = "http://127.0.0.1:8765", timeout: float = 10.0):
+        """
+        Args:
+            url (str): Endereço do servidor (http://host:porta)
+            timeout (float): Segundos de espera por uma resposta
+        """
+        partes = urlsplit(url if "//" in url else f"http://{url}")
+        self.host = partes.hostname or "127.0.0.1"
+        self.porta = partes.port or 8765
+        self.timeout = timeout
+        self._conexao = None
+
+    def _requisitar(self, metodo: str, caminho: str, corpo: dict = None, **parametros):
+        """
+        Faz uma requisição e retorna a resposta JSON
+
+        Consultas (GET) são repetidas uma vez em uma conexão nova se a
+        conexão mantida tiver caído; gravações não, para não registrar duas vezes.
+        """
+        parametros = {nome: valor for nome, valor in parametros.items() if valor is not None}
+        if parametros:
+            caminho = f"{caminho}?{urlencode(parametros)}"
+        cabecalhos = {}
+        conteudo = None
+        if corpo is not None:
+            conteudo = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+            cabecalhos["Content-Type"] = "application/json; charset=utf-8"
+
+        tentativas = 2 if metodo == "GET" else 1
+        for tentativa in range(tentativas):
+            try:
+                if self._conexao is None:
+                    self._conexao = http.client.HTTPConnection(self.host, self.porta, timeout=self.timeout)
+                self._conexao.request(metodo, caminho, body=conteudo, headers=cabecalhos)
+                resposta = self._conexao.getresponse()
+                status, dados = resposta.status, resposta.read()
+                break
+            except (http.client.HTTPException, OSError) as e:
+                self.fechar()
+                if tentativa == tentativas - 1:
+                    raise ErroServidor(f"Servidor de horas indisponível em {self.host}:{self.porta} - {e}")
+
+        resultado = json.loads(dados) if dados else None
+        if status >= 400:
+            mensagem = resultado.get("erro") if isinstance(resultado, dict) else None
+            raise ErroServidor(mensagem or f"Servidor respondeu {status}")
+        return resultado
+
+    def registrar_horas(self, nome: str, entrada: str, saida: str):
+        """Registra o ponto de hoje (HH:MM)"""
+        return self._requisitar("POST", "/ponto", {"nome": nome, "entrada": entrada, "saida": saida})
+
+    def adicionar_registro_manual(self, nome: str, data: str, entrada: str, saida: str, descricao: str = ""):
+        """Adiciona um registro com data, entrada e saída"""
+        return self._requisitar("POST", "/registros", {
+            "nome": nome, "data": data, "entrada": entrada, "saida": saida, "descricao": descricao
+        })
+
+    def adicionar_minutos_passados(self, nome: str, data: str, minutos: int, descricao: str = ""):
+        """Adiciona minutos trabalhados em uma data passada"""
+        return self._requisitar("POST", "/minutos-passados", {
+            "nome": nome, "data": data, "minutos": minutos, "descricao": descricao
+        })
+
+    def calcular_minutos_dia(self, nome: str, data: str = None):
+        """Minutos do usuário no dia (padrão: hoje)"""
+        return self._requisitar("GET", "/minutos/dia", nome=nome, data=data)["minutos"]
+
+    def calcular_minutos_mes(self, nome: str, mes: int = None, ano: int = None):
+        """Minutos do usuário no mês (padrão: mês atual)"""
+        return self._requisitar("GET", "/minutos/mes", nome=nome, mes=mes, ano=ano)["minutos"]
+
+    def calcular_horas_dia(self, nome: str, data: str = None):
+        """Horas do usuário no dia (compatibilidade)"""
+        return round(self.calcular_minutos_dia(nome, data) / 60, 2)
+
+    def calcular_horas_mes(self, nome: str, mes: int = None, ano: int = None):
+        """Horas do usuário no mês (compatibilidade)"""
+        return round(self.calcular_minutos_mes(nome, mes, ano) / 60, 2)
+
+    def gerar_relatorio_mensal(self, mes: int = None, ano: int = None):
+        """Relatório mensal, no formato de CentralHorasEstagio.gerar_relatorio_mensal"""
+        return self._requisitar("GET", "/relatorios/mensal", mes=mes, ano=ano)
+
+    def gerar_relatorio_anual(self, ano: int = None):
+        """Relatório anual, no formato de CentralHorasEstagio.gerar_relatorio_anual"""
+        relatorio = self._requisitar("GET", "/relatorios/anual", ano=ano)
+        relatorio["meses"] = _chaves_inteiras(relatorio["meses"])
+        for usuario in relatorio["usuarios"].values():
+            usuario["meses"] = _chaves_inteiras(usuario["meses"])
+        return relatorio
+
+    def ranking_janela(self, janela: str = "semana", quantidade: int = 10):
+        """Ranking de uma janela móvel, no formato de CentralHorasEstagio.ranking_janela"""
+        return self._requisitar("GET", "/ranking", janela=janela, quantidade=quantidade)
+
+    def posicao_no_ranking(self, nome: str, janela: str = "semana"):
+        """Posição do usuário em uma janela móvel"""
+        return self._requisitar("GET", "/ranking/posicao", nome=nome, janela=janela)
+
+    def stats(self):
+        """Estatísticas da central do servidor"""
+        return self._requisitar("GET", "/stats")
+
+    def flush(self):
+        """Nada a aguardar: o servidor responde depois de gravar"""
+
+    def fechar(self):
+        """Fecha a conexão mantida com o servidor"""
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
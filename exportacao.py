@@ -0,0 +1,183 @@
+"""
+Exportação dos relatórios e registros da central para CSV e JSONL
+
+As linhas são produzidas por geradores e escritas uma a uma no destino,
+então exportar anos de registros de muitos estagiários não monta nada
+inteiro em memória. Para abrir no Excel em português use as opções
+brasileiras do CSV:
+
+    with open("horas.csv", "w", newline="", encoding="utf-8-sig") as f:
+        exportar_registros(central, f, **OPCOES_CSV_BR)
+"""
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from central_horas import _minutos_registro
+
+# Ponto-e-vírgula como separador e vírgula decimal, como o Excel em pt-BR espera
+OPCOES_CSV_BR = {"delimitador": ";", "separador_decimal": ","}
+
+CAMPOS_RELATORIO_MENSAL = ("usuario", "ano", "mes", "minutos", "horas")
+CAMPOS_RELATORIO_ANUAL = ("usuario", "ano", "mes", "minutos", "horas")
+CAMPOS_REGISTROS = ("usuario", "data", "entrada", "saida", "minutos", "horas", "descricao", "timestamp")
+
+# Colunas sempre escritas com duas casas, mesmo quando o valor é inteiro
+# (registros antigos podem ter "horas": 2)
+CAMPOS_HORAS = ("horas",)
+
+
+def linhas_relatorio_mensal(relatorio: dict):
+    """Gera uma linha por usuário de um relatório de gerar_relatorio_mensal"""
+    for usuario, totais in relatorio["usuarios"].items():
+        yield {"usuario": usuario, "ano": relatorio["ano"], "mes": relatorio["mes"],
+               "minutos": totais["minutos"], "horas": totais["horas"]}
+
+
+def linhas_relatorio_anual(relatorio: dict):
+    """Gera uma linha por usuário e mês de um relatório de gerar_relatorio_anual"""
+    for usuario, totais in relatorio["usuarios"].items():
+        for mes, totais_mes in totais["meses"].items():
+            yield {"usuario": usuario, "ano": relatorio["ano"], "mes": int(mes),
+                   "minutos": totais_mes["minutos"], "horas": totais_mes["horas"]}
+
+
+def linhas_registros(central, usuarios=None, inicio=None, fim=None):
+    """
+    Gera uma linha por registro, usuário a usuário e em ordem de data no período
+
+    Args:
+        central: CentralHorasEstagio (ou subclasse)
+        usuarios (list): Usuários a exportar (padrão: todos os cadastrados, inclusive inativos)
+        inicio: Primeira data (DD/MM/AAAA ou date); sem período, exporta tudo
+        fim: Última data, inclusive
+    """
+    if usuarios is None:
+        usuarios = [usuario["nome"] for usuario in central.listar_usuarios(incluir_inativos=True)]
+    for usuario in usuarios:
+        if inicio is None and fim is None:
+            registros = central.iterar_registros(usuario)
+        else:
+            registros = central.registros_periodo(usuario, inicio or date.min, fim or date.max)
+        for registro in registros:
+            minutos = _minutos_registro(registro)
+            yield {"usuario": usuario, "data": registro["data"], "entrada": registro.get("entrada", ""),
+                   "saida": registro.get("saida", ""), "minutos": minutos,
+                   "horas": registro.get("horas", round(minutos / 60, 2)),
+                   "descricao": registro.get("descricao", ""), "timestamp": registro.get("timestamp", "")}
+
+
+@contextmanager
+def _abrir_destino(destino):
+    """Aceita caminho, "-" (saída padrão) ou um arquivo já aberto em modo texto"""
+    if destino == "-":
+        yield sys.stdout
+    elif isinstance(destino, str):
+        with open(destino, 'w', encoding='utf-8', newline='') as f:
+            yield f
+    else:
+        yield destino
+
+
+def _formatar_data(data: str, formato_data: str) -> str:
+    if formato_data == "iso" and data:
+        return datetime.strptime(data, "%d/%m/%Y").strftime("%Y-%m-%d")
+    return data
+
+
+def escrever_csv(linhas, destino, campos, delimitador: str = ",", separador_decimal: str = ".",
+                 formato_data: str = "br") -> int:
+    """
+    Escreve linhas (dicts) em CSV, uma a uma
+
+    Args:
+        linhas (iterable): Dicts com as chaves de `campos`
+        destino: Caminho, "-" para a saída padrão ou arquivo aberto
+        campos (tuple): Colunas, na ordem
+        delimitador (str): Separador de colunas
+        separador_decimal (str): "." ou "," para as colunas de CAMPOS_HORAS
+            e os demais números fracionários
+        formato_data (str): "br" (DD/MM/AAAA) ou "iso" (AAAA-MM-DD)
+
+    Returns:
+        int: Quantidade de linhas escritas, sem o cabeçalho
+    """
+    if formato_data not in ("br", "iso"):
+        raise ValueError(f"Formato de data {formato_data} não suportado. Use br ou iso")
+    total = 0
+    with _abrir_destino(destino) as f:
+        escritor = csv.writer(f, delimiter=delimitador)
+        escritor.writerow(campos)
+        for linha in linhas:
+            valores = []
+            for campo in campos:
+                valor = linha[campo]
+                if isinstance(valor, float) or (campo in CAMPOS_HORAS and isinstance(valor, int)):
+                    valor = f"{valor:.2f}".replace(".", separador_decimal)
+                elif campo == "data":
+                    valor = _formatar_data(valor, formato_data)
+                valores.append(valor)
+            escritor.writerow(valores)
+            total += 1
+    return total
+
+
+def escrever_jsonl(linhas, destino, formato_data: str = "br") -> int:
+    """
+    Escreve linhas (dicts) em JSONL, um objeto por linha
+
+    Returns:
+        int: Quantidade de linhas escritas
+    """
+    total = 0
+    with _abrir_destino(destino) as f:
+        for linha in linhas:
+            if formato_data != "br" and "data" in linha:
+                linha = dict(linha, data=_formatar_data(linha["data"], formato_data))
+            f.write(json.dumps(linha, ensure_ascii=False) + "\n")
+            total += 1
+    return total
+
+
+def _escrever(linhas, destino, campos, formato: str, opcoes: dict) -> int:
+    if formato == "csv":
+        return escrever_csv(linhas, destino, campos, **opcoes)
+    if formato == "jsonl":
+        return escrever_jsonl(linhas, destino, opcoes.get("formato_data", "br"))
+    raise ValueError(f"Formato {formato} não suportado. Use csv ou jsonl")
+
+
+def exportar_relatorio_mensal(central, destino, mes: int = None, ano: int = None, formato: str = "csv",
+                              **opcoes) -> int:
+    """Exporta o relatório mensal; opcoes são as de escrever_csv"""
+    relatorio = central.gerar_relatorio_mensal(mes, ano)
+    return _escrever(linhas_relatorio_mensal(relatorio), destino, CAMPOS_RELATORIO_MENSAL, formato, opcoes)
+
+
+def exportar_relatorio_anual(central, destino, ano: int = None, formato: str = "csv", **opcoes) -> int:
+    """Exporta o relatório anual, uma linha por usuário e mês; opcoes são as de escrever_csv"""
+    relatorio = central.gerar_relatorio_anual(ano)
+    return _escrever(linhas_relatorio_anual(relatorio), destino, CAMPOS_RELATORIO_ANUAL, formato, opcoes)
+
+
+def exportar_registros(central, destino, usuarios=None, inicio=None, fim=None, formato: str = "csv",
+                       **opcoes) -> int:
+    """
+    Exporta o detalhe de cada registro, em fluxo
+
+    Args:
+        central: CentralHorasEstagio (ou subclasse)
+        destino: Caminho, "-" para a saída padrão ou arquivo aberto
+        usuarios (list): Usuários a exportar (padrão: todos)
+        inicio: Primeira data do período (opcional)
+        fim: Última data do período, inclusive (opcional)
+        formato (str): "csv" ou "jsonl"
+        **opcoes: Opções de escrever_csv (delimitador, separador_decimal, formato_data)
+
+    Returns:
+        int: Quantidade de registros exportados
+    """
+    linhas = linhas_registros(central, usuarios, inicio, fim)
+    return _escrever(linhas, destino, CAMPOS_REGISTROS, formato, opcoes)
@@ -0,0 +1,55 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class IndiceDatas:
+    """
+    Índice dos registros de um usuário ordenado por data
+
+    Guarda, em ordem crescente, o ordinal da data de cada registro e a sua
+    posição na lista de registros. Registros do mesmo dia ficam na ordem em
+    que foram incluídos.
+    """
+
+    __slots__ = ("ordinais", "posicoes")
+
+    def __init__(self):
+        self.ordinais = array('i')
+        self.posicoes = array('i')
+
+    @classmethod
+    def construir(cls, ordinais):
+        """
+        Monta o índice a partir dos ordinais das datas, na ordem dos registros
+
+        Args:
+            ordinais (sequence): Ordinal da data de cada registro
+        """
+        indice = cls()
+        ordinais = list(ordinais)
+        ordem = sorted(range(len(ordinais)), key=ordinais.__getitem__)
+        indice.ordinais = array('i', (ordinais[posicao] for posicao in ordem))
+        indice.posicoes = array('i', ordem)
+        return indice
+
+    def inserir(self, ordinal: int, posicao: int):
+        """
+        Inclui um registro mantendo a ordem, sem reordenar o índice
+
+        Registros em ordem cronológica vão para o fim (O(1)); lançamentos
+        retroativos são inseridos no ponto achado por bisect.
+        """
+        if not self.ordinais or ordinal >= self.ordinais[-1]:
+            self.ordinais.append(ordinal)
+            self.posicoes.append(posicao)
+            return
+        ponto = bisect_right(self.ordinais, ordinal)
+        self.ordinais.insert(ponto, ordinal)
+        self.posicoes.insert(ponto, posicao)
+
+    def posicoes_periodo(self, inicio: int, fim: int):
+        """Posições dos registros com ordinal em [inicio, fim], em ordem de data"""
+        return self.posicoes[bisect_left(self.ordinais, inicio):bisect_right(self.ordinais, fim)]
+
+    def __len__(self):
+        return len(self.posicoes)
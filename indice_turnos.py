@@ -0,0 +1,121 @@
+from bisect import bisect_left, insort
+
+
+def formatar_horario(minutos: int) -> str:
+    """Converte minutos desde a meia-noite em HH:MM"""
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def ler_horario(horario):
+    """Minutos desde a meia-noite de um horário HH:MM como os gravados nos registros, ou None"""
+    if not isinstance(horario, str) or len(horario) != 5 or horario[2] != ":":
+        return None
+    horas, minutos = horario[:2], horario[3:]
+    if not (horas.isdigit() and minutos.isdigit()) or int(horas) > 23 or int(minutos) > 59:
+        return None
+    return int(horas) * 60 + int(minutos)
+
+
+def turno_registro(registro):
+    """(entrada, saida) em minutos de um registro de turno, ou None se ele não tiver turno"""
+    entrada, saida = ler_horario(registro.get("entrada")), ler_horario(registro.get("saida"))
+    if entrada is None or saida is None:
+        return None
+    return entrada, saida
+
+
+class IndiceTurnos:
+    """
+    Turnos (entrada e saída) de um usuário, por dia, ordenados pela entrada
+
+    Os turnos são intervalos [entrada, saida) em minutos desde a meia-noite:
+    um turno que termina às 12:00 não conflita com outro que começa às
+    12:00. Enquanto os turnos já guardados de um dia não se sobrepõem entre
+    si, basta comparar o novo com os vizinhos achados por bisect; dias que já
+    têm sobreposições (aceitas ou vindas do histórico) são percorridos inteiros.
+    """
+
+    __slots__ = ("_dias", "_dias_sobrepostos")
+
+    def __init__(self):
+        self._dias = {}  # ordinal do dia -> [(entrada, saida)] em ordem
+        self._dias_sobrepostos = set()
+
+    @classmethod
+    def construir(cls, turnos):
+        """
+        Monta o índice a partir dos turnos já registrados
+
+        Args:
+            turnos (iterable): Triplas (ordinal do dia, entrada, saida)
+        """
+        indice = cls()
+        dias = indice._dias
+        for ordinal, entrada, saida in turnos:
+            dias.setdefault(ordinal, []).append((entrada, saida))
+        for ordinal, turnos_dia in dias.items():
+            turnos_dia.sort()
+            fim = 0
+            for entrada, saida in turnos_dia:
+                if entrada < fim:
+                    indice._dias_sobrepostos.add(ordinal)
+                    break
+                fim = saida
+        return indice
+
+    def conflito(self, ordinal: int, entrada: int, saida: int):
+        """
+        Turno já registrado no dia que se sobrepõe a [entrada, saida), em O(log n)
+
+        Returns:
+            tuple: (entrada, saida) do turno em conflito, ou None
+        """
+        turnos_dia = self._dias.get(ordinal)
+        if not turnos_dia:
+            return None
+        if ordinal in self._dias_sobrepostos:
+            return next((turno for turno in turnos_dia if turno[0] < saida and turno[1] > entrada), None)
+        ponto = bisect_left(turnos_dia, (entrada, saida))
+        if ponto < len(turnos_dia) and turnos_dia[ponto][0] < saida:
+            return turnos_dia[ponto]
+        if ponto and turnos_dia[ponto - 1][1] > entrada:
+            return turnos_dia[ponto - 1]
+        return None
+
+    def inserir(self, ordinal: int, entrada: int, saida: int):
+        """Inclui um turno mantendo a ordem do dia"""
+        if self.conflito(ordinal, entrada, saida) is not None:
+            self._dias_sobrepostos.add(ordinal)
+        insort(self._dias.setdefault(ordinal, []), (entrada, saida))
+
+    def __len__(self):
+        return sum(len(turnos_dia) for turnos_dia in self._dias.values())
+
+
+def sobreposicoes(turnos):
+    """
+    Acha todos os turnos que se sobrepõem a outro do mesmo dia, em O(n log n)
+
+    Ordena os turnos por dia e entrada e os percorre uma vez, guardando o
+    turno que termina mais tarde entre os já vistos no dia: quem começa antes
+    desse fim se sobrepõe a ele. Um turno idêntico ao anterior na ordem é
+    apontado como duplicata dele.
+
+    Args:
+        turnos (iterable): Tuplas (ordinal do dia, entrada, saida, referência);
+            a referência identifica o registro (ex.: a posição na lista)
+
+    Returns:
+        list: Pares (turno anterior, turno sobreposto), cada um como a tupla recebida
+    """
+    resultado = []
+    anterior = mais_longo = None
+    for turno in sorted(turnos, key=lambda turno: turno[:3]):
+        if anterior is not None and anterior[:3] == turno[:3]:
+            resultado.append((anterior, turno))
+        elif mais_longo is not None and mais_longo[0] == turno[0] and turno[1] < mais_longo[2]:
+            resultado.append((mais_longo, turno))
+        if mais_longo is None or mais_longo[0] != turno[0] or turno[2] > mais_longo[2]:
+            mais_longo = turno
+        anterior = turno
+    return resultado
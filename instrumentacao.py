@@ -0,0 +1,156 @@
+import functools
+import json
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from persistencia import escrever_atomico
+
+
+def _percentil(ordenados, fracao: float) -> float:
+    """Percentil pelo método do posto mais próximo, sobre uma lista já ordenada"""
+    if not ordenados:
+        return 0.0
+    posicao = max(0, min(len(ordenados) - 1, int(round(fracao * len(ordenados))) - 1))
+    return ordenados[posicao]
+
+
+class Instrumentacao:
+    """
+    Contadores de chamadas, latências e bytes gravados de uma central
+
+    Só existe quando a instrumentação é ligada: os métodos medidos são
+    substituídos, na própria instância, por versões cronometradas. Com ela
+    desligada nada é embrulhado e o custo é zero.
+    """
+
+    def __init__(self, tamanho_amostra: int = 4096):
+        """
+        Args:
+            tamanho_amostra (int): Latências mais recentes guardadas por
+                método para o cálculo dos percentis
+        """
+        self.tamanho_amostra = tamanho_amostra
+        self._trava = threading.Lock()
+        self._chamadas = {}
+        self._tempo_total = {}
+        self._amostras = {}
+        self._bytes = {}
+        self._despejo = None
+
+    def instrumentar(self, objeto, metodos):
+        """Troca os métodos indicados do objeto por versões cronometradas"""
+        for nome in metodos:
+            setattr(objeto, nome, self._cronometrado(nome, getattr(objeto, nome)))
+
+    def _cronometrado(self, nome: str, metodo):
+        @functools.wraps(metodo)
+        def cronometrado(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return metodo(*args, **kwargs)
+            finally:
+                self.registrar_tempo(nome, time.perf_counter() - inicio)
+        return cronometrado
+
+    def registrar_tempo(self, nome: str, segundos: float):
+        """Contabiliza uma chamada de `nome` que levou `segundos`"""
+        with self._trava:
+            self._chamadas[nome] = self._chamadas.get(nome, 0) + 1
+            self._tempo_total[nome] = self._tempo_total.get(nome, 0.0) + segundos
+            amostra = self._amostras.get(nome)
+            if amostra is None:
+                amostra = self._amostras[nome] = deque(maxlen=self.tamanho_amostra)
+            amostra.append(segundos)
+
+    def registrar_bytes(self, destino: str, quantidade: int):
+        """Contabiliza uma gravação de `quantidade` bytes em `destino`"""
+        with self._trava:
+            gravacoes, total, _ = self._bytes.get(destino, (0, 0, 0))
+            self._bytes[destino] = (gravacoes + 1, total + quantidade, quantidade)
+
+    def estatisticas(self) -> dict:
+        """Resumo por método (chamadas, tempos e percentis em ms) e bytes gravados"""
+        with self._trava:
+            metodos = {}
+            for nome, chamadas in self._chamadas.items():
+                ordenados = sorted(self._amostras[nome])
+                total = self._tempo_total[nome]
+                metodos[nome] = {
+                    "chamadas": chamadas,
+                    "total_ms": total * 1000,
+                    "media_ms": total / chamadas * 1000,
+                    "p50_ms": _percentil(ordenados, 0.50) * 1000,
+                    "p95_ms": _percentil(ordenados, 0.95) * 1000,
+                    "p99_ms": _percentil(ordenados, 0.99) * 1000,
+                }
+            bytes_gravados = {
+                destino: {"gravacoes": gravacoes, "total": total, "media": total / gravacoes, "ultima": ultima}
+                for destino, (gravacoes, total, ultima) in self._bytes.items()
+            }
+        return {"metodos": metodos, "bytes_gravados": bytes_gravados}
+
+    def iniciar_despejo(self, caminho: str, intervalo: float, coletar):
+        """
+        Grava periodicamente em `caminho` o JSON retornado por `coletar()`
+
+        Args:
+            caminho (str): Arquivo de destino, reescrito a cada intervalo
+            intervalo (float): Segundos entre gravações
+            coletar (callable): Função que retorna o dict a gravar
+        """
+        parar = threading.Event()
+
+        def despejar():
+            while not parar.wait(intervalo):
+                self._gravar_despejo(caminho, coletar())
+            self._gravar_despejo(caminho, coletar())
+
+        thread = threading.Thread(target=despejar, name="estatisticas-horas", daemon=True)
+        thread.start()
+        self._despejo = (parar, thread)
+
+    def parar_despejo(self):
+        """Interrompe o despejo periódico, gravando uma última vez"""
+        if self._despejo is not None:
+            parar, thread = self._despejo
+            self._despejo = None
+            parar.set()
+            thread.join()
+
+    @staticmethod
+    def _gravar_despejo(caminho: str, estatisticas: dict):
+        conteudo = json.dumps(estatisticas, indent=2, ensure_ascii=False)
+        escrever_atomico(caminho, conteudo.encode('utf-8'))
+
+
+@contextmanager
+def perfilar(saida=None, ordenar: str = "cumulative", limite: int = 30):
+    """
+    Perfila com cProfile o bloco dentro do `with`
+
+    Exemplo:
+        with perfilar("perfil.txt"):
+            central.gerar_relatorio_anual(2025)
+
+    Args:
+        saida: Caminho de arquivo ou stream para o relatório (padrão: stderr)
+        ordenar (str): Critério de ordenação do pstats
+        limite (int): Quantidade de funções listadas
+    """
+    import cProfile
+    import pstats
+
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield perfil
+    finally:
+        perfil.disable()
+        if isinstance(saida, str):
+            with open(saida, 'w', encoding='utf-8') as f:
+                pstats.Stats(perfil, stream=f).sort_stats(ordenar).print_stats(limite)
+        else:
+            pstats.Stats(perfil, stream=saida or sys.stderr).sort_stats(ordenar).print_stats(limite)
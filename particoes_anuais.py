@@ -0,0 +1,90 @@
+import gzip
+import json
+import lzma
+import os
+import stat
+
+from persistencia import escrever_atomico
+
+# Primeira chave do manifesto; identifica o arquivo sem lê-lo inteiro
+FORMATO_MANIFESTO = "particoes_anuais"
+
+# Compressões aceitas para as partições e a extensão acrescentada ao nome
+COMPRESSOES = {None: "", "gzip": ".gz", "lzma": ".xz"}
+
+_MODULOS_COMPRESSAO = {"gzip": gzip, "lzma": lzma}
+
+
+def caminho_particao(arquivo_dados: str, ano: int, compressao: str = None) -> str:
+    """Caminho da partição de um ano: horas_estagio.json -> horas_estagio_2025.json[.gz]"""
+    base, extensao = os.path.splitext(arquivo_dados)
+    return f"{base}_{ano}{extensao or '.json'}{COMPRESSOES[compressao]}"
+
+
+def eh_manifesto(caminho: str) -> bool:
+    """Indica se o arquivo é o manifesto de dados divididos por ano, lendo só o começo dele"""
+    try:
+        with open(caminho, 'rb') as f:
+            inicio = f.read(128)
+    except OSError:
+        return False
+    return b'"formato"' in inicio and FORMATO_MANIFESTO.encode() in inicio
+
+
+def ler_particao(caminho: str, compressao: str = None) -> dict:
+    """Conteúdo de uma partição, descomprimido se preciso"""
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+    if compressao is not None:
+        conteudo = _MODULOS_COMPRESSAO[compressao].decompress(conteudo)
+    return json.loads(conteudo)
+
+
+def gravar_particao(caminho: str, conteudo: bytes, compressao: str = None, somente_leitura: bool = False) -> int:
+    """
+    Grava uma partição de forma atômica, comprimindo o JSON se pedido
+
+    Uma partição somente leitura só volta a aceitar escrita durante a
+    própria gravação.
+
+    Returns:
+        int: Bytes gravados
+    """
+    if compressao is not None:
+        conteudo = _MODULOS_COMPRESSAO[compressao].compress(conteudo)
+    _liberar_escrita(caminho)
+    escrever_atomico(caminho, conteudo)
+    if somente_leitura:
+        os.chmod(caminho, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    return len(conteudo)
+
+
+def converter_particao(origem: str, compressao_origem: str, destino: str, compressao: str = None,
+                       somente_leitura: bool = False) -> int:
+    """
+    Regrava uma partição com outra compressão, sem interpretar os registros
+
+    A origem não é apagada: cabe a quem chama removê-la quando nada mais
+    apontar para ela.
+
+    Returns:
+        int: Bytes gravados
+    """
+    with open(origem, 'rb') as f:
+        conteudo = f.read()
+    if compressao_origem is not None:
+        conteudo = _MODULOS_COMPRESSAO[compressao_origem].decompress(conteudo)
+    return gravar_particao(destino, conteudo, compressao, somente_leitura)
+
+
+def remover_particao(caminho: str):
+    """Apaga uma partição, mesmo somente leitura, se ela existir"""
+    if os.path.exists(caminho):
+        _liberar_escrita(caminho)
+        os.remove(caminho)
+
+
+def _liberar_escrita(caminho: str):
+    # No Windows, os.replace e os.remove falham sobre arquivos somente leitura
+    if os.path.exists(caminho):
+        os.chmod(caminho, stat.S_IRUSR | stat.S_IWUSR)
@@ -0,0 +1,385 @@
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def escrever_atomico(caminho: str, conteudo: bytes):
+    """
+    Grava o conteúdo em um arquivo temporário e o renomeia sobre o destino
+
+    Um crash durante a escrita deixa o arquivo anterior intacto: ou o leitor
+    vê a versão antiga inteira, ou a nova inteira.
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.unlink(temporario)
+        raise
+
+    # Garante que a renomeação também chegue ao disco
+    if hasattr(os, "O_DIRECTORY"):
+        fd_dir = os.open(diretorio, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd_dir)
+        finally:
+            os.close(fd_dir)
+
+
+def caminho_journal(arquivo_dados: str) -> str:
+    """Retorna o caminho do journal que acompanha um arquivo de dados"""
+    base, _ = os.path.splitext(arquivo_dados)
+    return base + ".journal.jsonl"
+
+
+def caminho_trava(arquivo_dados: str) -> str:
+    """Retorna o caminho do arquivo de trava entre processos de um arquivo de dados"""
+    base, _ = os.path.splitext(arquivo_dados)
+    return base + ".lock"
+
+
+def assinatura_arquivo(caminho: str):
+    """(inode, tamanho, mtime em ns) do arquivo, ou None se ele não existir"""
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return estado.st_ino, estado.st_size, estado.st_mtime_ns
+
+
+class ArquivoEmUso(RuntimeError):
+    """O arquivo de dados está reservado por outro processo (ver ReservaArquivo)"""
+
+
+class TravaArquivo:
+    """
+    Trava exclusiva entre processos sobre um arquivo (advisory)
+
+    Usa fcntl.flock (msvcrt.locking no Windows). É reentrante dentro da
+    mesma thread e exclui também as outras threads do processo.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._trava = threading.RLock()
+        self._profundidade = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._trava.acquire()
+        if self._profundidade == 0:
+            try:
+                self._travar()
+            except BaseException:
+                self._trava.release()
+                raise
+        self._profundidade += 1
+        return self
+
+    def __exit__(self, *excecao):
+        self._profundidade -= 1
+        try:
+            if self._profundidade == 0:
+                self._destravar()
+        finally:
+            self._trava.release()
+
+    def _travar(self):
+        if self._fd is None:
+            self._fd = os.open(self.caminho, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            return
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue  # LK_LOCK desiste após ~10 s; continua esperando
+
+    def _destravar(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    def fechar(self):
+        """Fecha o arquivo de trava (que não pode estar travado)"""
+        with self._trava:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+class ReservaArquivo:
+    """
+    Trava exclusiva entre processos mantida enquanto a central estiver aberta
+
+    Usa o mesmo arquivo de TravaArquivo, mas não espera: se outro processo já
+    o reservou (ou está no meio de uma gravação multiprocesso), a criação
+    falha com ArquivoEmUso. Os processos multiprocesso, por sua vez, esperam
+    a reserva ser liberada para gravar.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._fd = os.open(caminho, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(self._fd)
+            self._fd = None
+            raise ArquivoEmUso(f"{caminho} está em uso por outro processo") from None
+
+    def fechar(self):
+        """Libera a reserva; chamadas repetidas não fazem nada"""
+        if self._fd is None:
+            return
+        if fcntl is None:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        os.close(self._fd)
+        self._fd = None
+
+
+def _fim_ultima_linha(f) -> int:
+    """
+    Posição logo após a última linha completa do arquivo, cortando o que vier depois
+
+    Returns:
+        int: Novo tamanho do arquivo
+    """
+    tamanho = f.seek(0, os.SEEK_END)
+    if tamanho == 0:
+        return 0
+    f.seek(tamanho - 1)
+    if f.read(1) == b"\n":
+        return tamanho
+    fim = tamanho
+    while fim > 0:
+        inicio = max(0, fim - 4096)
+        f.seek(inicio)
+        bloco = f.read(fim - inicio)
+        quebra = bloco.rfind(b"\n")
+        if quebra >= 0:
+            fim = inicio + quebra + 1
+            break
+        fim = inicio
+    if fim < tamanho:
+        f.truncate(fim)
+    return fim
+
+
+class Journal:
+    """Log apenas de anexação, com uma entrada JSON (ou um lote delas) por linha"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._tamanho = None
+
+    def tamanho(self, atualizar: bool = False) -> int:
+        """Tamanho atual do journal em bytes; atualizar consulta o disco de novo"""
+        if self._tamanho is None or atualizar:
+            self._tamanho = os.path.getsize(self.caminho) if os.path.exists(self.caminho) else 0
+        return self._tamanho
+
+    def anexar(self, entradas) -> int:
+        """
+        Anexa entradas ao final do journal com uma única escrita em disco
+
+        Várias entradas vão juntas em uma só linha (uma lista JSON): se a
+        escrita for interrompida, a linha incompleta é descartada inteira na
+        leitura e nenhuma entrada do lote é aplicada pela metade. Se a escrita
+        falhar com o processo ainda vivo (disco cheio, erro de E/S), o journal
+        volta ao tamanho anterior; uma linha incompleta deixada por outro
+        processo é descartada antes da anexação.
+
+        Args:
+            entradas (list): Entradas serializáveis em JSON
+
+        Returns:
+            int: Bytes escritos
+        """
+        entradas = list(entradas)
+        if not entradas:
+            return 0
+        lote = entradas[0] if len(entradas) == 1 else entradas
+        conteudo = (json.dumps(lote, ensure_ascii=False) + "\n").encode('utf-8')
+        with open(self.caminho, 'a+b') as f:
+            inicio = _fim_ultima_linha(f)
+            try:
+                f.write(conteudo)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                f.truncate(inicio)
+                raise
+        self._tamanho = inicio + len(conteudo)
+        return len(conteudo)
+
+    def ler(self, posicao: int = 0):
+        """
+        Percorre as entradas do journal em ordem, a partir do byte `posicao`
+
+        Uma última linha incompleta (escrita interrompida por um crash) é
+        descartada e removida do arquivo, para que a próxima anexação comece
+        em uma linha nova. Uma linha corrompida no meio do arquivo é erro.
+        As entradas de um lote são entregues uma a uma.
+        """
+        if not os.path.exists(self.caminho):
+            self._tamanho = 0
+            return
+
+        valido = posicao
+        with open(self.caminho, 'rb') as f:
+            f.seek(posicao)
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break
+                try:
+                    entrada = json.loads(linha)
+                except ValueError:
+                    raise ValueError(f"Journal corrompido em {self.caminho} (byte {valido})")
+                valido += len(linha)
+                if isinstance(entrada, list):
+                    yield from entrada
+                else:
+                    yield entrada
+
+        if valido < os.path.getsize(self.caminho):
+            with open(self.caminho, 'r+b') as f:
+                f.truncate(valido)
+                f.flush()
+                os.fsync(f.fileno())
+        self._tamanho = valido
+
+    def descartar_ate(self, seq: int):
+        """Remove do journal as entradas com sequência até seq (inclusive)"""
+        restantes = [entrada for entrada in self.ler() if entrada["seq"] > seq]
+        if not restantes:
+            self.limpar()
+            return
+        conteudo = "".join(json.dumps(entrada, ensure_ascii=False) + "\n" for entrada in restantes)
+        escrever_atomico(self.caminho, conteudo.encode('utf-8'))
+        self._tamanho = None
+
+    def limpar(self):
+        """Descarta todas as entradas do journal"""
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
+        self._tamanho = 0
+
+
+# Marcadores da fila do gravador
+_GRAVAR = object()
+_PARAR = object()
+
+
+class GravadorAssincrono:
+    """
+    Thread que grava os dados em segundo plano (write-behind)
+
+    Pedidos de gravação feitos dentro do intervalo são agrupados em uma única
+    escrita. A fila é limitada: se o disco não acompanhar, quem pede a
+    gravação espera por espaço na fila (contrapressão) em vez de acumular
+    pedidos sem limite.
+    """
+
+    def __init__(self, gravar, intervalo: float = 0.5, tamanho_fila: int = 64):
+        """
+        Args:
+            gravar (callable): Função sem argumentos que faz a gravação
+            intervalo (float): Segundos em que pedidos seguidos são agrupados
+            tamanho_fila (int): Máximo de pedidos pendentes na fila
+        """
+        self._gravar = gravar
+        self.intervalo = intervalo
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._erro = None
+        self._ativo = True
+        self._thread = threading.Thread(target=self._executar, name="gravador-horas", daemon=True)
+        self._thread.start()
+
+    def agendar(self):
+        """Pede uma gravação; bloqueia enquanto a fila estiver cheia"""
+        if not self._ativo:
+            raise RuntimeError("Gravador já foi fechado")
+        self._fila.put(_GRAVAR)
+
+    def flush(self, timeout: float = None):
+        """Aguarda a gravação de tudo o que foi agendado até agora"""
+        if not self._ativo:
+            return
+        concluido = threading.Event()
+        self._fila.put(concluido)
+        if not concluido.wait(timeout):
+            raise TimeoutError("Gravação pendente não terminou no tempo limite")
+        self._levantar_erro()
+
+    def fechar(self):
+        """Grava o que estiver pendente e encerra a thread"""
+        if not self._ativo:
+            return
+        self._ativo = False
+        self._fila.put(_PARAR)
+        self._thread.join()
+        self._levantar_erro()
+
+    def _levantar_erro(self):
+        """Repassa a quem chamou o último erro ocorrido na thread de gravação"""
+        erro, self._erro = self._erro, None
+        if erro is not None:
+            raise erro
+
+    def _executar(self):
+        pendente = False
+        while True:
+            itens = [self._fila.get()]
+            # Agrupa o que chegar dentro do intervalo; flush e parada não esperam
+            limite = time.monotonic() + self.intervalo
+            while itens[-1] is _GRAVAR:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    itens.append(self._fila.get(timeout=restante))
+                except queue.Empty:
+                    break
+            while True:
+                try:
+                    itens.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            pendente = pendente or any(item is _GRAVAR for item in itens)
+            if pendente:
+                try:
+                    self._gravar()
+                except Exception as e:
+                    self._erro = e
+                pendente = False
+
+            for item in itens:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if any(item is _PARAR for item in itens):
+                return
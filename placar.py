@@ -0,0 +1,212 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+
+# Janelas móveis do placar, em dias, terminando no dia de hoje
+JANELAS = {"semana": 7, "30_dias": 30, "semestre": 182}
+
+
+class _Janela:
+    """Totais de uma janela móvel: por usuário, em ordem de valor e em heap"""
+
+    __slots__ = ("dias", "inicio", "fim", "totais", "valores", "heap")
+
+    def __init__(self, dias: int, hoje: int):
+        self.dias = dias
+        self.inicio = hoje - dias + 1
+        self.fim = hoje
+        self.totais = {}  # nome -> minutos na janela
+        self.valores = []  # os mesmos minutos, em ordem crescente
+        self.heap = []  # (-minutos, nome), com entradas velhas descartadas na leitura
+
+    def somar(self, nome: str, minutos: int):
+        """Soma (ou subtrai, com minutos negativos) no total do usuário"""
+        anterior = self.totais.get(nome, 0)
+        atual = anterior + minutos
+        if anterior:
+            del self.valores[bisect_left(self.valores, anterior)]
+        if atual:
+            self.totais[nome] = atual
+            insort(self.valores, atual)
+            heapq.heappush(self.heap, (-atual, nome))
+        else:
+            self.totais.pop(nome, None)
+        # Cada alteração deixa uma entrada velha no heap; passando do dobro
+        # dos usuários, ele é refeito só com as atuais
+        if len(self.heap) > 2 * len(self.totais) + 64:
+            self.refazer_heap()
+
+    def refazer_heap(self):
+        self.heap = [(-minutos, nome) for nome, minutos in self.totais.items()]
+        heapq.heapify(self.heap)
+
+    def maiores(self, quantidade: int):
+        """Os `quantidade` maiores totais, em O(quantidade log U)"""
+        resultado = []
+        vistos = set()
+        while self.heap and len(resultado) < quantidade:
+            negativo, nome = heapq.heappop(self.heap)
+            if nome in vistos or self.totais.get(nome) != -negativo:
+                continue  # Entrada velha ou repetida
+            vistos.add(nome)
+            resultado.append((nome, -negativo))
+        for nome, minutos in resultado:
+            heapq.heappush(self.heap, (-minutos, nome))
+        return resultado
+
+
+class Placar:
+    """
+    Ranking incremental de minutos em janelas móveis (semana, 30 dias, semestre)
+
+    Os minutos ficam em baldes por dia; cada janela mantém o total de cada
+    usuário nos dias que cobre. Um registro novo soma só nas janelas que
+    cobrem o seu dia, e a virada do dia tira das janelas os baldes que saíram
+    delas e soma os que entraram, sem reler o histórico. Baldes mais antigos
+    que a maior janela são descartados.
+
+    Os maiores totais saem de um heap com remoção preguiçosa, e a posição de
+    um usuário, de uma lista ordenada dos totais (bisect), sem ordenar todos.
+    """
+
+    def __init__(self, janelas: dict = None, relogio=date.today):
+        """
+        Args:
+            janelas (dict): Nome -> tamanho em dias (padrão: JANELAS)
+            relogio (callable): Devolve a data de hoje
+        """
+        self._relogio = relogio
+        self._hoje = relogio().toordinal()
+        self._janelas = {nome: _Janela(dias, self._hoje) for nome, dias in (janelas or JANELAS).items()}
+        self._maior = max(janela.dias for janela in self._janelas.values())
+        self._baldes = {}  # ordinal do dia -> {nome: minutos}
+
+    @property
+    def janelas(self):
+        """Nomes das janelas disponíveis"""
+        return list(self._janelas)
+
+    @property
+    def primeiro_dia(self) -> int:
+        """Ordinal do dia mais antigo ainda coberto por alguma janela"""
+        return self._hoje - self._maior + 1
+
+    def carregar(self, itens):
+        """
+        Preenche o placar de uma vez, somando cada janela uma única vez no fim
+
+        Args:
+            itens (iterable): Triplas (nome, ordinal do dia, minutos)
+        """
+        self._avancar()
+        primeiro = self.primeiro_dia
+        for nome, ordinal, minutos in itens:
+            if ordinal >= primeiro:
+                balde = self._baldes.setdefault(ordinal, {})
+                balde[nome] = balde.get(nome, 0) + minutos
+        for janela in self._janelas.values():
+            self._recalcular(janela)
+
+    def adicionar(self, nome: str, ordinal: int, minutos: int):
+        """Soma minutos de um dia do usuário nas janelas que cobrem esse dia"""
+        self._avancar()
+        if ordinal < self.primeiro_dia:
+            return  # Fora de todas as janelas, e assim continuará
+        balde = self._baldes.setdefault(ordinal, {})
+        balde[nome] = balde.get(nome, 0) + minutos
+        for janela in self._janelas.values():
+            if janela.inicio <= ordinal <= janela.fim:
+                janela.somar(nome, minutos)
+
+    def renomear(self, anterior: str, novo: str):
+        """Passa os minutos do usuário para o novo nome"""
+        for balde in self._baldes.values():
+            if anterior in balde:
+                balde[novo] = balde.pop(anterior)
+        for janela in self._janelas.values():
+            if anterior in janela.totais:
+                janela.totais[novo] = janela.totais.pop(anterior)
+                janela.refazer_heap()
+
+    def maiores(self, janela: str, quantidade: int = 10):
+        """
+        Ranking dos usuários com mais minutos na janela
+
+        Args:
+            janela (str): Nome da janela (ver JANELAS)
+            quantidade (int): Tamanho do ranking
+
+        Returns:
+            list: Triplas (posição, nome, minutos), do maior para o menor;
+            empatados dividem a posição
+        """
+        resultado = []
+        for nome, minutos in self._janela(janela).maiores(quantidade):
+            posicao = resultado[-1][0] if resultado and resultado[-1][2] == minutos else len(resultado) + 1
+            resultado.append((posicao, nome, minutos))
+        return resultado
+
+    def posicao(self, janela: str, nome: str) -> dict:
+        """
+        Posição de um usuário na janela, em O(log U)
+
+        Returns:
+            dict: "posicao" (1 + usuários com mais minutos), "minutos",
+            "participantes" (usuários com minutos na janela) e
+            "minutos_para_subir" (o que falta para passar o próximo total
+            acima, ou None se já estiver em primeiro)
+        """
+        dados = self._janela(janela)
+        minutos = dados.totais.get(nome, 0)
+        acima = bisect_right(dados.valores, minutos)
+        return {
+            "posicao": len(dados.valores) - acima + 1,
+            "minutos": minutos,
+            "participantes": len(dados.valores),
+            "minutos_para_subir": dados.valores[acima] - minutos + 1 if acima < len(dados.valores) else None,
+        }
+
+    def _janela(self, nome: str) -> _Janela:
+        """Janela já avançada até hoje"""
+        janela = self._janelas.get(nome)
+        if janela is None:
+            raise ValueError(f"Janela {nome} não é válida. Use: {', '.join(self._janelas)}")
+        self._avancar()
+        return janela
+
+    def _avancar(self):
+        """Move as janelas até hoje, se o dia virou desde a última operação"""
+        hoje = self._relogio().toordinal()
+        if hoje <= self._hoje:
+            return
+        self._hoje = hoje
+        for janela in self._janelas.values():
+            inicio, fim = hoje - janela.dias + 1, hoje
+            if inicio > janela.fim:
+                # Nenhum dia em comum com a janela anterior
+                janela.inicio, janela.fim = inicio, fim
+                self._recalcular(janela)
+                continue
+            for ordinal in range(janela.inicio, inicio):
+                self._somar_balde(janela, ordinal, -1)
+            for ordinal in range(janela.fim + 1, fim + 1):
+                self._somar_balde(janela, ordinal, 1)
+            janela.inicio, janela.fim = inicio, fim
+        primeiro = self.primeiro_dia
+        for ordinal in [ordinal for ordinal in self._baldes if ordinal < primeiro]:
+            del self._baldes[ordinal]
+
+    def _somar_balde(self, janela: _Janela, ordinal: int, sinal: int):
+        for nome, minutos in self._baldes.get(ordinal, {}).items():
+            janela.somar(nome, sinal * minutos)
+
+    def _recalcular(self, janela: _Janela):
+        """Refaz os totais da janela a partir dos baldes, ordenando uma única vez"""
+        totais = {}
+        for ordinal, balde in self._baldes.items():
+            if janela.inicio <= ordinal <= janela.fim:
+                for nome, minutos in balde.items():
+                    totais[nome] = totais.get(nome, 0) + minutos
+        janela.totais = totais
+        janela.valores = sorted(totais.values())
+        janela.refazer_heap()
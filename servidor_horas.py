@@ -0,0 +1,377 @@
+"""
+Servidor HTTP/JSON local da central de horas
+
+Mantém uma única central em memória para vários postos de ponto. As
+consultas rodam concorrentemente em threads, fora do laço de eventos (uma
+consulta pode ler um ano do disco ou recontar registros); as gravações
+passam por uma única tarefa escritora, uma de cada vez, e nenhuma consulta
+lê a central enquanto uma gravação altera os dados.
+
+Uso: python servidor_horas.py [--arquivo horas_estagio.json] [--host 127.0.0.1] [--porta 8765]
+
+Rotas:
+    POST /ponto                 {"nome", "entrada", "saida"}
+    POST /registros             {"nome", "data", "entrada", "saida", "descricao"}
+    POST /minutos-passados      {"nome", "data", "minutos", "descricao"}
+    GET  /minutos/dia           ?nome=&data=
+    GET  /minutos/mes           ?nome=&mes=&ano=
+    GET  /relatorios/mensal     ?mes=&ano=
+    GET  /relatorios/anual      ?ano=
+    GET  /ranking               ?janela=&quantidade=
+    GET  /ranking/posicao       ?nome=&janela=
+    GET  /stats
+    GET  /saude
+"""
+import argparse
+import asyncio
+import json
+import threading
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlsplit
+
+from central_horas import CentralHorasEstagio
+from particoes_anuais import eh_manifesto
+from persistencia import ArquivoEmUso
+
+_MOTIVOS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+# Limites de uma requisição
+_TAMANHO_MAXIMO_CORPO = 1024 * 1024
+_CABECALHOS_MAXIMOS = 100
+
+
+class RequisicaoInvalida(Exception):
+    """Requisição HTTP malformada; a conexão é encerrada após a resposta"""
+
+    def __init__(self, status: int, mensagem: str):
+        self.status = status
+        super().__init__(mensagem)
+
+
+class _TravaLeituraEscrita:
+    """
+    Várias consultas ao mesmo tempo ou uma gravação sozinha
+
+    Uma gravação esperando passa na frente das consultas que chegarem
+    depois, para que um fluxo contínuo de leituras não a atrase sem fim.
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._leitores = 0
+        self._escrevendo = False
+        self._escritores_esperando = 0
+
+    @contextmanager
+    def leitura(self):
+        with self._condicao:
+            while self._escrevendo or self._escritores_esperando:
+                self._condicao.wait()
+            self._leitores += 1
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._leitores -= 1
+                if not self._leitores:
+                    self._condicao.notify_all()
+
+    @contextmanager
+    def escrita(self):
+        with self._condicao:
+            self._escritores_esperando += 1
+            while self._escrevendo or self._leitores:
+                self._condicao.wait()
+            self._escritores_esperando -= 1
+            self._escrevendo = True
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._escrevendo = False
+                self._condicao.notify_all()
+
+
+def _inteiro(parametros: dict, nome: str):
+    """Parâmetro inteiro opcional da query string"""
+    valor = parametros.get(nome)
+    if valor in (None, ""):
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"Parâmetro {nome} deve ser um número inteiro")
+
+
+class ServidorHoras:
+    """Servidor asyncio que expõe uma central de horas por HTTP/JSON"""
+
+    def __init__(self, central, host: str = "127.0.0.1", porta: int = 8765, tamanho_fila: int = 1024):
+        """
+        Args:
+            central (CentralHorasEstagio): Central já configurada, com
+                armazenamento JSON (as gravações rodam em outra thread) e
+                sem processos_relatorio, que depende de uma única thread
+            host (str): Endereço de escuta
+            porta (int): Porta de escuta (0 escolhe uma livre)
+            tamanho_fila (int): Gravações pendentes antes de as requisições
+                passarem a esperar
+
+        Raises:
+            ValueError: Central com processos_relatorio maior que 1
+        """
+        if central.processos_relatorio > 1:
+            raise ValueError("O servidor atende em threads; use uma central com processos_relatorio=1")
+        self.central = central
+        self.host = host
+        self.porta = porta
+        self.tamanho_fila = tamanho_fila
+        self._fila = None
+        self._servidor = None
+        self._escritor = None
+        self._trava = _TravaLeituraEscrita()
+        self._rotas = {
+            ("POST", "/ponto"): self._registrar_ponto,
+            ("POST", "/registros"): self._registrar_manual,
+            ("POST", "/minutos-passados"): self._registrar_minutos_passados,
+            ("GET", "/minutos/dia"): self._minutos_dia,
+            ("GET", "/minutos/mes"): self._minutos_mes,
+            ("GET", "/relatorios/mensal"): self._relatorio_mensal,
+            ("GET", "/relatorios/anual"): self._relatorio_anual,
+            ("GET", "/ranking"): self._ranking,
+            ("GET", "/ranking/posicao"): self._posicao_ranking,
+            ("GET", "/stats"): self._stats,
+            ("GET", "/saude"): self._saude,
+        }
+
+    async def iniciar(self):
+        """Carrega os dados, sobe a tarefa escritora e começa a aceitar conexões"""
+        # Carrega antes de atender, para que nenhuma consulta leia o disco no laço
+        await asyncio.to_thread(lambda: self.central.dados)
+        self._fila = asyncio.Queue(maxsize=self.tamanho_fila)
+        self._escritor = asyncio.create_task(self._executar_escritas())
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+
+    async def servir(self):
+        """Atende até ser cancelado e então encerra a central"""
+        await self.iniciar()
+        try:
+            async with self._servidor:
+                await self._servidor.serve_forever()
+        finally:
+            await self.encerrar()
+
+    async def encerrar(self):
+        """Para de aceitar conexões, conclui as gravações pendentes e fecha a central"""
+        if self._servidor is not None:
+            self._servidor.close()
+        if self._escritor is not None:
+            await self._fila.join()
+            self._escritor.cancel()
+            self._escritor = None
+        await asyncio.to_thread(self._escrever, self.central.fechar)
+
+    async def _executar_escritas(self):
+        """Tarefa escritora: executa as gravações da fila uma por vez, fora do laço"""
+        while True:
+            funcao, args, futuro = await self._fila.get()
+            try:
+                resultado = await asyncio.to_thread(self._escrever, funcao, *args)
+            except Exception as e:
+                if not futuro.cancelled():
+                    futuro.set_exception(e)
+            else:
+                if not futuro.cancelled():
+                    futuro.set_result(resultado)
+            finally:
+                self._fila.task_done()
+
+    async def _gravar(self, funcao, *args):
+        """Enfileira uma gravação para a tarefa escritora e aguarda o resultado"""
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((funcao, args, futuro))
+        return await futuro
+
+    def _escrever(self, funcao, *args):
+        """Executa uma gravação sem consultas em andamento (na thread da tarefa escritora)"""
+        with self._trava.escrita():
+            return funcao(*args)
+
+    def _ler(self, funcao, *args):
+        with self._trava.leitura():
+            return funcao(*args)
+
+    async def _consultar(self, funcao, *args):
+        """Executa uma consulta à central em uma thread, sem bloquear o laço"""
+        return await asyncio.to_thread(self._ler, funcao, *args)
+
+    async def _atender(self, leitor, escritor):
+        """Atende as requisições de uma conexão, mantida aberta (keep-alive)"""
+        try:
+            while True:
+                try:
+                    requisicao = await self._ler_requisicao(leitor)
+                except RequisicaoInvalida as e:
+                    await self._responder(escritor, e.status, {"erro": str(e)}, manter=False)
+                    break
+                if requisicao is None:
+                    break
+                metodo, caminho, parametros, corpo, manter = requisicao
+                status, resposta = await self._despachar(metodo, caminho, parametros, corpo)
+                await self._responder(escritor, status, resposta, manter)
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # Cliente desconectou ou mandou uma linha longa demais
+        finally:
+            escritor.close()
+
+    @staticmethod
+    async def _ler_requisicao(leitor):
+        """
+        Lê uma requisição HTTP/1.1
+
+        Returns:
+            tuple: (metodo, caminho, parametros, corpo, manter_conexao) ou
+            None se o cliente fechou a conexão
+        """
+        linha = await leitor.readline()
+        if not linha:
+            return None
+        try:
+            metodo, alvo, versao = linha.decode('latin-1').split()
+        except ValueError:
+            raise RequisicaoInvalida(400, "Linha de requisição inválida")
+
+        cabecalhos = {}
+        while True:
+            linha = await leitor.readline()
+            if linha in (b"\r\n", b"\n", b""):
+                break
+            if len(cabecalhos) >= _CABECALHOS_MAXIMOS:
+                raise RequisicaoInvalida(400, "Cabeçalhos demais")
+            nome, _, valor = linha.decode('latin-1').partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        try:
+            tamanho = int(cabecalhos.get("content-length", 0))
+            if tamanho < 0:
+                raise ValueError
+        except ValueError:
+            raise RequisicaoInvalida(400, "Content-Length inválido")
+        if tamanho > _TAMANHO_MAXIMO_CORPO:
+            raise RequisicaoInvalida(413, "Corpo da requisição grande demais")
+        corpo = await leitor.readexactly(tamanho) if tamanho else b""
+
+        conexao = cabecalhos.get("connection", "").lower()
+        manter = conexao != "close" if versao == "HTTP/1.1" else conexao == "keep-alive"
+        partes = urlsplit(alvo)
+        parametros = {nome: valores[-1] for nome, valores in parse_qs(partes.query).items()}
+        return metodo.upper(), partes.path, parametros, corpo, manter
+
+    async def _despachar(self, metodo: str, caminho: str, parametros: dict, corpo: bytes):
+        """Chama a rota e converte o resultado ou o erro em (status, resposta)"""
+        rota = self._rotas.get((metodo, caminho.rstrip("/") or "/"))
+        if rota is None:
+            return 404, {"erro": f"Rota {metodo} {caminho} não existe"}
+        try:
+            dados = json.loads(corpo) if corpo else {}
+            if not isinstance(dados, dict):
+                raise ValueError("Corpo deve ser um objeto JSON")
+            return await rota(parametros, dados)
+        except ValueError as e:
+            return 400, {"erro": str(e)}
+        except KeyError as e:
+            return 400, {"erro": f"Campo obrigatório ausente: {e.args[0]}"}
+        except Exception as e:
+            return 500, {"erro": f"Erro interno: {e}"}
+
+    @staticmethod
+    async def _responder(escritor, status: int, resposta, manter: bool):
+        corpo = json.dumps(resposta, ensure_ascii=False).encode('utf-8')
+        cabecalho = (
+            f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(corpo)}\r\n"
+            f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n"
+        )
+        escritor.write(cabecalho.encode('latin-1') + corpo)
+        await escritor.drain()
+
+    async def _registrar_ponto(self, parametros, dados):
+        registro = await self._gravar(self.central.registrar_horas, dados["nome"], dados["entrada"], dados["saida"])
+        return 201, registro
+
+    async def _registrar_manual(self, parametros, dados):
+        registro = await self._gravar(self.central.adicionar_registro_manual, dados["nome"], dados["data"],
+                                      dados["entrada"], dados["saida"], dados.get("descricao", ""))
+        return 201, registro
+
+    async def _registrar_minutos_passados(self, parametros, dados):
+        minutos = dados["minutos"]
+        if not isinstance(minutos, int):
+            raise ValueError("Minutos devem ser um número inteiro")
+        registro = await self._gravar(self.central.adicionar_minutos_passados, dados["nome"], dados["data"],
+                                      minutos, dados.get("descricao", ""))
+        return 201, registro
+
+    async def _minutos_dia(self, parametros, dados):
+        minutos = await self._consultar(self.central.calcular_minutos_dia, parametros["nome"], parametros.get("data"))
+        return 200, {"minutos": minutos}
+
+    async def _minutos_mes(self, parametros, dados):
+        minutos = await self._consultar(self.central.calcular_minutos_mes, parametros["nome"],
+                                        _inteiro(parametros, "mes"), _inteiro(parametros, "ano"))
+        return 200, {"minutos": minutos}
+
+    async def _relatorio_mensal(self, parametros, dados):
+        return 200, await self._consultar(self.central.gerar_relatorio_mensal, _inteiro(parametros, "mes"),
+                                          _inteiro(parametros, "ano"))
+
+    async def _relatorio_anual(self, parametros, dados):
+        return 200, await self._consultar(self.central.gerar_relatorio_anual, _inteiro(parametros, "ano"))
+
+    async def _ranking(self, parametros, dados):
+        quantidade = _inteiro(parametros, "quantidade")
+        return 200, await self._consultar(self.central.ranking_janela, parametros.get("janela", "semana"),
+                                          quantidade if quantidade is not None else 10)
+
+    async def _posicao_ranking(self, parametros, dados):
+        return 200, await self._consultar(self.central.posicao_no_ranking, parametros["nome"],
+                                          parametros.get("janela", "semana"))
+
+    async def _stats(self, parametros, dados):
+        return 200, await self._consultar(self.central.stats)
+
+    async def _saude(self, parametros, dados):
+        return 200, {"status": "ok"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON local da central de horas")
+    parser.add_argument("--arquivo", default="horas_estagio.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--sem-journal", action="store_true",
+                        help="regrava o arquivo inteiro a cada ponto em vez de usar o journal")
+    args = parser.parse_args()
+
+    # Abre também o arquivo já dividido por ano pelo Ponto de estagio.py; com
+    # exclusivo, recusa o arquivo aberto pela janela ou por outro servidor
+    try:
+        central = CentralHorasEstagio(args.arquivo, journal=not args.sem_journal,
+                                      particionar_por_ano=eh_manifesto(args.arquivo), exclusivo=True)
+    except ArquivoEmUso as e:
+        parser.exit(1, f"erro: {e}\n")
+    servidor = ServidorHoras(central, args.host, args.porta)
+    print(f"Servindo {args.arquivo} em http://{args.host}:{args.porta}", flush=True)
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
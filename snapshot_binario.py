@@ -0,0 +1,353 @@
+"""
+Snapshot binário dos dados da central, lido com mmap
+
+Alternativa ao JSON indentado para arquivos grandes. O arquivo tem quatro
+partes:
+
+    cabeçalho   "HRSB", versão, tamanho da linha, nº de linhas e posições
+    linhas      uma por registro, de tamanho fixo (struct "<IiiqIhh"):
+                índice do usuário, ordinal do dia, minutos, timestamp em
+                microssegundos desde 1970, posição da descrição nos textos
+                e entrada e saída do turno em minutos (-1 sem turno); a
+                versão 1, ainda lida, não tinha as duas últimas
+    textos      descrições sem repetição, cada uma com o tamanho em 4 bytes
+    metadados   JSON com os usuários (nome, primeira linha, quantidade), os
+                registros que não cabem nas colunas e os demais campos do
+                arquivo (cadastro, journal_seq, ultima_atualizacao...)
+
+As linhas de um usuário ficam contíguas, na ordem de inclusão. Em modo
+compacto as colunas são copiadas do buffer mapeado, sem montar um dict
+por registro.
+
+Uso: python snapshot_binario.py horas_estagio.json horas_estagio.bin
+(ou ao contrário, para voltar ao JSON)
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from itertools import count, repeat
+
+from armazem_colunar import (SEM_TURNO, RegistroCompacto, RegistrosColunares, _data_de_ordinal,
+                             _microssegundos, _minutos_horario, _ordinal_de_data, _timestamp_iso)
+from indice_turnos import formatar_horario
+from persistencia import escrever_atomico
+
+ASSINATURA = b"HRSB"
+VERSAO = 2
+
+# Formato da linha de cada versão
+_FORMATOS_LINHA = {1: "IiiqI", 2: "IiiqIhh"}
+
+_CABECALHO = struct.Struct("<4sHHQQQ")
+_LINHA = struct.Struct("<" + _FORMATOS_LINHA[VERSAO])
+_TAMANHO_TEXTO = struct.Struct("<I")
+
+# Linhas desempacotadas por chamada de struct ao percorrer o buffer
+_LINHAS_POR_BLOCO = 4096
+
+
+def eh_snapshot_binario(caminho: str) -> bool:
+    """Verifica pela assinatura se o arquivo é um snapshot binário"""
+    try:
+        with open(caminho, 'rb') as f:
+            return f.read(len(ASSINATURA)) == ASSINATURA
+    except FileNotFoundError:
+        return False
+
+
+def serializar_snapshot(dados: dict) -> bytes:
+    """
+    Converte os dados da central (registros em dicts ou em colunas) para o formato binário
+
+    Args:
+        dados (dict): Estrutura do horas_estagio.json
+
+    Returns:
+        bytes: Conteúdo do arquivo
+    """
+    total = sum(len(usuario["registros"]) for usuario in dados["usuarios"].values())
+    linhas = bytearray(total * _LINHA.size)
+    textos = bytearray()
+    posicao_por_texto = {}
+
+    def posicao_texto(texto: str) -> int:
+        posicao = posicao_por_texto.get(texto)
+        if posicao is None:
+            posicao = posicao_por_texto[texto] = len(textos)
+            codificado = texto.encode('utf-8')
+            textos.extend(_TAMANHO_TEXTO.pack(len(codificado)))
+            textos.extend(codificado)
+        return posicao
+
+    posicao_texto("")
+    usuarios, excecoes = [], {}
+    linha = 0
+    posicoes_descricoes = (None, None)
+    for indice, (nome, usuario) in enumerate(dados["usuarios"].items()):
+        registros = usuario["registros"]
+        usuarios.append([nome, linha, len(registros)])
+        if isinstance(registros, RegistrosColunares):
+            # A tabela de descrições costuma ser compartilhada entre usuários
+            if posicoes_descricoes[0] is not registros.descricoes:
+                posicoes_descricoes = (registros.descricoes, [posicao_texto(texto) for texto in registros.descricoes])
+            posicoes = posicoes_descricoes[1]
+            for i, (dia, minutos, timestamp, id_descricao, entrada, saida) in enumerate(
+                    zip(registros.dias, registros.minutos, registros.timestamps, registros.ids_descricao,
+                        registros.entradas, registros.saidas)):
+                _LINHA.pack_into(linhas, (linha + i) * _LINHA.size, indice, dia, minutos, timestamp,
+                                 posicoes[id_descricao], entrada, saida)
+            for i, registro in registros._excecoes.items():
+                excecoes[str(linha + i)] = registro
+            linha += len(registros)
+            continue
+
+        for registro in registros:
+            if isinstance(registro, RegistroCompacto):
+                registro = registro.para_dict()
+            dia = _ordinal_de_data(registro["data"])
+            minutos = int(registro.get("minutos", int(registro["horas"] * 60)))
+            if RegistrosColunares._cabe_nas_colunas(registro, dia):
+                timestamp = _microssegundos(registro["timestamp"])
+                descricao = posicao_texto(registro["descricao"])
+                entrada = _minutos_horario(registro.get("entrada"))
+                saida = _minutos_horario(registro.get("saida"))
+            else:
+                timestamp = descricao = 0
+                entrada = saida = SEM_TURNO
+                excecoes[str(linha)] = registro
+            _LINHA.pack_into(linhas, linha * _LINHA.size, indice, dia, minutos, timestamp, descricao, entrada, saida)
+            linha += 1
+
+    metadados = {
+        "usuarios": usuarios,
+        "excecoes": excecoes,
+        "dados": {chave: valor for chave, valor in dados.items() if chave != "usuarios"},
+    }
+    metadados = json.dumps(metadados, ensure_ascii=False).encode('utf-8')
+    posicao_textos = _CABECALHO.size + len(linhas)
+    cabecalho = _CABECALHO.pack(ASSINATURA, VERSAO, _LINHA.size, total, posicao_textos,
+                                posicao_textos + len(textos))
+    return b"".join((cabecalho, linhas, textos, metadados))
+
+
+def gravar_snapshot(dados: dict, caminho: str) -> int:
+    """
+    Grava o snapshot binário de forma atômica
+
+    Returns:
+        int: Bytes gravados
+    """
+    conteudo = serializar_snapshot(dados)
+    escrever_atomico(caminho, conteudo)
+    return len(conteudo)
+
+
+class SnapshotBinario:
+    """
+    Leitura de um snapshot binário mapeado em memória
+
+    Só os metadados e a tabela de textos são decodificados na abertura; as
+    linhas são lidas do buffer quando pedidas. Use como context manager ou
+    chame fechar().
+    """
+
+    def __init__(self, caminho: str):
+        with open(caminho, 'rb') as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mapa)
+        try:
+            self._ler_estrutura(caminho)
+        except BaseException:
+            self.fechar()
+            raise
+
+    def _ler_estrutura(self, caminho: str):
+        if len(self._buffer) < _CABECALHO.size:
+            raise ValueError(f"{caminho} não é um snapshot binário")
+        assinatura, versao, tamanho_linha, self.total, posicao_textos, posicao_metadados = \
+            _CABECALHO.unpack_from(self._buffer)
+        if assinatura != ASSINATURA:
+            raise ValueError(f"{caminho} não é um snapshot binário")
+        formato = _FORMATOS_LINHA.get(versao)
+        if formato is None or tamanho_linha != struct.calcsize("<" + formato):
+            raise ValueError(f"Versão {versao} do snapshot binário não é suportada")
+        self.versao = versao
+        self._formato = formato
+        self._campos = len(formato)
+        self._tamanho_linha = tamanho_linha
+        self._bloco = struct.Struct("<" + formato * _LINHAS_POR_BLOCO)
+
+        metadados = json.loads(self._buffer[posicao_metadados:].tobytes().decode('utf-8'))
+        self.dados_extras = metadados["dados"]
+        self._usuarios = {nome: (inicio, quantidade) for nome, inicio, quantidade in metadados["usuarios"]}
+        self._excecoes = {int(linha): registro for linha, registro in metadados["excecoes"].items()}
+
+        # Textos na ordem do arquivo; a posição de cada um vira um índice na lista
+        self.textos = []
+        self._indice_por_posicao = {}
+        posicao = posicao_textos
+        while posicao < posicao_metadados:
+            tamanho, = _TAMANHO_TEXTO.unpack_from(self._buffer, posicao)
+            self._indice_por_posicao[posicao - posicao_textos] = len(self.textos)
+            inicio = posicao + _TAMANHO_TEXTO.size
+            self.textos.append(self._buffer[inicio:inicio + tamanho].tobytes().decode('utf-8'))
+            posicao = inicio + tamanho
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        """Libera o mapeamento do arquivo"""
+        if self._mapa is not None:
+            self._buffer.release()
+            self._mapa.close()
+            self._mapa = None
+
+    def nomes(self) -> list:
+        """Usuários do snapshot, na ordem do arquivo"""
+        return list(self._usuarios)
+
+    def _colunas(self, inicio: int, quantidade: int):
+        """
+        Percorre as linhas [inicio, inicio + quantidade) em blocos
+
+        Yields:
+            tuple: (primeira linha do bloco, valores achatados de cada linha do bloco)
+        """
+        fim = inicio + quantidade
+        linha = inicio
+        while linha < fim:
+            posicao = _CABECALHO.size + linha * self._tamanho_linha
+            if fim - linha >= _LINHAS_POR_BLOCO:
+                yield linha, self._bloco.unpack_from(self._buffer, posicao)
+                linha += _LINHAS_POR_BLOCO
+            else:
+                valores = struct.unpack_from("<" + self._formato * (fim - linha), self._buffer, posicao)
+                yield linha, valores
+                linha = fim
+
+    def _intervalo(self, nome: str):
+        intervalo = self._usuarios.get(nome)
+        if intervalo is None:
+            raise KeyError(f"Usuário {nome} não está no snapshot")
+        return intervalo
+
+    def registros_colunares(self, nome: str, descricoes: list = None, id_por_descricao: dict = None):
+        """
+        Registros do usuário em colunas, copiados do buffer sem montar dicts
+
+        Args:
+            descricoes (list): Tabela de descrições compartilhada entre usuários
+            id_por_descricao (dict): Índice dessa tabela
+        """
+        if descricoes is None:
+            descricoes, id_por_descricao = list(self.textos), {texto: i for i, texto in enumerate(self.textos)}
+        inicio, quantidade = self._intervalo(nome)
+        dias, minutos, timestamps, posicoes = array('i'), array('i'), array('q'), []
+        entradas, saidas = (array('h'), array('h')) if self._campos > 5 else (None, None)
+        campos = self._campos
+        for _, valores in self._colunas(inicio, quantidade):
+            dias.extend(valores[1::campos])
+            minutos.extend(valores[2::campos])
+            timestamps.extend(valores[3::campos])
+            posicoes.extend(valores[4::campos])
+            if entradas is not None:
+                entradas.extend(valores[5::campos])
+                saidas.extend(valores[6::campos])
+        indice_por_posicao = self._indice_por_posicao
+        ids_descricao = array('i', (indice_por_posicao[posicao] for posicao in posicoes))
+        excecoes = {linha - inicio: registro for linha, registro in self._excecoes.items()
+                    if inicio <= linha < inicio + quantidade}
+        return RegistrosColunares.de_colunas(dias, minutos, timestamps, ids_descricao, descricoes,
+                                             id_por_descricao, excecoes, entradas, saidas)
+
+    def registros(self, nome: str):
+        """Percorre os registros do usuário como dicts, no formato do arquivo JSON"""
+        inicio, quantidade = self._intervalo(nome)
+        textos, indice_por_posicao = self.textos, self._indice_por_posicao
+        excecoes = self._excecoes
+        campos = self._campos
+        for primeira, valores in self._colunas(inicio, quantidade):
+            turnos = (zip(valores[5::campos], valores[6::campos]) if campos > 5
+                      else repeat((SEM_TURNO, SEM_TURNO)))
+            for linha, dia, minutos, timestamp, posicao, (entrada, saida) in zip(
+                    count(primeira), valores[1::campos], valores[2::campos], valores[3::campos],
+                    valores[4::campos], turnos):
+                if linha in excecoes:
+                    yield dict(excecoes[linha])
+                    continue
+                registro = {
+                    "data": _data_de_ordinal(dia),
+                    "minutos": minutos,
+                    "horas": round(minutos / 60, 2),
+                    "descricao": textos[indice_por_posicao[posicao]],
+                    "timestamp": _timestamp_iso(timestamp),
+                }
+                if entrada != SEM_TURNO:
+                    registro["entrada"] = formatar_horario(entrada)
+                    registro["saida"] = formatar_horario(saida)
+                yield registro
+
+    def para_dados(self, compacto: bool = False) -> dict:
+        """
+        Monta a estrutura do horas_estagio.json
+
+        Args:
+            compacto (bool): Registros em RegistrosColunares em vez de dicts;
+                todos os usuários compartilham a tabela de descrições
+        """
+        usuarios = {}
+        if compacto:
+            descricoes = list(self.textos)
+            id_por_descricao = {texto: i for i, texto in enumerate(descricoes)}
+            for nome in self._usuarios:
+                usuarios[nome] = {"registros": self.registros_colunares(nome, descricoes, id_por_descricao)}
+        else:
+            for nome in self._usuarios:
+                usuarios[nome] = {"registros": list(self.registros(nome))}
+        return {"usuarios": usuarios, **self.dados_extras}
+
+
+def ler_snapshot(caminho: str, compacto: bool = False) -> dict:
+    """Lê um snapshot binário inteiro para a estrutura do horas_estagio.json"""
+    with SnapshotBinario(caminho) as snapshot:
+        return snapshot.para_dados(compacto)
+
+
+def json_para_binario(arquivo_json: str, arquivo_binario: str) -> int:
+    """
+    Converte um horas_estagio.json para o snapshot binário
+
+    Returns:
+        int: Bytes gravados
+    """
+    with open(arquivo_json, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    return gravar_snapshot(dados, arquivo_binario)
+
+
+def binario_para_json(arquivo_binario: str, arquivo_json: str) -> int:
+    """
+    Converte um snapshot binário de volta para o JSON indentado da central
+
+    Returns:
+        int: Bytes gravados
+    """
+    conteudo = json.dumps(ler_snapshot(arquivo_binario), indent=4, ensure_ascii=False).encode('utf-8')
+    escrever_atomico(arquivo_json, conteudo)
+    return len(conteudo)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Uso: python snapshot_binario.py <origem> <destino>")
+    origem, destino = sys.argv[1:]
+    if eh_snapshot_binario(origem):
+        print(f"{binario_para_json(origem, destino)} bytes gravados em {destino} (JSON)")
+    else:
+        print(f"{json_para_binario(origem, destino)} bytes gravados em {destino} (binário)")
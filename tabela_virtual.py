@@ -0,0 +1,165 @@
+from operator import itemgetter
+
+import customtkinter as ctk
+
+FONTE_CABECALHO = ("Times New Roman", 12, "bold")
+
+
+class Coluna:
+    """Coluna de uma TabelaVirtual"""
+
+    __slots__ = ("titulo", "largura", "alinhamento", "formatar", "ordenavel", "decrescente")
+
+    def __init__(self, titulo: str, largura: int = 80, alinhamento: str = "center", formatar=str,
+                 ordenavel: bool = True, decrescente: bool = False):
+        """
+        Args:
+            titulo (str): Texto do cabeçalho
+            largura (int): Largura em pixels
+            alinhamento (str): "w", "center" ou "e"
+            formatar (callable): Converte o valor cru da célula no texto exibido
+            ordenavel (bool): Clicar no cabeçalho ordena a tabela pela coluna
+            decrescente (bool): Sentido da primeira ordenação pela coluna
+        """
+        self.titulo = titulo
+        self.largura = largura
+        self.alinhamento = alinhamento
+        self.formatar = formatar
+        self.ordenavel = ordenavel
+        self.decrescente = decrescente
+
+
+class TabelaVirtual(ctk.CTkFrame):
+    """
+    Tabela com rolagem que só cria widgets para as linhas visíveis
+
+    Os dados ficam em uma lista de tuplas, com um valor cru por coluna. Um
+    conjunto fixo de linhas de widgets, do tamanho da área visível, é
+    reaproveitado ao rolar: só o texto dos rótulos muda. Clicar no título de
+    uma coluna ordena os dados por ela (um novo clique inverte a ordem), sem
+    recriar nenhum widget.
+    """
+
+    def __init__(self, master, colunas, altura_linha: int = 28, **kwargs):
+        super().__init__(master, **kwargs)
+        self.colunas = list(colunas)
+        self.altura_linha = altura_linha
+        self._linhas = []
+        self._inicio = 0
+        self._visiveis = 0
+        self._ordem = None  # (índice da coluna, decrescente)
+        self._reaproveitaveis = []  # (frame da linha, rótulos)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        cabecalho = ctk.CTkFrame(self)
+        cabecalho.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 2))
+        self._botoes = []
+        for indice, coluna in enumerate(self.colunas):
+            botao = ctk.CTkButton(cabecalho, text=coluna.titulo, width=coluna.largura, anchor=coluna.alinhamento,
+                                  font=FONTE_CABECALHO, fg_color="transparent", corner_radius=0,
+                                  command=lambda indice=indice: self.ordenar(indice),
+                                  state="normal" if coluna.ordenavel else "disabled")
+            botao.pack(side="left")
+            self._botoes.append(botao)
+
+        self._corpo = ctk.CTkFrame(self, fg_color="transparent")
+        self._corpo.grid(row=1, column=0, sticky="nsew")
+        # A altura vem da janela, não das linhas criadas dentro do corpo
+        self._corpo.grid_propagate(False)
+        self._corpo.grid_columnconfigure(0, weight=1)
+        self._corpo.bind("<Configure>", self._ao_redimensionar)
+        self._barra = ctk.CTkScrollbar(self, orientation="vertical", command=self._rolar_pela_barra)
+        self._barra.grid(row=1, column=1, sticky="ns")
+        self._ligar_roda(self._corpo)
+
+    def definir_linhas(self, linhas):
+        """Troca os dados da tabela, mantendo a ordenação escolhida, e volta ao topo"""
+        self._linhas = list(linhas)
+        if self._ordem is not None:
+            self._linhas.sort(key=itemgetter(self._ordem[0]), reverse=self._ordem[1])
+        self._inicio = 0
+        self._renderizar()
+
+    def ordenar(self, indice: int, decrescente: bool = None):
+        """
+        Ordena os dados pela coluna e redesenha só as linhas visíveis
+
+        Args:
+            indice (int): Posição da coluna
+            decrescente (bool): Sentido; sem informar, um novo clique na mesma
+                coluna inverte a ordem e o primeiro usa o sentido da coluna
+        """
+        if decrescente is None:
+            if self._ordem is not None and self._ordem[0] == indice:
+                decrescente = not self._ordem[1]
+            else:
+                decrescente = self.colunas[indice].decrescente
+        self._ordem = (indice, decrescente)
+        self._linhas.sort(key=itemgetter(indice), reverse=decrescente)
+        for posicao, (botao, coluna) in enumerate(zip(self._botoes, self.colunas)):
+            seta = (" ▼" if decrescente else " ▲") if posicao == indice else ""
+            botao.configure(text=coluna.titulo + seta)
+        self._inicio = 0
+        self._renderizar()
+
+    def _criar_linha(self):
+        """Cria uma linha de widgets reaproveitável"""
+        linha = ctk.CTkFrame(self._corpo, height=self.altura_linha)
+        rotulos = []
+        for coluna in self.colunas:
+            rotulo = ctk.CTkLabel(linha, text="", width=coluna.largura, height=self.altura_linha,
+                                  anchor=coluna.alinhamento)
+            rotulo.pack(side="left")
+            self._ligar_roda(rotulo)
+            rotulos.append(rotulo)
+        self._ligar_roda(linha)
+        self._reaproveitaveis.append((linha, rotulos))
+
+    def _ao_redimensionar(self, evento):
+        """Ajusta quantas linhas de widgets existem à altura disponível"""
+        visiveis = max(1, evento.height // (self.altura_linha + 2))
+        if visiveis == self._visiveis:
+            return
+        while len(self._reaproveitaveis) < visiveis:
+            self._criar_linha()
+        self._visiveis = visiveis
+        for linha, _ in self._reaproveitaveis[visiveis:]:
+            linha.grid_remove()
+        self._renderizar()
+
+    def _renderizar(self):
+        """Preenche as linhas de widgets com os dados a partir de self._inicio"""
+        total = len(self._linhas)
+        self._inicio = max(0, min(self._inicio, total - self._visiveis))
+        for posicao, (linha, rotulos) in enumerate(self._reaproveitaveis[:self._visiveis]):
+            indice = self._inicio + posicao
+            if indice >= total:
+                linha.grid_remove()
+                continue
+            for rotulo, coluna, valor in zip(rotulos, self.colunas, self._linhas[indice]):
+                rotulo.configure(text=coluna.formatar(valor))
+            linha.grid(row=posicao, column=0, sticky="ew", pady=1)
+        if total:
+            self._barra.set(self._inicio / total, min(1.0, (self._inicio + self._visiveis) / total))
+        else:
+            self._barra.set(0.0, 1.0)
+
+    def _rolar_pela_barra(self, acao: str, valor: str, unidade: str = None):
+        """Recebe os comandos da barra de rolagem ("moveto" ou "scroll")"""
+        if acao == "moveto":
+            self._inicio = int(float(valor) * len(self._linhas))
+        else:
+            self._inicio += int(valor) * (self._visiveis if unidade == "pages" else 1)
+        self._renderizar()
+
+    def _rolar_pela_roda(self, evento):
+        # Linux envia Button-4/5; Windows e macOS, MouseWheel com delta
+        para_cima = evento.num == 4 or getattr(evento, "delta", 0) > 0
+        self._inicio += -3 if para_cima else 3
+        self._renderizar()
+
+    def _ligar_roda(self, widget):
+        for sequencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequencia, self._rolar_pela_roda)
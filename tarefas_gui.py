@@ -0,0 +1,143 @@
+import logging
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+_log = logging.getLogger(__name__)
+
+# Quadros do indicador de progresso, trocados a cada verificação
+QUADROS_ESPERA = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+
+
+class ExecutorTarefas:
+    """
+    Executa chamadas demoradas fora da thread do Tk e devolve o resultado nela
+
+    As funções rodam em uma thread de trabalho e viram futures. A thread do
+    Tk verifica os futures com after() a cada `intervalo_ms` e chama
+    ao_concluir/ao_falhar nela mesma, onde é seguro mexer nos widgets.
+    Enquanto houver tarefas pendentes, o rótulo de progresso mostra um
+    indicador animado com a descrição da tarefa mais antiga.
+
+    Tarefas com a mesma chave não se acumulam: enquanto uma estiver na fila
+    ou em execução, pedir outra igual devolve o mesmo future. Tarefas
+    marcadas como gravação nunca são descartadas ao encerrar.
+    """
+
+    def __init__(self, raiz, rotulo_progresso=None, intervalo_ms: int = 80, trabalhadores: int = 1):
+        """
+        Args:
+            raiz: Widget Tk usado para agendar as verificações (after)
+            rotulo_progresso: Widget com configure(text=...) para o indicador
+            intervalo_ms (int): Intervalo entre as verificações
+            trabalhadores (int): Threads de trabalho; com 1, as chamadas à
+                central são feitas uma de cada vez, na ordem pedida
+        """
+        self.raiz = raiz
+        self.rotulo_progresso = rotulo_progresso
+        self.intervalo_ms = intervalo_ms
+        self._executor = ThreadPoolExecutor(trabalhadores, thread_name_prefix="tarefas-gui")
+        self._pendentes = {}  # chave -> (future, descrição, ao_concluir, ao_falhar)
+        self._consultas = set()  # futures que podem ser cancelados ao encerrar
+        self._sem_chave = 0
+        self._quadro = 0
+        self._verificando = False
+
+    def executar(self, funcao, *args, chave=None, descricao_tarefa: str = "Processando", ao_concluir=None,
+                 ao_falhar=None, gravacao: bool = False, **kwargs):
+        """
+        Agenda funcao(*args, **kwargs) na thread de trabalho
+
+        Args:
+            chave: Identifica tarefas repetidas (ex.: ("ranking_anual", 2025));
+                None nunca é deduplicada
+            descricao_tarefa (str): Texto do indicador de progresso
+            ao_concluir (callable): Recebe o resultado, na thread do Tk
+            ao_falhar (callable): Recebe a exceção, na thread do Tk
+            gravacao (bool): A tarefa grava dados (ex.: registrar_horas) e
+                roda mesmo que o executor seja encerrado antes dela
+
+        Returns:
+            Future: O da nova tarefa ou o da tarefa igual ainda pendente
+        """
+        if chave is None:
+            self._sem_chave += 1
+            chave = ("sem_chave", self._sem_chave)
+        elif chave in self._pendentes:
+            return self._pendentes[chave][0]
+
+        future = self._executor.submit(funcao, *args, **kwargs)
+        self._pendentes[chave] = (future, descricao_tarefa, ao_concluir, ao_falhar)
+        if not gravacao:
+            self._consultas.add(future)
+            future.add_done_callback(self._consultas.discard)
+        if not self._verificando:
+            self._verificando = True
+            self._verificar()
+        return future
+
+    @property
+    def ocupado(self) -> bool:
+        """Há tarefas na fila ou em execução"""
+        return bool(self._pendentes)
+
+    def _verificar(self):
+        """Entrega os resultados prontos e reagenda a si mesmo enquanto houver pendências"""
+        try:
+            for chave, (future, _, ao_concluir, ao_falhar) in list(self._pendentes.items()):
+                if not future.done():
+                    continue
+                del self._pendentes[chave]
+                try:
+                    resultado = future.result()
+                except CancelledError:
+                    continue
+                except Exception as e:
+                    self._chamar(ao_falhar, e)
+                    continue
+                self._chamar(ao_concluir, resultado)
+
+            try:
+                self._atualizar_progresso()
+            except Exception:
+                _log.exception("Erro ao atualizar o indicador de progresso")
+        finally:
+            # Um erro aqui não pode deixar as tarefas seguintes sem entrega
+            if self._pendentes:
+                self.raiz.after(self.intervalo_ms, self._verificar)
+            else:
+                self._verificando = False
+
+    @staticmethod
+    def _chamar(callback, valor):
+        """Chama ao_concluir/ao_falhar; um erro nele é registrado e não interrompe as demais entregas"""
+        if callback is None:
+            return
+        try:
+            callback(valor)
+        except Exception:
+            _log.exception("Erro no retorno de uma tarefa da interface")
+
+    def _atualizar_progresso(self):
+        if self.rotulo_progresso is None:
+            return
+        if not self._pendentes:
+            self.rotulo_progresso.configure(text="")
+            return
+        self._quadro = (self._quadro + 1) % len(QUADROS_ESPERA)
+        descricao = next(iter(self._pendentes.values()))[1]
+        extras = f" (+{len(self._pendentes) - 1})" if len(self._pendentes) > 1 else ""
+        self.rotulo_progresso.configure(text=f"{QUADROS_ESPERA[self._quadro]} {descricao}...{extras}")
+
+    def encerrar(self, esperar: bool = True):
+        """
+        Cancela as consultas que ainda estão na fila e conclui as gravações
+
+        As gravações na fila rodam mesmo assim, para que nenhum ponto pedido
+        antes de fechar a janela se perca; os retornos não são mais entregues.
+
+        Args:
+            esperar (bool): Aguarda a tarefa em execução e as gravações da fila
+        """
+        for future in list(self._consultas):
+            future.cancel()
+        self._executor.shutdown(wait=esperar)
+        self._pendentes.clear()
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+from central_horas import CentralHorasEstagio
+from central_horas_sqlite import CentralHorasSQLite
+
+# Os módulos ficam na raiz do repositório, sem pacote instalável; de
+# benchmarks/ vem o gerador de dados sintéticos
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(1, os.path.join(RAIZ, "benchmarks"))
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    """Caminho de um arquivo de dados ainda inexistente, em diretório temporário"""
+    return str(tmp_path / "horas_estagio.json")
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def criar(request, tmp_path):
+    """Fábrica de centrais do backend do parâmetro, todas sobre o mesmo arquivo"""
+    centrais = []
+
+    def criar(**opcoes):
+        if request.param == "json":
+            central = CentralHorasEstagio(str(tmp_path / "horas.json"), **opcoes)
+        else:
+            central = CentralHorasSQLite(str(tmp_path / "horas.db"), **opcoes)
+        centrais.append(central)
+        return central
+
+    yield criar
+    for central in centrais:
+        central.fechar()
@@ -0,0 +1,81 @@
+from datetime import date
+
+import pytest
+
+from central_horas import CentralHorasEstagio
+from central_horas_sqlite import CentralHorasSQLite
+
+
+def test_registro_de_usuario_desconhecido_ou_inativo_e_rejeitado(criar):
+    central = criar()
+    central.desativar_usuario("Caio")
+    for nome in ("Ninguém", "Caio"):
+        with pytest.raises(ValueError):
+            central.registrar_minutos(nome, "01/03/2024", 60)
+        with pytest.raises(ValueError):
+            central.adicionar_minutos_passados(nome, "01/03/2024", 60)
+        with pytest.raises(ValueError):
+            central.registrar_lote([{"nome": nome, "data": "01/03/2024", "minutos": 60}])
+    assert "Ninguém" not in [usuario["nome"] for usuario in central.listar_usuarios(incluir_inativos=True)]
+    assert central.calcular_minutos_totais(3, 2024) == 0
+
+
+def test_consultas_de_usuario_inativo(criar):
+    central = criar()
+    central.registrar_minutos("Caio", "01/03/2024", 60)
+    central.adicionar_registro_manual("Caio", "05/03/2024", "08:00", "09:30")
+    central.desativar_usuario("Caio")
+
+    assert [reg["minutos"] for reg in central.get_registros_usuario("Caio")] == [60, 90]
+    assert [reg["minutos"] for reg in central.iterar_registros("Caio")] == [60, 90]
+    assert [reg["data"] for reg in central.registros_periodo("Caio", "01/03/2024", date(2024, 3, 31))] == \
+        ["01/03/2024", "05/03/2024"]
+    assert central.minutos_periodo("Caio", "02/03/2024", "31/03/2024") == 90
+    assert central.calcular_minutos_dia("Caio", "05/03/2024") == 90
+
+
+def test_consultas_de_usuario_desconhecido(criar):
+    central = criar()
+    for consulta in (lambda: central.get_registros_usuario("Ninguém"),
+                     lambda: central.iterar_registros("Ninguém"),
+                     lambda: central.registros_periodo("Ninguém", "01/03/2024", "31/03/2024"),
+                     lambda: central.minutos_periodo("Ninguém", "01/03/2024", "31/03/2024"),
+                     lambda: central.calcular_minutos_dia("Ninguém", "01/03/2024")):
+        with pytest.raises(ValueError):
+            consulta()
+
+
+def test_data_invalida_no_dia_nao_tem_minutos(criar):
+    central = criar()
+    central.registrar_minutos("Caio", "01/03/2024", 60)
+    assert central.calcular_minutos_dia("Caio", "31/02/2024") == 0
+    assert central.calcular_minutos_dia("Caio", "2024-03-01") == 0
+
+
+def test_backends_dao_os_mesmos_resultados(tmp_path):
+    json_ = CentralHorasEstagio(str(tmp_path / "horas.json"))
+    sqlite = CentralHorasSQLite(str(tmp_path / "horas.db"))
+    for central in (json_, sqlite):
+        central.cadastrar_usuario("Ana")
+        central.registrar_lote([
+            {"nome": "Ana", "data": "31/12/2023", "minutos": 45},
+            {"nome": "Caio", "data": "02/01/2024", "entrada": "08:00", "saida": "12:00", "descricao": "x"},
+            {"nome": "Ana", "data": "15/01/2024", "minutos": 30},
+            {"nome": "Márcio", "data": "15/02/2024", "minutos": 75},
+        ])
+        central.renomear_usuario("Márcio", "Marcio")
+        central.desativar_usuario("Ana")
+
+    def resumo(central):
+        return (
+            central.listar_usuarios(incluir_inativos=True),
+            central.gerar_relatorio_mensal(1, 2024),
+            central.gerar_relatorio_anual(2024),
+            central.gerar_relatorio_periodo(2023, 2024),
+            [(reg["data"], reg["minutos"]) for reg in central.get_registros_usuario("Ana")],
+            central.calcular_minutos_mes("Marcio", 2, 2024),
+            central.calcular_minutos_totais(ano=2024),
+        )
+
+    assert resumo(json_) == resumo(sqlite)
+    sqlite.fechar()
@@ -0,0 +1,57 @@
+from cache_relatorios import CacheRelatorios
+from central_horas import CentralHorasEstagio
+
+
+def _cache(central):
+    return central.stats()["cache_relatorios"]
+
+
+def test_registro_invalida_so_o_mes_e_o_ano_dele(arquivo):
+    central = CentralHorasEstagio(arquivo)
+    central.adicionar_minutos_passados("Caio", "10/03/2024", 60)
+    central.adicionar_minutos_passados("Caio", "10/04/2024", 30)
+    central.gerar_relatorio_mensal(3, 2024)
+    central.gerar_relatorio_mensal(4, 2024)
+    central.gerar_relatorio_anual(2024)
+    central.gerar_relatorio_anual(2023)
+
+    central.adicionar_minutos_passados("Caio", "11/03/2024", 15)
+    antes = _cache(central)
+    assert central.gerar_relatorio_mensal(4, 2024)["total_minutos"] == 30
+    assert central.gerar_relatorio_anual(2023)["total_minutos"] == 0
+    assert _cache(central)["acertos"] == antes["acertos"] + 2
+    assert central.gerar_relatorio_mensal(3, 2024)["total_minutos"] == 75
+    assert central.gerar_relatorio_anual(2024)["total_minutos"] == 105
+    assert _cache(central)["faltas"] == antes["faltas"] + 2
+
+
+def test_renomear_invalida_todos_os_relatorios(arquivo):
+    central = CentralHorasEstagio(arquivo)
+    central.adicionar_minutos_passados("Caio", "10/03/2024", 60)
+    central.gerar_relatorio_mensal(3, 2024)
+    central.renomear_usuario("Caio", "Caio Souza")
+    assert "Caio Souza" in central.gerar_relatorio_mensal(3, 2024)["usuarios"]
+
+
+def test_relatorio_devolvido_e_uma_copia(arquivo):
+    central = CentralHorasEstagio(arquivo)
+    central.adicionar_minutos_passados("Caio", "10/03/2024", 60)
+    central.gerar_relatorio_anual(2024)["usuarios"]["Caio"]["meses"][3]["minutos"] = 0
+    relatorio = central.gerar_relatorio_anual(2024)
+    assert _cache(central)["acertos"] == 1
+    assert relatorio["usuarios"]["Caio"]["meses"][3]["minutos"] == 60
+
+
+def test_lru_descarta_o_menos_usado():
+    cache = CacheRelatorios(capacidade=2)
+    cache.guardar("a", 1, {"x": 1})
+    cache.guardar("b", 1, {"x": 2})
+    assert cache.obter("a", 1) == {"x": 1}
+    cache.guardar("c", 1, {"x": 3})
+
+    assert cache.obter("b", 1) is None
+    assert cache.obter("a", 1) == {"x": 1}
+    assert cache.obter("a", 2) is None  # versão nova: a entrada velha sai
+    assert cache.obter("a", 1) is None
+    assert cache.estatisticas()["descartes"] == 1
+    assert cache.estatisticas()["entradas"] == 1
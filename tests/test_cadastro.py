@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from cadastro_usuarios import CadastroUsuarios
+from central_horas import CentralHorasEstagio
+
+
+def test_ids_estaveis_e_nomes_validados(criar):
+    central = criar()
+    assert [usuario["id"] for usuario in central.listar_usuarios()] == [1, 2, 3, 4]
+    assert central.cadastrar_usuario("Ana") == 5
+    for nome in ("Ana", "", "  ", " Bia"):
+        with pytest.raises(ValueError):
+            central.cadastrar_usuario(nome)
+
+    central.registrar_minutos("Ana", "01/03/2024", 60)
+    central.renomear_usuario("Ana", "Ana Lima")
+    with pytest.raises(ValueError):
+        central.renomear_usuario("Caio", "Ana Lima")
+    assert {"id": 5, "nome": "Ana Lima", "ativo": True} in central.listar_usuarios()
+    assert central.calcular_minutos_mes("Ana Lima", 3, 2024) == 60
+
+    central.desativar_usuario("Ana Lima")
+    with pytest.raises(ValueError):
+        central.desativar_usuario("Ana Lima")
+    assert "Ana Lima" not in central.usuarios
+    central.reativar_usuario("Ana Lima")
+    assert central.usuarios[-1] == "Ana Lima"
+    # Ids não são reaproveitados
+    assert central.cadastrar_usuario("Bia") == 6
+
+
+def test_cadastro_reaplicado_do_journal(arquivo):
+    central = CentralHorasEstagio(arquivo, journal=True)
+    central.cadastrar_usuario("Ana")
+    central.registrar_minutos("Ana", "01/03/2024", 60)
+    central.renomear_usuario("Samuel", "Samuel Reis")
+    central.desativar_usuario("Robson")
+
+    reaberta = CentralHorasEstagio(arquivo, journal=True)
+    assert reaberta.listar_usuarios(incluir_inativos=True) == central.listar_usuarios(incluir_inativos=True)
+    assert reaberta.usuarios == ["Márcio", "Samuel Reis", "Caio", "Ana"]
+    assert reaberta.calcular_minutos_mes("Ana", 3, 2024) == 60
+
+
+def test_arquivo_antigo_ganha_cadastro(arquivo):
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump({"usuarios": {"Zeca": {"registros": []}, "Caio": {"registros": []}}}, f)
+    central = CentralHorasEstagio(arquivo)
+    assert central.usuarios == ["Márcio", "Samuel", "Caio", "Robson", "Zeca"]
+    assert central.cadastrar_usuario("Ana") == 6
+
+
+def test_milhares_de_usuarios(arquivo):
+    # Com journal, cada cadastro é uma linha anexada e não uma regravação do arquivo
+    central = CentralHorasEstagio(arquivo, journal=True)
+    for numero in range(3000):
+        central.cadastrar_usuario(f"Estagiário {numero:04d}")
+    central.registrar_minutos("Estagiário 2999", "01/03/2024", 30)
+    assert len(central.usuarios) == 3004
+    assert central.gerar_relatorio_mensal(3, 2024)["total_minutos"] == 30
+    assert len(CentralHorasEstagio(arquivo, journal=True).usuarios) == 3004
+
+
+def test_diferencas_levam_ao_outro_cadastro():
+    dados = {"usuarios": {}}
+    CadastroUsuarios.migrar(dados, ("A", "B"))
+    antigo = CadastroUsuarios(json.loads(json.dumps(dados["cadastro"])))
+    novo = CadastroUsuarios(dados["cadastro"])
+    for operacao, nome, novo_nome in (("cadastrar", "C", None), ("renomear", "A", "A2"), ("desativar", "B", None)):
+        novo.aplicar(novo.preparar(operacao, nome, novo_nome))
+
+    for entrada in antigo.diferencas(dados["cadastro"]):
+        antigo.aplicar(entrada)
+    assert antigo.listar(incluir_inativos=True) == novo.listar(incluir_inativos=True)
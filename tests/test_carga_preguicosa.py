@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+from central_horas import CentralHorasEstagio
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANO = datetime.now().year
+
+
+def test_importar_o_modulo_nao_toca_em_arquivos(tmp_path):
+    codigo = ("import central_horas, os; assert os.listdir('.') == [];"
+              "assert central_horas.central_horas is central_horas.obter_central_padrao();"
+              "assert os.listdir('.') == []")
+    subprocess.run([sys.executable, "-c", codigo], cwd=tmp_path, check=True,
+                   env={**os.environ, "PYTHONPATH": RAIZ, "PYTHONDONTWRITEBYTECODE": "1"})
+
+
+def test_arquivo_so_e_lido_no_primeiro_acesso(arquivo):
+    with open(arquivo, "w", encoding="utf-8") as f:
+        f.write("{ corrompido")
+    central = CentralHorasEstagio(arquivo)
+    assert central.stats()["carregado"] is False
+    with pytest.raises(ValueError):
+        central.calcular_minutos_mes("Caio", 3, 2024)
+
+
+def test_carga_do_ano_atual_completa_quando_preciso(arquivo):
+    central = CentralHorasEstagio(arquivo)
+    central.adicionar_minutos_passados("Caio", "01/03/2020", 60)
+    central.adicionar_minutos_passados("Caio", f"01/01/{ANO}", 30)
+
+    parcial = CentralHorasEstagio(arquivo, carregar_apenas_ano_atual=True)
+    assert parcial.calcular_minutos_ano("Caio", ANO) == 30
+    assert parcial.stats()["registros"]["total"] == 1
+    assert parcial.calcular_minutos_ano("Caio", 2020) == 60
+    assert parcial.stats()["registros"]["total"] == 2
+
+    # Gravar depois de uma carga parcial não perde os outros anos
+    parcial = CentralHorasEstagio(arquivo, carregar_apenas_ano_atual=True)
+    parcial.adicionar_minutos_passados("Caio", f"02/01/{ANO}", 15)
+    assert CentralHorasEstagio(arquivo).calcular_minutos_ano("Caio", 2020) == 60
+    assert CentralHorasEstagio(arquivo).calcular_minutos_ano("Caio", ANO) == 45
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import cli_horas
+from central_horas import CentralHorasEstagio, criar_central
+from persistencia import ArquivoEmUso
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cli_horas.py")
+
+
+def test_cli_recusa_arquivo_aberto_por_outra_central(arquivo, capsys):
+    # Como a interface gráfica, que mantém a central aberta com exclusivo
+    janela = CentralHorasEstagio(arquivo, journal=True, particionar_por_ano=True, exclusivo=True)
+    janela.adicionar_minutos_passados("Caio", "01/03/2024", 60)
+
+    assert cli_horas.main(["--arquivo", arquivo, "minutos", "Caio", "02/03/2024", "30"]) == 1
+    assert "aberto em outro processo" in capsys.readouterr().err
+    with pytest.raises(ArquivoEmUso):
+        CentralHorasEstagio(arquivo, exclusivo=True)
+
+    janela.fechar()
+    assert cli_horas.main(["--arquivo", arquivo, "minutos", "Caio", "02/03/2024", "30"]) == 0
+    assert criar_central(arquivo, journal=True).calcular_minutos_mes("Caio", 3, 2024) == 90
+
+
+def test_exclusivo_nao_combina_com_multiprocesso(arquivo):
+    with pytest.raises(ValueError):
+        CentralHorasEstagio(arquivo, exclusivo=True, multiprocesso=True)
+
+
+def test_cli_saida_fechada_sem_traceback(arquivo):
+    # Como em `relatorio-anual | head`: o leitor fecha a saída antes da escrita
+    processo = subprocess.Popen([sys.executable, CLI, "--arquivo", arquivo, "relatorio-anual"],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    processo.stdout.close()
+    erros = processo.stderr.read().decode()
+    processo.stderr.close()
+
+    assert processo.wait() == 1
+    assert "Traceback" not in erros
+
+
+def test_cli_juntar_particoes(arquivo, capsys):
+    central = CentralHorasEstagio(arquivo, journal=True, particionar_por_ano=True)
+    central.adicionar_minutos_passados("Caio", "01/03/2023", 60)
+    central.adicionar_minutos_passados("Caio", "01/03/2024", 30)
+    central.salvar_dados()
+    central.fechar()
+
+    assert cli_horas.main(["--arquivo", arquivo, "juntar-particoes"]) == 0
+    assert "2 partições" in capsys.readouterr().out
+    central = CentralHorasEstagio(arquivo, journal=True)
+    assert central.calcular_minutos_ano("Caio", 2023) + central.calcular_minutos_ano("Caio", 2024) == 90
+    central.fechar()
+
+    # Já é um arquivo só
+    assert cli_horas.main(["--arquivo", arquivo, "juntar-particoes"]) == 1
+    assert "erro:" in capsys.readouterr().err
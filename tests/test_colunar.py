@@ -0,0 +1,66 @@
+import json
+
+import gerador
+from armazem_colunar import RegistrosColunares
+from central_horas import CentralHorasEstagio, _somar_meses
+
+
+def _dados():
+    dados = gerador.gerar_dados(usuarios=3, anos=2, ano_final=2024, semente=11, fracao_legado=0.2)
+    registros = next(iter(dados["usuarios"].values()))["registros"]
+    # Registros que não cabem nas colunas e ficam guardados como dict
+    registros.append({"data": "1/3/2024", "minutos": 15, "horas": 0.25, "descricao": "sem zeros",
+                      "timestamp": "2024-03-01T10:00:00"})
+    registros.append({"data": "02/03/2024", "minutos": 20, "horas": 0.33, "descricao": "extra",
+                      "timestamp": "2024-03-02T10:00:00", "origem": "importado"})
+    registros.append({"data": "03/03/2024", "minutos": 240, "horas": 4.0, "descricao": "turno",
+                      "timestamp": "2024-03-03T12:00:00", "entrada": "08:00", "saida": "12:00"})
+    return dados
+
+
+def _sem_timestamp(registro):
+    # Os registros incluídos nas duas centrais recebem horários diferentes
+    return {chave: valor for chave, valor in registro.items() if chave != "timestamp"}
+
+
+def test_colunas_voltam_aos_mesmos_dicts():
+    for usuario in _dados()["usuarios"].values():
+        colunares = RegistrosColunares(usuario["registros"])
+        assert colunares.para_dicts() == usuario["registros"]
+        assert [dict(registro.items()) for registro in colunares] == usuario["registros"]
+        assert colunares.somar_meses(2023, 2024) == _somar_meses(usuario["registros"], 2023, 2024)
+
+
+def test_central_compacta_igual_a_de_dicts(tmp_path):
+    centrais = []
+    for compacto in (False, True):
+        arquivo = str(tmp_path / f"horas_{compacto}.json")
+        gerador.gravar_dados(arquivo, _dados())
+        central = CentralHorasEstagio(arquivo, compacto=compacto)
+        central.adicionar_minutos_passados(central.usuarios[0], "04/03/2024", 45, "novo")
+        central.adicionar_registro_manual(central.usuarios[1], "05/03/2024", "13:00", "17:30")
+        centrais.append(central)
+
+    def resumo(central):
+        nomes = central.usuarios
+        return (
+            [list(map(_sem_timestamp, central.get_registros_usuario(nome))) for nome in nomes],
+            [list(map(_sem_timestamp, central.registros_periodo(nome, "01/02/2024", "10/03/2024")))
+             for nome in nomes],
+            [central.minutos_periodo(nome, "15/06/2023", "03/03/2024") for nome in nomes],
+            [central.calcular_minutos_dia(nome, "03/03/2024") for nome in nomes],
+            central.gerar_relatorio_anual(2024),
+            central.gerar_relatorio_periodo(2023, 2024),
+        )
+
+    dicts, compacta = centrais
+    assert resumo(dicts) == resumo(compacta)
+
+    for central in centrais:
+        central.salvar_dados()
+    gravados = []
+    for central in centrais:
+        with open(central.arquivo_dados, encoding="utf-8") as f:
+            usuarios = json.load(f)["usuarios"]
+        gravados.append({nome: list(map(_sem_timestamp, usuario["registros"])) for nome, usuario in usuarios.items()})
+    assert gravados[0] == gravados[1]
@@ -0,0 +1,21 @@
+import gc
+import weakref
+
+from central_horas import CentralHorasEstagio
+
+
+def test_escrita_assincrona_grava_ao_fechar(arquivo):
+    central = CentralHorasEstagio(arquivo, escrita_assincrona=True, intervalo_escrita=10)
+    central.adicionar_minutos_passados("Robson", "07/05/2024", 80)
+    central.fechar()
+    assert CentralHorasEstagio(arquivo).calcular_minutos_dia("Robson", "07/05/2024") == 80
+
+
+def test_fechar_libera_a_central(arquivo):
+    central = CentralHorasEstagio(arquivo, escrita_assincrona=True)
+    central.adicionar_minutos_passados("Robson", "07/05/2024", 80)
+    central.fechar()
+    referencia = weakref.ref(central)
+    del central
+    gc.collect()
+    assert referencia() is None
@@ -0,0 +1,36 @@
+import csv
+import io
+import json
+
+import exportacao
+from central_horas import CentralHorasEstagio
+
+
+def _central_com_legado(arquivo):
+    dados = {"usuarios": {"Márcio": {"registros": [
+        {"data": "02/01/2024", "horas": 2},
+        {"data": "03/01/2024", "horas": 1.5},
+        {"data": "04/01/2024", "minutos": 75, "horas": 1.25, "entrada": "08:00", "saida": "09:15"},
+    ]}}}
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(dados, f)
+    return CentralHorasEstagio(arquivo)
+
+
+def test_horas_inteiras_saem_com_separador_e_duas_casas(arquivo):
+    saida = io.StringIO()
+    exportacao.exportar_registros(_central_com_legado(arquivo), saida, usuarios=["Márcio"],
+                                  **exportacao.OPCOES_CSV_BR)
+    linhas = list(csv.DictReader(io.StringIO(saida.getvalue()), delimiter=";"))
+    assert [linha["horas"] for linha in linhas] == ["2,00", "1,50", "1,25"]
+    assert [linha["minutos"] for linha in linhas] == ["120", "90", "75"]
+
+
+def test_relatorio_mensal_csv(arquivo):
+    saida = io.StringIO()
+    total = exportacao.exportar_relatorio_mensal(_central_com_legado(arquivo), saida, 1, 2024,
+                                                 separador_decimal=",")
+    linhas = {linha["usuario"]: linha for linha in csv.DictReader(io.StringIO(saida.getvalue()))}
+    assert total == len(linhas)
+    assert linhas["Márcio"]["horas"] == "4,75"
+    assert linhas["Caio"]["horas"] == "0,00"
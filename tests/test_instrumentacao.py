@@ -0,0 +1,64 @@
+import io
+import json
+
+from central_horas import CentralHorasEstagio
+from instrumentacao import Instrumentacao, _percentil, perfilar
+
+
+def test_desligada_nao_embrulha_nada(arquivo):
+    central = CentralHorasEstagio(arquivo)
+    assert "calcular_minutos_mes" not in vars(central)
+    estatisticas = central.stats()
+    assert estatisticas["instrumentacao"] is False
+    assert "metodos" not in estatisticas
+
+
+def test_conta_chamadas_e_latencias(criar):
+    central = criar(instrumentar=True)
+    central.registrar_minutos("Caio", "01/03/2024", 60)
+    for _ in range(3):
+        central.calcular_minutos_mes("Caio", 3, 2024)
+
+    estatisticas = central.stats()
+    assert estatisticas["instrumentacao"] is True
+    assert estatisticas["registros"]["por_usuario"]["Caio"] == 1
+    metodo = estatisticas["metodos"]["calcular_minutos_mes"]
+    assert metodo["chamadas"] == 3
+    assert 0 <= metodo["p50_ms"] <= metodo["p99_ms"] <= metodo["total_ms"]
+
+
+def test_bytes_do_journal_e_do_arquivo(arquivo):
+    central = CentralHorasEstagio(arquivo, journal=True, instrumentar=True)
+    central.registrar_minutos("Caio", "01/03/2024", 60)
+    central.registrar_minutos("Caio", "02/03/2024", 60)
+    central.salvar_dados()
+    gravados = central.stats()["bytes_gravados"]
+    assert gravados["journal"]["gravacoes"] == 2
+    assert gravados["salvar_dados"]["ultima"] > 0
+
+
+def test_despejo_grava_o_stats_ao_parar(arquivo, tmp_path):
+    destino = tmp_path / "estatisticas.json"
+    central = CentralHorasEstagio(arquivo, instrumentar=True, arquivo_estatisticas=str(destino),
+                                  intervalo_estatisticas=3600)
+    central.calcular_minutos_mes("Caio", 3, 2024)
+    central.fechar()
+    assert json.loads(destino.read_text(encoding="utf-8"))["metodos"]["calcular_minutos_mes"]["chamadas"] == 1
+
+
+def test_percentis_e_amostra_limitada():
+    instrumentacao = Instrumentacao(tamanho_amostra=100)
+    for milissegundos in range(1, 201):
+        instrumentacao.registrar_tempo("x", milissegundos / 1000)
+    metodo = instrumentacao.estatisticas()["metodos"]["x"]
+    # Percentis sobre as 100 últimas amostras; contagem e total sobre todas
+    assert metodo["chamadas"] == 200
+    assert round(metodo["p50_ms"]) == 150 and round(metodo["p99_ms"]) == 199
+    assert _percentil([], 0.5) == 0.0
+
+
+def test_perfilar_escreve_o_relatorio():
+    saida = io.StringIO()
+    with perfilar(saida, limite=5):
+        sorted(range(1000), reverse=True)
+    assert "function calls" in saida.getvalue()
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+import persistencia
+from central_horas import CentralHorasEstagio
+from persistencia import ArquivoEmUso, Journal, caminho_journal
+
+
+def test_journal_descarta_linha_incompleta(tmp_path):
+    journal = Journal(str(tmp_path / "dados.journal"))
+    journal.anexar([{"seq": 1, "valor": "a"}, {"seq": 2, "valor": "b"}])
+    with open(journal.caminho, "ab") as f:
+        f.write(b'{"seq": 3, "val')
+
+    assert [entrada["seq"] for entrada in journal.ler()] == [1, 2]
+    # A linha incompleta sai do arquivo e a próxima anexação começa em linha nova
+    journal.anexar([{"seq": 3, "valor": "c"}])
+    assert [entrada["seq"] for entrada in journal.ler()] == [1, 2, 3]
+
+
+def test_reabrir_depois_de_escrita_interrompida(arquivo):
+    central = CentralHorasEstagio(arquivo, journal=True)
+    central.adicionar_minutos_passados("Márcio", "01/03/2024", 90)
+    central.adicionar_minutos_passados("Caio", "02/03/2024", 30)
+    central.fechar()
+    assert os.path.exists(caminho_journal(arquivo))
+
+    # Crash no meio da anexação do terceiro registro
+    with open(caminho_journal(arquivo), "ab") as f:
+        f.write(json.dumps({"seq": 99, "usuario": "Samuel", "registro": {}}).encode()[:20])
+
+    reaberta = CentralHorasEstagio(arquivo, journal=True)
+    assert reaberta.calcular_minutos_mes("Márcio", 3, 2024) == 90
+    assert reaberta.calcular_minutos_mes("Caio", 3, 2024) == 30
+    assert reaberta.calcular_minutos_mes("Samuel", 3, 2024) == 0
+
+    reaberta.adicionar_minutos_passados("Samuel", "03/03/2024", 45)
+    reaberta.fechar()
+    assert CentralHorasEstagio(arquivo, journal=True).calcular_minutos_mes("Samuel", 3, 2024) == 45
+
+
+def test_escrita_que_falha_nao_deixa_linha_incompleta(tmp_path, monkeypatch):
+    journal = Journal(str(tmp_path / "dados.journal"))
+    journal.anexar([{"seq": 1}])
+
+    def sem_espaco(fd):
+        raise OSError(28, "No space left on device")
+
+    # O processo continua vivo depois da falha (ENOSPC no fsync)
+    monkeypatch.setattr(persistencia.os, "fsync", sem_espaco)
+    with pytest.raises(OSError):
+        journal.anexar([{"seq": 2, "valor": "x" * 100}])
+    monkeypatch.undo()
+
+    journal.anexar([{"seq": 3}])
+    assert [entrada["seq"] for entrada in journal.ler()] == [1, 3]
+
+
+def test_anexar_corta_linha_incompleta_de_outro_processo(tmp_path):
+    journal = Journal(str(tmp_path / "dados.journal"))
+    journal.anexar([{"seq": 1}])
+    with open(journal.caminho, "ab") as f:
+        f.write(b'{"seq": 2, "val')
+
+    journal.anexar([{"seq": 3}])
+    assert [entrada["seq"] for entrada in journal.ler()] == [1, 3]
+    assert journal.tamanho() == os.path.getsize(journal.caminho)
+
+
+def test_fechar_libera_reserva_mesmo_com_erro_de_gravacao(arquivo):
+    central = CentralHorasEstagio(arquivo, escrita_assincrona=True, intervalo_escrita=0, exclusivo=True)
+
+    def falhar():
+        raise OSError("disco cheio")
+
+    central._gravador._gravar = falhar
+    central.adicionar_minutos_passados("Caio", "01/03/2024", 60)
+    with pytest.raises(OSError):
+        central.fechar()
+
+    try:
+        CentralHorasEstagio(arquivo, exclusivo=True).fechar()
+    except ArquivoEmUso:
+        pytest.fail("a reserva continuou com a central que falhou ao fechar")
@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from central_horas import CentralHorasEstagio, ErroLote
+from central_horas_sqlite import CentralHorasSQLite
+from persistencia import caminho_journal
+
+ITENS = [
+    {"nome": "Márcio", "data": "01/04/2024", "minutos": 60},
+    {"nome": "Caio", "data": "01/04/2024", "entrada": "08:00", "saida": "09:30"},
+    {"nome": "Márcio", "data": "02/04/2024", "minutos": 45, "descricao": "estudo"},
+]
+
+
+def test_lote_invalido_nao_grava_nada(arquivo):
+    central = CentralHorasEstagio(arquivo, journal=True)
+    with pytest.raises(ErroLote) as erro:
+        central.registrar_lote(ITENS + [{"nome": "Ninguém", "data": "01/04/2024", "minutos": 10},
+                                        {"nome": "Caio", "data": "31/02/2024", "minutos": 10}])
+    assert [linha for linha, _ in erro.value.erros] == [4, 5]
+    assert central.calcular_minutos_mes("Márcio", 4, 2024) == 0
+    assert not os.path.exists(caminho_journal(arquivo))
+
+
+def test_lote_interrompido_no_journal_nao_e_aplicado_pela_metade(arquivo):
+    central = CentralHorasEstagio(arquivo, journal=True)
+    central.adicionar_minutos_passados("Samuel", "29/03/2024", 30)
+    central.registrar_lote(ITENS)
+    central.fechar()
+
+    # Crash durante a escrita do lote: só o começo da linha chegou ao disco
+    with open(caminho_journal(arquivo), "rb") as f:
+        linhas = f.readlines()
+    assert len(linhas) == 2
+    with open(caminho_journal(arquivo), "wb") as f:
+        f.write(linhas[0] + linhas[1][:len(linhas[1]) * 2 // 3])
+
+    reaberta = CentralHorasEstagio(arquivo, journal=True)
+    assert reaberta.calcular_minutos_mes("Samuel", 3, 2024) == 30
+    assert reaberta.calcular_minutos_mes("Márcio", 4, 2024) == 0
+    assert reaberta.calcular_minutos_mes("Caio", 4, 2024) == 0
+
+
+def test_lote_completo_e_reaplicado_do_journal(arquivo):
+    central = CentralHorasEstagio(arquivo, journal=True)
+    central.registrar_lote(ITENS)
+    central.fechar()
+
+    reaberta = CentralHorasEstagio(arquivo, journal=True)
+    assert reaberta.calcular_minutos_mes("Márcio", 4, 2024) == 105
+    assert reaberta.calcular_minutos_mes("Caio", 4, 2024) == 90
+    assert [reg["minutos"] for reg in reaberta.get_registros_usuario("Márcio")] == [60, 45]
+
+
+def test_sqlite_grava_lote_na_ordem_dos_itens(tmp_path):
+    central = CentralHorasSQLite(str(tmp_path / "horas.db"))
+    itens = [{"nome": nome, "data": f"{dia:02d}/04/2024", "minutos": dia}
+             for dia, nome in enumerate(["Márcio", "Caio", "Márcio", "Samuel", "Caio", "Márcio"], 1)]
+    registros = central.registrar_lote(itens)
+
+    assert [reg["minutos"] for reg in registros] == [item["minutos"] for item in itens]
+    assert [reg["minutos"] for reg in central.get_registros_usuario("Márcio")] == [1, 3, 6]
+    assert [reg["minutos"] for reg in central.get_registros_usuario("Caio")] == [2, 5]
+    central.fechar()
+
+
+def test_importacao_aponta_linha_jsonl_malformada(arquivo, tmp_path):
+    origem = tmp_path / "itens.jsonl"
+    linhas = [json.dumps(item, ensure_ascii=False) for item in ITENS]
+    linhas.insert(1, '{"nome": "Caio", "data": ')
+    origem.write_text("\n".join(linhas) + "\n", encoding="utf-8")
+
+    central = CentralHorasEstagio(arquivo)
+    with pytest.raises(ErroLote) as erro:
+        central.importar_registros(str(origem))
+    (linha, mensagem), = erro.value.erros
+    assert linha == 2 and "JSON inválido" in mensagem
+    assert central.calcular_minutos_mes("Márcio", 4, 2024) == 0
@@ -0,0 +1,61 @@
+import multiprocessing
+from collections import Counter
+
+from central_horas import CentralHorasEstagio
+from stress_multiprocesso import USUARIOS, bater_pontos
+
+
+def _descricoes(central):
+    return Counter(
+        registro["descricao"]
+        for usuario in central.dados["usuarios"].values()
+        for registro in usuario["registros"]
+    )
+
+
+def test_centrais_intercaladas_veem_os_registros_uma_da_outra(arquivo):
+    # Journal pequeno: as duas compactam o arquivo várias vezes no meio do caminho
+    a = CentralHorasEstagio(arquivo, multiprocesso=True, limite_journal=512)
+    b = CentralHorasEstagio(arquivo, multiprocesso=True, limite_journal=512, compacto=True)
+    a.cadastrar_usuario("Ana")
+    for numero in range(60):
+        central, nome = (a, "a") if numero % 2 == 0 else (b, "b")
+        central.registrar_minutos("Ana" if numero % 3 == 0 else "Caio", f"{numero % 28 + 1:02d}/05/2025", 10,
+                                  f"{nome}{numero}")
+        if numero % 7 == 0:
+            central.registrar_lote([{"nome": "Caio", "data": "01/06/2025", "minutos": 5,
+                                     "descricao": f"{nome}{numero}-lote"}])
+
+    for central in (a, b):
+        central.sincronizar()
+        assert central.calcular_minutos_mes("Ana", 5, 2025) == 20 * 10
+        assert central.calcular_minutos_totais(6, 2025) == 9 * 5
+        assert central.verificar_consistencia() == []
+    assert _descricoes(a) == _descricoes(b)
+    assert set(_descricoes(a).values()) == {1}
+    a.fechar()
+    b.fechar()
+
+
+def test_processos_gravando_juntos_nao_perdem_nem_duplicam(arquivo):
+    processos, registros = 3, 40
+    contexto = multiprocessing.get_context("spawn")
+    largada = contexto.Event()
+    filhos = [contexto.Process(target=bater_pontos, args=(arquivo, numero, registros, 2048, largada))
+              for numero in range(processos)]
+    # A primeira central cria o arquivo antes dos processos disputarem a criação
+    CentralHorasEstagio(arquivo, multiprocesso=True).fechar()
+    for filho in filhos:
+        filho.start()
+    largada.set()
+    for filho in filhos:
+        filho.join(timeout=120)
+    assert [filho.exitcode for filho in filhos] == [0] * processos
+
+    central = CentralHorasEstagio(arquivo, multiprocesso=True)
+    assert _descricoes(central) == Counter(
+        f"p{processo}-{numero}" for processo in range(processos) for numero in range(registros))
+    assert sum(central.calcular_minutos_totais(mes, 2025) for mes in range(1, 13)) == processos * registros * 15
+    assert central.verificar_consistencia() == []
+    assert set(USUARIOS) <= set(central.usuarios)
+    central.fechar()
@@ -0,0 +1,108 @@
+import os
+import shutil
+from datetime import datetime
+
+import pytest
+
+import central_horas
+from central_horas import CentralHorasEstagio
+from particoes_anuais import eh_manifesto
+from persistencia import caminho_journal
+
+ANO = datetime.now().year
+
+
+def abrir(arquivo):
+    return CentralHorasEstagio(arquivo, journal=True, particionar_por_ano=True, compressao_anos_frios="gzip")
+
+
+def minutos_por_ano(central):
+    return {ano: central.calcular_minutos_ano("Caio", ano) for ano in (2023, 2024, ANO)}
+
+
+def test_journal_ja_gravado_nas_particoes_nao_e_reaplicado(arquivo, tmp_path):
+    central = abrir(arquivo)
+    central.adicionar_minutos_passados("Caio", "01/03/2023", 60)
+    central.adicionar_minutos_passados("Caio", "01/03/2024", 30)
+    central.adicionar_minutos_passados("Caio", f"01/01/{ANO}", 15)
+    copia = str(tmp_path / "journal.copia")
+    shutil.copy(caminho_journal(arquivo), copia)
+    central.salvar_dados()
+    central.fechar()
+
+    # Crash depois das partições e do manifesto, antes de limpar o journal
+    shutil.copy(copia, caminho_journal(arquivo))
+
+    assert minutos_por_ano(abrir(arquivo)) == {2023: 60, 2024: 30, ANO: 15}
+
+
+def test_particao_gravada_antes_da_falha_nao_duplica_o_journal(arquivo, monkeypatch):
+    central = abrir(arquivo)
+    central.adicionar_minutos_passados("Caio", "01/03/2023", 60)
+    central.adicionar_minutos_passados("Caio", "01/03/2024", 30)
+    central.salvar_dados()
+    central.adicionar_minutos_passados("Caio", "02/03/2023", 10)
+    central.adicionar_minutos_passados("Caio", "02/03/2024", 20)
+
+    gravar = central_horas.gravar_particao
+
+    def falhar_em_2024(caminho, *args, **kwargs):
+        if "_2024" in caminho:
+            raise OSError("disco cheio")
+        return gravar(caminho, *args, **kwargs)
+
+    # 2023 é regravada com o journal_seq novo; 2024 e o manifesto ficam os anteriores
+    monkeypatch.setattr(central_horas, "gravar_particao", falhar_em_2024)
+    with pytest.raises(OSError):
+        central.salvar_dados()
+    monkeypatch.undo()
+    central.fechar()
+
+    reaberta = abrir(arquivo)
+    assert minutos_por_ano(reaberta) == {2023: 70, 2024: 50, ANO: 0}
+    # E a próxima gravação deixa tudo nas partições, sem journal
+    reaberta.salvar_dados()
+    reaberta.fechar()
+    assert minutos_por_ano(abrir(arquivo)) == {2023: 70, 2024: 50, ANO: 0}
+
+
+def test_juntar_particoes_volta_a_um_unico_arquivo(arquivo, tmp_path):
+    central = abrir(arquivo)
+    central.adicionar_minutos_passados("Caio", "01/03/2023", 60)
+    central.adicionar_minutos_passados("Caio", "01/03/2024", 30)
+    central.salvar_dados()
+    central.fechar()
+    # Reaberta só com o ano atual em memória e um lançamento ainda no journal
+    central = abrir(arquivo)
+    central.adicionar_minutos_passados("Caio", f"01/01/{ANO}", 15)
+
+    assert central.juntar_particoes() == 2
+    central.fechar()
+    assert not eh_manifesto(arquivo)
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(arquivo)]
+
+    plana = CentralHorasEstagio(arquivo, journal=True)
+    assert minutos_por_ano(plana) == {2023: 60, 2024: 30, ANO: 15}
+    with pytest.raises(ValueError):
+        plana.juntar_particoes()
+
+
+def test_falha_ao_juntar_mantem_as_particoes(arquivo, monkeypatch):
+    central = abrir(arquivo)
+    central.adicionar_minutos_passados("Caio", "01/03/2023", 60)
+    central.adicionar_minutos_passados("Caio", f"01/01/{ANO}", 15)
+    central.salvar_dados()
+
+    def falhar(*args, **kwargs):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(central_horas, "escrever_atomico", falhar)
+    with pytest.raises(OSError):
+        central.juntar_particoes()
+    monkeypatch.undo()
+    assert central.particionar
+    central.adicionar_minutos_passados("Caio", "02/03/2023", 10)
+    central.fechar()
+
+    assert eh_manifesto(arquivo)
+    assert minutos_por_ano(abrir(arquivo)) == {2023: 70, 2024: 0, ANO: 15}
@@ -0,0 +1,73 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from indice_datas import IndiceDatas
+
+INICIO = date(2023, 11, 1)
+
+
+def _dia(registro):
+    return datetime.strptime(registro["data"], "%d/%m/%Y").date()
+
+
+def _forca_bruta(central, inicio, fim):
+    # Ordem de data; no mesmo dia, a de inclusão (sort estável)
+    return sorted((reg for reg in central.get_registros_usuario("Caio") if inicio <= _dia(reg) <= fim), key=_dia)
+
+
+def _descricoes(registros):
+    return [reg["descricao"] for reg in registros]
+
+
+def test_periodo_segue_o_historico_fora_de_ordem(criar):
+    central = criar()
+    aleatorio = random.Random(3)
+    dias = [INICIO + timedelta(days=aleatorio.randrange(120)) for _ in range(150)]
+    central.registrar_lote([{"nome": "Caio", "data": dia.strftime("%d/%m/%Y"), "minutos": 10,
+                             "descricao": f"r{numero}"} for numero, dia in enumerate(dias)])
+
+    periodos = [(date(2023, 12, 1), date(2023, 12, 31)), (INICIO, INICIO), (date(2024, 2, 29), date(2024, 6, 1)),
+                (date(2020, 1, 1), date(2023, 10, 31))]
+    for inicio, fim in periodos:
+        esperados = _forca_bruta(central, inicio, fim)
+        assert _descricoes(central.registros_periodo("Caio", inicio, fim)) == _descricoes(esperados)
+        assert central.minutos_periodo("Caio", inicio.strftime("%d/%m/%Y"), fim) == 10 * len(esperados)
+
+    # Índice já montado: lançamentos retroativos entram na posição certa
+    central.adicionar_minutos_passados("Caio", "15/12/2023", 5, "retroativo")
+    central.adicionar_minutos_passados("Caio", "01/01/2025", 5, "futuro")
+    for inicio, fim in periodos + [(date(2024, 12, 31), date(2025, 1, 1))]:
+        assert _descricoes(central.registros_periodo("Caio", inicio, fim)) == \
+            _descricoes(_forca_bruta(central, inicio, fim))
+
+
+def test_paginas(criar):
+    central = criar()
+    central.registrar_lote([{"nome": "Caio", "data": f"{dia:02d}/03/2024", "minutos": dia, "descricao": str(dia)}
+                            for dia in range(1, 26)])
+    paginas = list(central.paginar_periodo("Caio", "01/03/2024", "31/03/2024", tamanho_pagina=10))
+    assert [len(pagina) for pagina in paginas] == [10, 10, 5]
+    assert [reg["minutos"] for pagina in paginas for reg in pagina] == list(range(1, 26))
+    assert list(central.paginar_periodo("Caio", "01/04/2024", "30/04/2024")) == []
+    with pytest.raises(ValueError):
+        next(central.paginar_periodo("Caio", "01/03/2024", "31/03/2024", tamanho_pagina=0))
+
+
+def test_periodo_invertido_e_rejeitado_na_chamada(criar):
+    central = criar()
+    with pytest.raises(ValueError):
+        central.registros_periodo("Caio", "31/03/2024", "01/03/2024")
+    with pytest.raises(ValueError):
+        central.registros_periodo("Caio", "31/02/2024", "01/03/2024")
+
+
+def test_indice_inserir_mantem_a_ordem():
+    indice = IndiceDatas.construir([5, 3, 5, 1])
+    assert list(indice.posicoes_periodo(3, 5)) == [1, 0, 2]
+    indice.inserir(3, 4)
+    indice.inserir(9, 5)
+    assert list(indice.ordinais) == [1, 3, 3, 5, 5, 9]
+    assert list(indice.posicoes_periodo(2, 4)) == [1, 4]
+    assert len(indice) == 6
@@ -0,0 +1,70 @@
+import random
+from datetime import date
+
+import pytest
+
+from placar import JANELAS, Placar
+
+NOMES = ("Márcio", "Samuel", "Caio", "Robson", "Ana", "Bia")
+
+
+def _totais_forca_bruta(registros, hoje, dias):
+    totais = {}
+    for nome, ordinal, minutos in registros:
+        if hoje - dias < ordinal <= hoje:
+            totais[nome] = totais.get(nome, 0) + minutos
+    return totais
+
+
+def _posicao_forca_bruta(totais, nome):
+    minutos = totais.get(nome, 0)
+    acima = sorted(valor for valor in totais.values() if valor > minutos)
+    return {
+        "posicao": len(acima) + 1,
+        "minutos": minutos,
+        "participantes": len(totais),
+        "minutos_para_subir": acima[0] - minutos + 1 if acima else None,
+    }
+
+
+@pytest.mark.parametrize("semente", range(6))
+def test_placar_igual_a_recontagem_com_viradas_de_dia(semente):
+    aleatorio = random.Random(semente)
+    hoje = [date(2024, 1, 1).toordinal()]
+    placar = Placar(relogio=lambda: date.fromordinal(hoje[0]))
+    registros = []
+
+    for passo in range(400):
+        sorteio = aleatorio.random()
+        if sorteio < 0.6:
+            # Inclui registros de dias passados, de hoje e alguns do futuro próximo
+            registro = (aleatorio.choice(NOMES), hoje[0] + aleatorio.randint(-200, 3), aleatorio.randint(1, 300))
+            registros.append(registro)
+            placar.adicionar(*registro)
+        elif sorteio < 0.95:
+            hoje[0] += aleatorio.choice((1, 1, 1, 2, 6, 31))
+        else:
+            hoje[0] += aleatorio.randint(183, 400)  # Salto maior que todas as janelas
+
+        for janela, dias in JANELAS.items():
+            totais = _totais_forca_bruta(registros, hoje[0], dias)
+            ranking = placar.maiores(janela, len(NOMES))
+            assert sorted(minutos for _, _, minutos in ranking) == sorted(totais.values())
+            assert all(totais[nome] == minutos for _, nome, minutos in ranking)
+            for nome in NOMES:
+                assert placar.posicao(janela, nome) == _posicao_forca_bruta(totais, nome)
+
+
+def test_placar_carregado_igual_ao_incremental():
+    aleatorio = random.Random(99)
+    hoje = date(2024, 6, 30)
+    registros = [(aleatorio.choice(NOMES), hoje.toordinal() - aleatorio.randint(0, 250), aleatorio.randint(1, 300))
+                 for _ in range(500)]
+    carregado = Placar(relogio=lambda: hoje)
+    carregado.carregar(registros)
+    incremental = Placar(relogio=lambda: hoje)
+    for registro in registros:
+        incremental.adicionar(*registro)
+    for janela in JANELAS:
+        for nome in NOMES:
+            assert carregado.posicao(janela, nome) == incremental.posicao(janela, nome)
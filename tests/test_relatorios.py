@@ -0,0 +1,162 @@
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pytest
+
+import central_horas
+import gerador
+from central_horas import CentralHorasEstagio
+from servidor_horas import ServidorHoras
+
+SEMENTES = (1, 2, 3, 5, 8)
+
+
+def relatorio_mensal_original(dados, mes, ano):
+    """gerar_relatorio_mensal antes do índice e dos contadores, com strptime a cada registro"""
+    relatorio = {"mes": mes, "ano": ano, "usuarios": {}, "total_minutos": 0, "total_horas": 0.0}
+    for usuario in dados["usuarios"]:
+        registros_mes = [
+            reg for reg in dados["usuarios"][usuario]["registros"]
+            if datetime.strptime(reg["data"], "%d/%m/%Y").month == mes
+            and datetime.strptime(reg["data"], "%d/%m/%Y").year == ano
+        ]
+        minutos_totais = sum(reg.get("minutos", int(reg["horas"] * 60)) for reg in registros_mes)
+        relatorio["usuarios"][usuario] = {"minutos": minutos_totais, "horas": round(minutos_totais / 60, 2)}
+        relatorio["total_minutos"] += minutos_totais
+        relatorio["total_horas"] = round(relatorio["total_minutos"] / 60, 2)
+    return relatorio
+
+
+def relatorio_anual_original(dados, ano):
+    """gerar_relatorio_anual antes do índice e dos contadores: 1 + 12 passadas por usuário"""
+    relatorio = {
+        "ano": ano,
+        "usuarios": {},
+        "total_minutos": 0,
+        "total_horas": 0.0,
+        "meses": {mes: {"total_minutos": 0, "total_horas": 0.0} for mes in range(1, 13)}
+    }
+    for usuario in dados["usuarios"]:
+        relatorio["usuarios"][usuario] = {
+            "minutos": 0,
+            "horas": 0.0,
+            "meses": {mes: {"minutos": 0, "horas": 0.0} for mes in range(1, 13)}
+        }
+        registros_ano = [
+            reg for reg in dados["usuarios"][usuario]["registros"]
+            if datetime.strptime(reg["data"], "%d/%m/%Y").year == ano
+        ]
+        for mes in range(1, 13):
+            registros_mes = [
+                reg for reg in registros_ano
+                if datetime.strptime(reg["data"], "%d/%m/%Y").month == mes
+            ]
+            minutos_mes = sum(reg.get("minutos", int(reg["horas"] * 60)) for reg in registros_mes)
+            relatorio["usuarios"][usuario]["meses"][mes] = {"minutos": minutos_mes, "horas": round(minutos_mes / 60, 2)}
+            relatorio["usuarios"][usuario]["minutos"] += minutos_mes
+            relatorio["usuarios"][usuario]["horas"] = round(relatorio["usuarios"][usuario]["minutos"] / 60, 2)
+            relatorio["meses"][mes]["total_minutos"] += minutos_mes
+            relatorio["meses"][mes]["total_horas"] = round(relatorio["meses"][mes]["total_minutos"] / 60, 2)
+            relatorio["total_minutos"] += minutos_mes
+            relatorio["total_horas"] = round(relatorio["total_minutos"] / 60, 2)
+    return relatorio
+
+
+def dados_aleatorios(semente):
+    """Três anos de registros fora de ordem, com registros antigos só com "horas" (float e int)"""
+    aleatorio = random.Random(semente)
+    dados = gerador.gerar_dados(usuarios=4, anos=3, ano_final=2024, semente=semente, fracao_legado=0.25)
+    for usuario in dados["usuarios"].values():
+        for _ in range(5):
+            dia = aleatorio.randint(1, 28)
+            usuario["registros"].append({"data": f"{dia:02d}/{aleatorio.randint(1, 12):02d}/2023",
+                                         "horas": aleatorio.randint(1, 8)})
+        aleatorio.shuffle(usuario["registros"])
+    return dados
+
+
+@pytest.fixture(params=[False, True], ids=["dicts", "compacto"])
+def compacto(request):
+    return request.param
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_relatorios_iguais_ao_algoritmo_original(arquivo, semente, compacto):
+    dados = dados_aleatorios(semente)
+    gerador.gravar_dados(arquivo, dados)
+    central = CentralHorasEstagio(arquivo, compacto=compacto, cache_relatorios=0)
+
+    periodo = central.gerar_relatorio_periodo(2021, 2025)
+    for ano in range(2021, 2026):
+        esperado = relatorio_anual_original(dados, ano)
+        assert periodo[ano] == esperado
+        assert central.gerar_relatorio_anual(ano) == esperado
+    for mes in range(1, 13):
+        assert central.gerar_relatorio_mensal(mes, 2023) == relatorio_mensal_original(dados, mes, 2023)
+
+
+def test_relatorio_periodo_em_paralelo_igual_ao_serial(arquivo, compacto, monkeypatch):
+    dados = dados_aleatorios(13)
+    gerador.gravar_dados(arquivo, dados)
+    central = CentralHorasEstagio(arquivo, processos_relatorio=2, compacto=compacto)
+    central.LIMITE_RELATORIO_PARALELO = 0
+    executores = []
+
+    def contar_executores(*args, **kwargs):
+        executores.append(args)
+        return ProcessPoolExecutor(*args, **kwargs)
+
+    monkeypatch.setattr(central_horas, "ProcessPoolExecutor", contar_executores)
+    paralelo = central.gerar_relatorio_periodo(2022, 2024)
+    assert executores
+    assert paralelo == {ano: relatorio_anual_original(dados, ano) for ano in range(2022, 2025)}
+
+
+def test_relatorio_periodo_serial_com_outra_thread_viva(arquivo, monkeypatch):
+    dados = dados_aleatorios(17)
+    gerador.gravar_dados(arquivo, dados)
+    central = CentralHorasEstagio(arquivo, processos_relatorio=2)
+    central.LIMITE_RELATORIO_PARALELO = 0
+
+    def sem_processos(*args, **kwargs):
+        raise AssertionError("fork com outra thread viva")
+
+    monkeypatch.setattr(central_horas, "ProcessPoolExecutor", sem_processos)
+    parar = threading.Event()
+    thread = threading.Thread(target=parar.wait)
+    thread.start()
+    try:
+        relatorios = central.gerar_relatorio_periodo(2022, 2024)
+    finally:
+        parar.set()
+        thread.join()
+    assert relatorios == {ano: relatorio_anual_original(dados, ano) for ano in range(2022, 2025)}
+
+
+def test_processos_relatorio_so_para_uso_em_lote(arquivo, tmp_path, monkeypatch):
+    for opcoes in ({"escrita_assincrona": True},
+                   {"instrumentar": True, "arquivo_estatisticas": str(tmp_path / "estatisticas.json")}):
+        with pytest.raises(ValueError):
+            CentralHorasEstagio(arquivo, processos_relatorio=0, **opcoes)
+    with pytest.raises(ValueError):
+        ServidorHoras(CentralHorasEstagio(arquivo, processos_relatorio=2))
+
+    monkeypatch.setattr(central_horas.multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    with pytest.raises(ValueError):
+        CentralHorasEstagio(arquivo, processos_relatorio=2)
+    assert CentralHorasEstagio(arquivo).processos_relatorio == 1
+
+
+def test_relatorio_acompanha_registros_novos(arquivo):
+    dados = dados_aleatorios(21)
+    gerador.gravar_dados(arquivo, dados)
+    central = CentralHorasEstagio(arquivo)
+    nome = central.usuarios[0]
+    central.gerar_relatorio_anual(2024)
+
+    registro = central.adicionar_minutos_passados(nome, "31/12/2024", 59)
+    dados["usuarios"][nome]["registros"].append(registro)
+    assert central.gerar_relatorio_anual(2024) == relatorio_anual_original(dados, 2024)
+    assert central.gerar_relatorio_periodo(2024, 2024)[2024] == relatorio_anual_original(dados, 2024)
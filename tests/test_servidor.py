@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+
+from central_horas import CentralHorasEstagio
+from cliente_horas import ClienteHoras, ErroServidor
+from servidor_horas import ServidorHoras
+
+
+def _com_servidor(central, cenario):
+    """Sobe o servidor em uma porta livre, roda o cenário (url -> corrotina) e encerra"""
+    async def executar():
+        servidor = ServidorHoras(central, porta=0)
+        await servidor.iniciar()
+        try:
+            return await cenario(f"http://127.0.0.1:{servidor.porta}")
+        finally:
+            await servidor.encerrar()
+    return asyncio.run(executar())
+
+
+def test_consultas_e_gravacoes(arquivo):
+    async def cenario(url):
+        cliente = ClienteHoras(url)
+        await asyncio.to_thread(cliente.adicionar_minutos_passados, "Samuel", "03/06/2024", 120)
+        minutos = await asyncio.to_thread(cliente.calcular_minutos_mes, "Samuel", 6, 2024)
+        relatorio = await asyncio.to_thread(cliente.gerar_relatorio_anual, 2024)
+        with pytest.raises(ErroServidor):
+            await asyncio.to_thread(cliente.calcular_minutos_dia, "Ninguém", "03/06/2024")
+        cliente.fechar()
+        return minutos, relatorio
+
+    minutos, relatorio = _com_servidor(CentralHorasEstagio(arquivo), cenario)
+    assert minutos == 120
+    assert relatorio["usuarios"]["Samuel"]["meses"][6]["minutos"] == 120
+
+
+def test_consulta_lenta_nao_trava_o_laco(arquivo):
+    central = CentralHorasEstagio(arquivo)
+    iniciado, liberar = threading.Event(), threading.Event()
+    relatorio_anual = central.gerar_relatorio_anual
+
+    def relatorio_lento(ano=None):
+        # Só termina depois que outra consulta for respondida
+        iniciado.set()
+        assert liberar.wait(5)
+        return relatorio_anual(ano)
+
+    central.gerar_relatorio_anual = relatorio_lento
+
+    async def cenario(url):
+        lento = asyncio.ensure_future(asyncio.to_thread(ClienteHoras(url).gerar_relatorio_anual, 2024))
+        assert await asyncio.to_thread(iniciado.wait, 5)
+        minutos = await asyncio.to_thread(ClienteHoras(url).calcular_minutos_dia, "Caio", "01/01/2024")
+        liberar.set()
+        return minutos, await lento
+
+    minutos, relatorio = _com_servidor(central, cenario)
+    assert minutos == 0
+    assert relatorio["ano"] == 2024
+
+
+def test_consulta_espera_a_gravacao_em_andamento(arquivo):
+    central = CentralHorasEstagio(arquivo)
+    iniciado, liberar = threading.Event(), threading.Event()
+    adicionar = central.adicionar_minutos_passados
+
+    def adicionar_lento(*args):
+        # Meio da gravação: a consulta não pode ver os dados sendo alterados
+        iniciado.set()
+        assert liberar.wait(5)
+        return adicionar(*args)
+
+    central.adicionar_minutos_passados = adicionar_lento
+
+    async def cenario(url):
+        gravacao = asyncio.ensure_future(
+            asyncio.to_thread(ClienteHoras(url).adicionar_minutos_passados, "Caio", "01/03/2024", 60))
+        assert await asyncio.to_thread(iniciado.wait, 5)
+        consulta = asyncio.ensure_future(asyncio.to_thread(ClienteHoras(url).calcular_minutos_mes, "Caio", 3, 2024))
+        # A consulta fica esperando a gravação terminar
+        await asyncio.sleep(0.2)
+        assert not consulta.done()
+        liberar.set()
+        await gravacao
+        return await consulta
+
+    assert _com_servidor(central, cenario) == 60
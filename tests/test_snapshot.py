@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+import gerador
+from central_horas import CentralHorasEstagio
+from snapshot_binario import binario_para_json, eh_snapshot_binario, json_para_binario
+
+
+def _dados():
+    dados = gerador.gerar_dados(usuarios=3, anos=2, ano_final=2024, semente=5, fracao_legado=0.2)
+    registros = next(iter(dados["usuarios"].values()))["registros"]
+    registros.append({"data": "1/3/2024", "minutos": 15, "horas": 0.25, "descricao": "sem zeros",
+                      "timestamp": "2024-03-01T10:00:00"})
+    registros.append({"data": "03/03/2024", "minutos": 240, "horas": 4.0, "descricao": "turno ção",
+                      "timestamp": "2024-03-03T12:00:00", "entrada": "08:00", "saida": "12:00"})
+    return dados
+
+
+def test_json_binario_json_sem_perdas(tmp_path):
+    original, binario, volta = (str(tmp_path / nome) for nome in ("horas.json", "horas.bin", "volta.json"))
+    gerador.gravar_dados(original, _dados())
+
+    json_para_binario(original, binario)
+    assert eh_snapshot_binario(binario) and not eh_snapshot_binario(original)
+    binario_para_json(binario, volta)
+
+    with open(original, encoding="utf-8") as a, open(volta, encoding="utf-8") as b:
+        assert json.load(a) == json.load(b)
+
+
+@pytest.mark.parametrize("compacto", [False, True], ids=["dicts", "compacto"])
+def test_central_em_snapshot_igual_a_central_em_json(tmp_path, compacto):
+    centrais = []
+    for nome, binario in (("horas.json", False), ("horas.bin", True)):
+        # Diretórios separados: horas.json e horas.bin dividiriam o mesmo journal
+        (tmp_path / nome).mkdir()
+        arquivo = str(tmp_path / nome / nome)
+        gerador.gravar_dados(arquivo, _dados())
+        central = CentralHorasEstagio(arquivo, journal=True, snapshot_binario=binario)
+        central.salvar_dados()
+        # Registros depois da gravação ficam só no journal até a próxima
+        central.adicionar_minutos_passados("Caio", "10/03/2024", 25, "journal")
+        central.fechar()
+        centrais.append(CentralHorasEstagio(arquivo, journal=True, compacto=compacto))
+
+    def resumo(central):
+        return (
+            [[dict(reg.items()) for reg in central.get_registros_usuario(nome)] for nome in central.usuarios],
+            central.listar_usuarios(incluir_inativos=True),
+            central.gerar_relatorio_anual(2024),
+            central.gerar_relatorio_periodo(2023, 2024),
+        )
+
+    json_, binario = centrais
+    assert eh_snapshot_binario(binario.arquivo_dados)
+    # O timestamp do registro do journal é o do momento da inclusão
+    registros_json, *demais_json = resumo(json_)
+    registros_binario, *demais_binario = resumo(binario)
+    assert demais_json == demais_binario
+    for lista in (registros_json, registros_binario):
+        for registro in lista[json_.usuarios.index("Caio")]:
+            if registro.get("descricao") == "journal":
+                del registro["timestamp"]
+    assert registros_json == registros_binario
@@ -0,0 +1,66 @@
+import pytest
+
+import gerador
+from central_horas import CentralHorasEstagio, _minutos_registro, criar_central
+from central_horas_sqlite import CentralHorasSQLite
+
+
+def _conteudo(central):
+    return {
+        usuario["nome"]: (usuario["id"], usuario["ativo"],
+                          [(reg["data"], _minutos_registro(reg), reg.get("entrada")) for reg in
+                           central.get_registros_usuario(usuario["nome"])])
+        for usuario in central.listar_usuarios(incluir_inativos=True)
+    }
+
+
+@pytest.mark.parametrize("formato", [{}, {"snapshot_binario": True},
+                                     {"particionar_por_ano": True, "compressao_anos_frios": "gzip"}])
+def test_importar_json_le_qualquer_formato_e_o_journal(arquivo, tmp_path, formato):
+    origem = CentralHorasEstagio(arquivo, journal=True, **formato)
+    origem.adicionar_minutos_passados("Caio", "01/03/2023", 60)
+    origem.adicionar_registro_manual("Márcio", "02/03/2024", "08:00", "12:00")
+    origem.salvar_dados()
+    # Depois da gravação: ficam só no journal
+    origem.adicionar_minutos_passados("Samuel", "03/03/2024", 15)
+    origem.renomear_usuario("Márcio", "Marcio")
+    origem.desativar_usuario("Caio")
+    origem.fechar()
+
+    banco = CentralHorasSQLite(str(tmp_path / "horas.db"))
+    assert banco.importar_json(arquivo) == 3
+    assert _conteudo(banco) == _conteudo(criar_central(arquivo, journal=True))
+    assert banco.calcular_minutos_mes("Marcio", 3, 2024) == 240
+
+    # Uma segunda importação duplicaria tudo
+    with pytest.raises(ValueError):
+        banco.importar_json(arquivo)
+    assert banco.calcular_minutos_totais(ano=2024) == 255
+    banco.fechar()
+
+
+def test_importar_json_sem_cadastro(arquivo, tmp_path):
+    # Arquivo de antes do cadastro de usuários (só "usuarios" -> registros)
+    dados = gerador.gerar_dados(usuarios=3, anos=1, ano_final=2024, semente=3)
+    dados.pop("cadastro", None)
+    gerador.gravar_dados(arquivo, dados)
+
+    banco = CentralHorasSQLite(str(tmp_path / "horas.db"))
+    assert banco.importar_json(arquivo) == gerador.contar_registros(dados)
+    assert _conteudo(banco) == _conteudo(CentralHorasEstagio(arquivo))
+    banco.fechar()
+
+
+def test_sqlite_persiste_entre_conexoes(tmp_path):
+    caminho = str(tmp_path / "horas.db")
+    banco = CentralHorasSQLite(caminho)
+    banco.cadastrar_usuario("Ana")
+    banco.adicionar_registro_manual("Ana", "10/04/2024", "08:00", "12:30", "relatório")
+    banco.fechar()
+
+    reaberto = CentralHorasSQLite(caminho)
+    registro, = reaberto.get_registros_usuario("Ana")
+    assert (registro["data"], registro["minutos"], registro["entrada"], registro["saida"], registro["descricao"]) == \
+        ("10/04/2024", 270, "08:00", "12:30", "relatório")
+    assert reaberto.gerar_relatorio_mensal(4, 2024)["usuarios"]["Ana"]["minutos"] == 270
+    reaberto.fechar()
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import pytest
+
+ctk = pytest.importorskip("customtkinter")
+
+from tabela_virtual import Coluna, TabelaVirtual  # noqa: E402
+
+
+@pytest.fixture
+def tabela():
+    try:
+        janela = ctk.CTk()
+    except Exception as e:  # tkinter.TclError sem servidor gráfico
+        pytest.skip(f"sem interface gráfica: {e}")
+    tabela = TabelaVirtual(janela, [Coluna("Nome", alinhamento="w"),
+                                    Coluna("Horas", formatar=lambda minutos: f"{minutos / 60:.2f}",
+                                           decrescente=True)],
+                           altura_linha=28)
+    # Área para 10 linhas (28 px + 2 de espaçamento cada)
+    tabela._ao_redimensionar(SimpleNamespace(height=300))
+    yield tabela
+    janela.destroy()
+
+
+def _textos(tabela):
+    return [[rotulo.cget("text") for rotulo in rotulos]
+            for linha, rotulos in tabela._reaproveitaveis if linha.winfo_manager()]
+
+
+def test_so_as_linhas_visiveis_tem_widgets(tabela):
+    tabela.definir_linhas((f"Estagiário {numero:05d}", numero) for numero in range(20000))
+    assert len(tabela._reaproveitaveis) == 10
+    assert _textos(tabela)[0] == ["Estagiário 00000", "0.00"]
+
+    tabela._rolar_pela_barra("moveto", "0.5")
+    assert _textos(tabela)[0] == ["Estagiário 10000", "166.67"]
+    tabela._rolar_pela_barra("moveto", "1.0")
+    assert _textos(tabela)[-1] == ["Estagiário 19999", "333.32"]
+    assert len(tabela._reaproveitaveis) == 10
+
+
+def test_ordenar_pelo_cabecalho_e_inverter(tabela):
+    tabela.definir_linhas([("Ana", 30), ("Caio", 90), ("Bia", 60)])
+    tabela.ordenar(1)
+    assert [texto[0] for texto in _textos(tabela)] == ["Caio", "Bia", "Ana"]
+    tabela.ordenar(1)
+    assert [texto[0] for texto in _textos(tabela)] == ["Ana", "Bia", "Caio"]
+
+    # Dados novos mantêm a ordenação escolhida; com menos linhas, as sobras somem
+    tabela.definir_linhas([("Davi", 10), ("Eva", 5)])
+    assert _textos(tabela) == [["Eva", "0.08"], ["Davi", "0.17"]]
@@ -0,0 +1,81 @@
+import logging
+import threading
+
+from tarefas_gui import ExecutorTarefas
+
+
+class RaizFalsa:
+    """Faz o papel do Tk: guarda as chamadas agendadas com after() para rodar à mão"""
+
+    def __init__(self):
+        self.agendadas = []
+
+    def after(self, ms, funcao):
+        self.agendadas.append(funcao)
+
+    def rodar(self, executor, limite=500):
+        for _ in range(limite):
+            if not self.agendadas:
+                return
+            self.agendadas.pop(0)()
+            executor._executor.submit(lambda: None).result()  # deixa a thread de trabalho andar
+        raise AssertionError("verificações não terminaram")
+
+
+def test_erro_no_retorno_nao_interrompe_as_entregas(caplog):
+    raiz = RaizFalsa()
+    tarefas = ExecutorTarefas(raiz)
+    entregues = []
+
+    def quebrar(_):
+        raise RuntimeError("widget destruído")
+
+    tarefas.executar(lambda: 1, ao_concluir=quebrar)
+    tarefas.executar(lambda: 1 / 0, ao_falhar=quebrar)
+    tarefas.executar(lambda: 2, ao_concluir=entregues.append)
+    with caplog.at_level(logging.ERROR, logger="tarefas_gui"):
+        raiz.rodar(tarefas)
+
+    assert entregues == [2]
+    assert len([registro for registro in caplog.records if registro.exc_info]) == 2
+    assert not tarefas.ocupado
+    # As verificações recomeçam na próxima tarefa
+    tarefas.executar(lambda: 3, ao_concluir=entregues.append)
+    raiz.rodar(tarefas)
+    assert entregues == [2, 3]
+    tarefas.encerrar()
+
+
+def test_erro_no_progresso_nao_para_as_verificacoes(caplog):
+    class RotuloQuebrado:
+        def configure(self, **opcoes):
+            raise RuntimeError("rótulo destruído")
+
+    raiz = RaizFalsa()
+    tarefas = ExecutorTarefas(raiz, RotuloQuebrado())
+    entregues = []
+    with caplog.at_level(logging.ERROR, logger="tarefas_gui"):
+        tarefas.executar(lambda: 1, ao_concluir=entregues.append)
+        raiz.rodar(tarefas)
+    assert entregues == [1]
+    assert caplog.records
+    tarefas.encerrar()
+
+
+def test_encerrar_conclui_as_gravacoes_e_descarta_as_consultas():
+    tarefas = ExecutorTarefas(RaizFalsa())
+    liberar = threading.Event()
+    executadas = []
+    tarefas.executar(liberar.wait, 5)
+    consulta = tarefas.executar(executadas.append, "ranking")
+    gravacoes = [tarefas.executar(executadas.append, f"ponto {numero}", gravacao=True) for numero in range(3)]
+
+    # A primeira tarefa ainda roda: a fila é tratada antes de ela terminar
+    tarefas.encerrar(esperar=False)
+    liberar.set()
+    for gravacao in gravacoes:
+        gravacao.result(5)
+
+    assert executadas == ["ponto 0", "ponto 1", "ponto 2"]
+    assert consulta.cancelled()
+    assert all(gravacao.done() and not gravacao.cancelled() for gravacao in gravacoes)
@@ -0,0 +1,94 @@
+import random
+from datetime import date
+
+import pytest
+
+import gerador
+from central_horas import CentralHorasEstagio, _chave_data, _minutos_registro
+from central_horas_sqlite import CentralHorasSQLite
+
+
+def _central_gerada(arquivo, semente, **opcoes):
+    """Central sobre um arquivo sintético, com os registros de cada usuário fora de ordem"""
+    dados = gerador.gerar_dados(usuarios=3, anos=2, ano_final=2024, semente=semente, fracao_legado=0.2)
+    aleatorio = random.Random(semente)
+    for usuario in dados["usuarios"].values():
+        aleatorio.shuffle(usuario["registros"])
+    gerador.gravar_dados(arquivo, dados)
+    return CentralHorasEstagio(arquivo, **opcoes)
+
+
+def _registros_mes_forca_bruta(central, nome, mes, ano):
+    return [reg for reg in central.get_registros_usuario(nome) if _chave_data(reg["data"])[:2] == (ano, mes)]
+
+
+@pytest.mark.parametrize("compacto", [False, True])
+def test_registros_mes_segue_o_historico(arquivo, compacto):
+    central = _central_gerada(arquivo, 7, compacto=compacto)
+    nome = central.usuarios[0]
+    for ano, mes in ((2023, 1), (2023, 12), (2024, 6), (2025, 1)):
+        assert list(map(dict, central.registros_mes(nome, mes, ano))) == \
+            list(map(dict, _registros_mes_forca_bruta(central, nome, mes, ano)))
+
+    # O índice já montado acompanha os registros novos e a troca de nome
+    central.adicionar_minutos_passados(nome, "10/06/2024", 33, "novo")
+    central.renomear_usuario(nome, "Renomeado")
+    registros = central.registros_mes("Renomeado", 6, 2024)
+    assert registros[-1]["minutos"] == 33
+    assert sum(map(_minutos_registro, registros)) == central.calcular_minutos_mes("Renomeado", 6, 2024)
+    assert central.verificar_consistencia() == []
+
+
+def test_consultas_rejeitam_usuario_desconhecido(arquivo):
+    central = CentralHorasEstagio(arquivo)
+    for consulta in (lambda: central.calcular_minutos_dia("Ninguém", "01/01/2024"),
+                     lambda: central.calcular_minutos_mes("Ninguém", 1, 2024),
+                     lambda: central.calcular_minutos_ano("Ninguém", 2024),
+                     lambda: central.registros_mes("Ninguém", 1, 2024)):
+        with pytest.raises(ValueError):
+            consulta()
+
+
+def test_consultas_aceitam_usuario_inativo(arquivo):
+    central = CentralHorasEstagio(arquivo)
+    central.adicionar_minutos_passados("Caio", "05/02/2024", 50)
+    central.desativar_usuario("Caio")
+    assert central.calcular_minutos_dia("Caio", "05/02/2024") == 50
+    assert central.calcular_minutos_mes("Caio", 2, 2024) == 50
+    assert central.calcular_minutos_ano("Caio", 2024) == 50
+
+
+def test_sqlite_valida_usuario_nas_consultas(tmp_path):
+    central = CentralHorasSQLite(str(tmp_path / "horas.db"))
+    central.adicionar_minutos_passados("Caio", "05/02/2024", 50)
+    central.desativar_usuario("Caio")
+    assert central.calcular_minutos_mes("Caio", 2, 2024) == 50
+    assert [reg["minutos"] for reg in central.registros_mes("Caio", 2, 2024)] == [50]
+    with pytest.raises(ValueError):
+        central.calcular_minutos_dia("Ninguém", "05/02/2024")
+    central.fechar()
+
+
+def test_registros_carregam_a_data_convertida(arquivo):
+    central = CentralHorasEstagio(arquivo, journal=True)
+    central.adicionar_minutos_passados("Caio", "05/02/2024", 50)
+    central.salvar_dados()
+    central.adicionar_minutos_passados("Caio", "31/12/2023", 10)
+    central.fechar()
+    with open(arquivo, "rb") as f:
+        gravado = f.read()
+
+    # Lido do arquivo e reaplicado do journal: a data já vem convertida
+    reaberta = CentralHorasEstagio(arquivo, journal=True)
+    registros = reaberta.get_registros_usuario("Caio")
+    assert [(registro.chave, registro.dia) for registro in registros] == \
+        [((2024, 2, 5), date(2024, 2, 5).toordinal()), ((2023, 12, 31), date(2023, 12, 31).toordinal())]
+    # Só no objeto em memória: o arquivo e a comparação com dicts não mudam
+    assert registros[0] == {key: registros[0][key] for key in registros[0]}
+    assert "chave" not in registros[0] and "dia" not in registros[0]
+    reaberta.salvar_dados()
+    reaberta.fechar()
+    with open(arquivo, "rb") as f:
+        regravado = f.read()
+    assert b'"chave"' not in regravado and b'"dia"' not in regravado
+    assert b'"chave"' not in gravado
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+from central_horas import ErroLote
+from central_horas_sqlite import CentralHorasSQLite
+
+
+def test_rejeita_turno_sobreposto_ou_duplicado(criar):
+    central = criar()
+    central.adicionar_registro_manual("Caio", "10/04/2024", "08:00", "12:00")
+    for entrada, saida in (("08:00", "12:00"), ("11:59", "13:00"), ("07:00", "08:01")):
+        with pytest.raises(ValueError, match="Caio"):
+            central.adicionar_registro_manual("Caio", "10/04/2024", entrada, saida)
+
+    # Turnos encostados, de outro dia ou de outro usuário não conflitam
+    central.adicionar_registro_manual("Caio", "10/04/2024", "12:00", "13:00")
+    central.adicionar_registro_manual("Caio", "11/04/2024", "08:00", "12:00")
+    central.adicionar_registro_manual("Samuel", "10/04/2024", "08:00", "12:00")
+    assert central.calcular_minutos_dia("Caio", "10/04/2024") == 300
+
+
+def test_lote_rejeita_sobreposicao_entre_os_proprios_itens(criar):
+    central = criar()
+    with pytest.raises(ErroLote) as erro:
+        central.registrar_lote([
+            {"nome": "Robson", "data": "10/04/2024", "entrada": "08:00", "saida": "10:00"},
+            {"nome": "Robson", "data": "10/04/2024", "entrada": "09:00", "saida": "11:00"},
+        ])
+    assert [linha for linha, _ in erro.value.erros] == [2]
+    assert central.calcular_minutos_dia("Robson", "10/04/2024") == 0
+
+
+def test_sinalizar_e_permitir(criar):
+    sinalizar = criar(turnos_sobrepostos="sinalizar")
+    sinalizar.adicionar_registro_manual("Márcio", "10/04/2024", "08:00", "12:00")
+    registro = sinalizar.adicionar_registro_manual("Márcio", "10/04/2024", "10:00", "14:00")
+    assert registro["sobreposto"] is True
+    assert len(sinalizar.auditar_sobreposicoes("Márcio")) == 1
+
+    permitir = criar(turnos_sobrepostos="permitir")
+    assert "sobreposto" not in permitir.adicionar_registro_manual("Márcio", "10/04/2024", "09:00", "10:00")
+
+
+@pytest.mark.parametrize("conexoes", ["compartilhada", "separadas"])
+def test_sqlite_turnos_concorrentes_so_um_e_gravado(tmp_path, monkeypatch, conexoes):
+    conferir = CentralHorasSQLite._turno_em_conflito
+
+    def conferir_devagar(self, *args):
+        # Alarga a janela entre a conferência e o INSERT
+        conflito = conferir(self, *args)
+        time.sleep(0.02)
+        return conflito
+
+    monkeypatch.setattr(CentralHorasSQLite, "_turno_em_conflito", conferir_devagar)
+    # Threads na mesma central (trava) ou em centrais diferentes sobre o mesmo banco (BEGIN IMMEDIATE)
+    arquivo = str(tmp_path / "horas.db")
+    if conexoes == "compartilhada":
+        centrais = [CentralHorasSQLite(arquivo)] * 6
+    else:
+        centrais = [CentralHorasSQLite(arquivo) for _ in range(6)]
+    largada = threading.Barrier(len(centrais))
+    resultados = []
+
+    def registrar(central):
+        largada.wait()
+        try:
+            central.adicionar_registro_manual("Caio", "10/04/2024", "08:00", "12:00")
+            resultados.append("gravado")
+        except ValueError:
+            resultados.append("rejeitado")
+
+    threads = [threading.Thread(target=registrar, args=(central,)) for central in centrais]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(resultados) == ["gravado"] + ["rejeitado"] * (len(centrais) - 1)
+    assert centrais[0].calcular_minutos_dia("Caio", "10/04/2024") == 240
+    for central in set(centrais):
+        central.fechar()